@@ -21,6 +21,9 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import importlib
+import sys
+
 from .version import __version__, __btversion__
 
 from .errors import *
@@ -65,26 +68,47 @@ from .flt import *
 
 from . import utils as utils
 
-from . import feeds as feeds
-from . import indicators as indicators
-from . import indicators as ind
-from . import studies as studies
-from . import strategies as strategies
-from . import strategies as strats
-from . import observers as observers
-from . import observers as obs
-from . import analyzers as analyzers
-from . import commissions as commissions
-from . import commissions as comms
-from . import filters as filters
-from . import signals as signals
-from . import sizers as sizers
-from . import stores as stores
-from . import brokers as brokers
-from . import timer as timer
-
-from . import talib as talib
-
-# Load contributed indicators and studies
-import backtrader.indicators.contrib
-import backtrader.studies.contrib
+# The packages below (and their aliases) are imported on first attribute
+# access (PEP 562), because importing all indicators, analyzers, feeds, stores
+# ... takes longer than importing the rest of the platform. Explicit imports
+# like "import backtrader.indicators as btind" are unaffected
+_LAZYMODULES = dict(
+    feeds='feeds',
+    indicators='indicators',
+    ind='indicators',
+    studies='studies',
+    strategies='strategies',
+    strats='strategies',
+    observers='observers',
+    obs='observers',
+    analyzers='analyzers',
+    commissions='commissions',
+    comms='commissions',
+    filters='filters',
+    signals='signals',
+    sizers='sizers',
+    stores='stores',
+    brokers='brokers',
+    talib='talib',
+)
+
+
+def __getattr__(name):
+    try:
+        modname = _LAZYMODULES[name]
+    except KeyError:
+        raise AttributeError("module '%s' has no attribute '%s'" %
+                             (__name__, name))
+
+    module = importlib.import_module('.' + modname, __name__)
+    globals()[name] = module
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZYMODULES))
+
+
+if sys.version_info < (3, 7):  # no module __getattr__, import everything
+    for _name in _LAZYMODULES:
+        __getattr__(_name)
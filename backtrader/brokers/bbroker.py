@@ -21,8 +21,12 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import bisect
 import collections
 import datetime
+import heapq
+import itertools
+import math
 
 import backtrader as bt
 from backtrader.comminfo import CommInfoBase
@@ -33,6 +37,151 @@ from backtrader.utils.py3 import string_types, integer_types
 __all__ = ['BackBroker', 'BrokerBack']
 
 
+class OrderBook(object):
+    '''Pending orders of the broker, kept in submission order and indexed so
+    that only the orders which may do something in a bar have to be tried
+
+      - ``Limit``, ``Stop`` and ``StopLimit`` orders sit in sorted price
+        ladders per data. An order in the *down* ladder may only execute (or
+        trigger) if the price reaches the trigger from above (buy limits, sell
+        stops) and one in the *up* ladder if it is reached from below
+
+      - Orders with an expiration sit in a heap per data ordered by ``valid``
+
+      - The rest (``Market``, ``Close``, trailing stops, ...) are tried on
+        each bar
+
+    The orders are identified by ``ref``
+    '''
+    DOWN, UP = 0, 1
+
+    def __init__(self):
+        self._seqs = itertools.count()
+        self._orders = dict()  # ref -> (seq, order)
+        self._keys = dict()  # ref -> current ladder entry or None
+        self._always = set()  # refs of orders not in a ladder
+        self._ladders = dict()  # data -> (down ladder, up ladder)
+        self._expiries = collections.defaultdict(list)
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order):
+        return order.ref in self._orders
+
+    def __iter__(self):
+        return iter(self.ordered(self._orders.values()))
+
+    @staticmethod
+    def ordered(entries, reverse=False):
+        return [o for _, o in sorted(entries, key=lambda x: x[0],
+                                     reverse=reverse)]
+
+    def _key(self, order):
+        # Returns (ladder, price) or None if the order is tried on each bar
+        exectype = order.exectype
+        if exectype == Order.Limit:
+            key = self.DOWN if order.isbuy() else self.UP, order.created.price
+        elif exectype == Order.Stop:
+            key = self.UP if order.isbuy() else self.DOWN, order.created.price
+        elif exectype == Order.StopLimit:
+            if order.triggered:  # behaves like a Limit
+                key = (self.DOWN if order.isbuy() else self.UP,
+                       order.created.pricelimit)
+            else:
+                key = (self.UP if order.isbuy() else self.DOWN,
+                       order.created.price)
+        else:
+            return None
+
+        price = key[1]
+        if price is None or price != price:  # None or NaN cannot be sorted
+            return None
+
+        return key
+
+    def _file(self, order, seq):
+        ref = order.ref
+        key = self._key(order)
+        if key is None:
+            self._always.add(ref)
+            self._keys[ref] = None
+        else:
+            entry = (key[1], seq, ref)
+            ladders = self._ladders.setdefault(order.data, ([], []))
+            bisect.insort(ladders[key[0]], entry)
+            self._keys[ref] = (key[0], entry)
+
+    def _unfile(self, order):
+        ref = order.ref
+        key = self._keys.pop(ref)
+        if key is None:
+            self._always.discard(ref)
+        else:
+            ladder = self._ladders[order.data][key[0]]
+            del ladder[bisect.bisect_left(ladder, key[1])]
+
+    def append(self, order):
+        '''Adds a new order at the end of the book'''
+        seq = next(self._seqs)
+        self._orders[order.ref] = (seq, order)
+        self._file(order, seq)
+        if order.valid and order.exectype != Order.Market:
+            heapq.heappush(self._expiries[order.data],
+                           (order.valid, seq, order.ref))
+
+    def remove(self, order):
+        '''Removes the order and returns its sequence number. Raises
+        ``ValueError`` if the order is not in the book'''
+        try:
+            seq, _ = self._orders.pop(order.ref)
+        except KeyError:
+            raise ValueError('order not in the book')
+
+        self._unfile(order)
+        return seq
+
+    def restore(self, order, seq):
+        '''Puts back an order removed with ``remove`` keeping its place. The
+        index is updated in case the order changed (triggered ``StopLimit``)
+        '''
+        self._orders[order.ref] = (seq, order)
+        self._file(order, seq)
+
+    def byrefs(self, refs, reverse=False):
+        '''Returns the orders in the book with the given refs'''
+        orders = self._orders
+        return self.ordered((orders[r] for r in refs if r in orders), reverse)
+
+    def candidates(self, pricerange):
+        '''Returns (in book order) the orders which may expire, execute or
+        change in the current bar. ``pricerange(data)`` has to return the
+        lowest and highest prices the data may trade in the bar or ``None``
+        '''
+        orders = self._orders
+        refs = set(self._always)
+
+        for data, expiries in self._expiries.items():
+            dt0 = data.datetime[0]
+            while expiries and expiries[0][0] < dt0:
+                refs.add(heapq.heappop(expiries)[2])
+
+        for data, (down, up) in self._ladders.items():
+            if not down and not up:
+                continue
+
+            prange = pricerange(data)
+            if prange is None:
+                continue
+
+            plow, phigh = prange
+            refs.update(x[2] for x in down[bisect.bisect_left(down, (plow,)):])
+            refs.update(x[2] for x in
+                        up[:bisect.bisect_right(up, (phigh, float('inf')))])
+
+        return self.ordered(orders[r] for r in refs if r in orders)
+
+
 class BackBroker(bt.BrokerBase):
     '''Broker Simulator
 
@@ -227,6 +376,15 @@ class BackBroker(bt.BrokerBase):
           automatically calculate returns based on the fund value and not on
           the total net asset value
 
+        - ``incvalue`` (default: ``False``)
+
+          Incremental accounting. Only the open positions are visited for
+          credit interest, cash adjustment and valuation and the value of a
+          position is only recalculated if its closing price, size or price
+          changed. The totals are kept as running sums (fully recalculated
+          every ``incvalue_resync`` updates), which may differ from the
+          recalculated ones in the last decimals
+
     '''
     params = (
         ('cash', 10000.0),
@@ -246,8 +404,11 @@ class BackBroker(bt.BrokerBase):
         ('shortcash', True),
         ('fundstartval', 100.0),
         ('fundmode', False),
+        ('incvalue', False),
     )
 
+    incvalue_resync = 1000  # running totals recalculated after n updates
+
     def __init__(self):
         super(BackBroker, self).__init__()
         self._userhist = []
@@ -268,10 +429,14 @@ class BackBroker(bt.BrokerBase):
         self._unrealized = 0.0  # no open position
 
         self.orders = list()  # will only be appending
-        self.pending = collections.deque()  # popleft and append(right)
+        self.pending = OrderBook()  # indexed, in submission order
         self._toactivate = collections.deque()  # to activate in next cycle
 
         self.positions = collections.defaultdict(Position)
+        self._openpos = dict()  # data -> open position (incvalue)
+        self._valcache = dict()  # data -> (close, size, price, contribs)
+        self._valtotals = [0.0, 0.0, 0.0]  # value, unlevered, unrealized
+        self._valupdates = 0
         self.d_credit = collections.defaultdict(float)  # credit per data
         self.notifs = collections.deque()
 
@@ -326,6 +491,10 @@ class BackBroker(bt.BrokerBase):
         '''Configure the Cheat-On-Open method to buy the close on order bar'''
         self.p.coo = coo
 
+    def set_incvalue(self, incvalue):
+        '''Configure incremental accounting of the open positions'''
+        self.p.incvalue = incvalue
+
     def set_shortcash(self, shortcash):
         '''Configure the shortcash parameters'''
         self.p.shortcash = shortcash
@@ -436,7 +605,10 @@ class BackBroker(bt.BrokerBase):
             self._fundshares += c / self._fundval
             self.cash += c
 
-        for data in datas or self.positions:
+        if not datas and self.p.incvalue:
+            pos_value, pos_value_unlever, unrealized = self._incvalue()
+
+        for data in datas or (self.positions if not self.p.incvalue else ()):
             comminfo = self.getcommissioninfo(data)
             position = self.positions[data]
             # use valuesize:  returns raw value, rather than negative adj val
@@ -493,6 +665,80 @@ class BackBroker(bt.BrokerBase):
 
         return self._value if not lever else self._valuelever
 
+    def _valuecontrib(self, data, position):
+        # value, unlevered value and unrealized pnl of a position, as summed
+        # up in _get_value
+        comminfo = self.getcommissioninfo(data)
+        price = data.close[0]
+        if not self.p.shortcash:
+            dvalue = abs(comminfo.getvalue(position, price))
+        else:
+            dvalue = comminfo.getvaluesize(position.size, price)
+
+        dunrealized = comminfo.profitandloss(position.size, position.price,
+                                             price)
+        if dvalue > 0:  # long position - unlever
+            dunlever = (dvalue - dunrealized) / comminfo.get_leverage()
+            dunlever += dunrealized
+        else:
+            dunlever = dvalue
+
+        return dvalue, dunlever, dunrealized
+
+    def _incvalue(self):
+        # Update the running totals with the open positions which changed
+        cache = self._valcache
+        value, unlever, unrealized = self._valtotals
+        updates = 0
+        for data, position in self._openpos.items():
+            close = data.close[0]
+            cached = cache.get(data)
+            if cached is not None:
+                cclose, csize, cprice, cvalue, cunlever, cunrealized = cached
+                if cclose == close and csize == position.size and \
+                   cprice == position.price:
+                    continue  # no price/position change, same contribution
+
+                value -= cvalue
+                unlever -= cunlever
+                unrealized -= cunrealized
+
+            dvalue, dunlever, dunrealized = self._valuecontrib(data, position)
+            value += dvalue
+            unlever += dunlever
+            unrealized += dunrealized
+
+            cache[data] = (close, position.size, position.price,
+                           dvalue, dunlever, dunrealized)
+            updates += 1
+
+        self._valupdates += updates
+        if self._valupdates >= self.incvalue_resync or \
+           not (math.isfinite(value) and math.isfinite(unlever) and
+                math.isfinite(unrealized)):
+            # bound rounding drift and recover after missing (NaN) prices
+            self._valupdates = 0
+            contribs = [c[3:] for c in cache.values()]
+            value, unlever, unrealized = \
+                [math.fsum(x) for x in zip(*contribs)] or [0.0] * 3
+
+        self._valtotals = [value, unlever, unrealized]
+        return value, unlever, unrealized
+
+    def _incposition(self, data, position):
+        # Keep track of the open positions after an execution
+        if position:
+            self._openpos[data] = position
+            return
+
+        self._openpos.pop(data, None)
+        cached = self._valcache.pop(data, None)
+        if not self._valcache:
+            self._valtotals[:] = [0.0] * 3  # nothing open, no residue
+        elif cached is not None:
+            for i, x in enumerate(cached[3:]):
+                self._valtotals[i] -= x
+
     def get_leverage(self):
         return self._leverage
 
@@ -619,12 +865,10 @@ class BackBroker(bt.BrokerBase):
         ocoref = self._ocos.get(parentref, None)
         ocol = self._ocol.pop(ocoref, None)
         if ocol:
-            for i in range(len(self.pending) - 1, -1, -1):
-                o = self.pending[i]
-                if o is not None and o.ref in ocol:
-                    del self.pending[i]
-                    o.cancel()
-                    self.notify(o)
+            for o in self.pending.byrefs(ocol, reverse=True):
+                self.pending.remove(o)
+                o.cancel()
+                self.notify(o)
 
     def _ocoize(self, order, oco):
         oref = order.ref
@@ -827,6 +1071,7 @@ class BackBroker(bt.BrokerBase):
 
             # do a real position update if something was executed
             position.update(execsize, price, data.datetime.datetime())
+            self._incposition(data, position)
 
             if closed and self.p.int2pnl:  # Assign accumulated interest data
                 closedcomm += self.d_credit.pop(data, 0.0)
@@ -1082,6 +1327,25 @@ class BackBroker(bt.BrokerBase):
 
         return None  # no price can be returned
 
+    def _pricerange(self, data):
+        # Lowest and highest price the orders of data see in _try_exec,
+        # widened with the spread added to buy prices
+        prices = [getattr(data, 'tick_' + x, None) for x in
+                  ('open', 'high', 'low')]
+        prices = [p if p is not None else getattr(data, x)[0]
+                  for p, x in zip(prices, ('open', 'high', 'low'))]
+        prices = [p for p in prices if p == p]  # NaN never executes
+        if not prices:
+            return None
+
+        plow, phigh = min(prices), max(prices)
+        if hasattr(data, 'spread'):
+            spread = data.spread[0]
+            if spread == spread:
+                plow, phigh = plow + min(spread, 0.0), phigh + max(spread, 0.0)
+
+        return plow, phigh
+
     def _try_exec(self, order):
         data = order.data
 
@@ -1226,8 +1490,9 @@ class BackBroker(bt.BrokerBase):
             self.check_submitted()
 
         # Discount any cash for positions hold
+        openpos = self._openpos if self.p.incvalue else self.positions
         credit = 0.0
-        for data, pos in self.positions.items():
+        for data, pos in openpos.items():
             if pos:
                 comminfo = self.getcommissioninfo(data)
                 dt0 = data.datetime.datetime()
@@ -1240,12 +1505,14 @@ class BackBroker(bt.BrokerBase):
 
         self._process_order_history()
 
-        # Iterate once over all elements of the pending queue
-        self.pending.append(None)
-        while True:
-            order = self.pending.popleft()
-            if order is None:
-                break
+        # Iterate once over the pending orders which may do something. The
+        # others would not execute/expire and are left untouched
+        for order in self.pending.candidates(self._pricerange):
+            if order not in self.pending:
+                continue  # canceled by the processing of another order
+
+            # out of the book during processing like in a queue rotation
+            seq = self.pending.remove(order)
 
             if order.expire():
                 self.notify(order)
@@ -1253,21 +1520,21 @@ class BackBroker(bt.BrokerBase):
                 self._bracketize(order, cancel=True)
 
             elif not order.active():
-                self.pending.append(order)  # cannot yet be processed
+                self.pending.restore(order, seq)  # cannot yet be processed
 
             else:
                 self._try_exec(order)
                 if order.alive():
-                    self.pending.append(order)
+                    self.pending.restore(order, seq)
 
                 elif order.status == Order.Completed:
                     # a bracket parent order may have been executed
                     self._bracketize(order)
 
         # Operations have been executed ... adjust cash end of bar
-        for data, pos in self.positions.items():
+        for data, pos in openpos.items():
             # futures change cash every bar
-            if pos:
+            if pos and (not self.p.incvalue or pos.adjbase != data.close[0]):
                 comminfo = self.getcommissioninfo(data)
                 self.cash += comminfo.cashadjust(pos.size,
                                                  pos.adjbase,
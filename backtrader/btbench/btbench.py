@@ -0,0 +1,425 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import collections
+import datetime
+import json
+import multiprocessing
+import os.path
+import platform
+import random
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+
+import backtrader as bt
+
+
+__all__ = ['btbench', 'compare']
+
+
+DATADIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       '..', '..', 'datas')
+
+BUNDLED = ('yhoo-1996-2014.txt', 'orcl-1995-2014.txt', 'nvda-1999-2014.txt')
+
+
+class CrossStrategy(bt.Strategy):
+    '''Light strategy to measure the engine: a moving average crossover'''
+    params = (('fast', 10), ('slow', 30),)
+
+    def __init__(self):
+        fast = bt.ind.SMA(period=self.p.fast)
+        slow = bt.ind.SMA(period=self.p.slow)
+        self.cross = bt.ind.CrossOver(fast, slow)
+
+    def next(self):
+        if self.cross > 0:
+            self.buy()
+        elif self.cross < 0:
+            self.close()
+
+
+class MixStrategy(CrossStrategy):
+    '''Strategy with a representative mix of indicators'''
+    def __init__(self):
+        super(MixStrategy, self).__init__()
+        bt.ind.EMA(period=20, skipVals=0)
+        bt.ind.RSI()
+        bt.ind.MACD()
+        bt.ind.Stochastic()
+        bt.ind.BollingerBands()
+        bt.ind.ATR()
+        bt.ind.CCI()
+
+
+def makesynthetic(path, bars, seed=0):
+    '''Writes a random walk of ``bars`` 1-minute bars (09:00 - 17:29 on
+    weekdays) to ``path`` in the format of ``BacktraderCSVData``'''
+    rng = random.Random(seed)
+    dt = datetime.datetime(2000, 1, 3, 9, 0)
+    close = 100.0
+    with open(path, 'w') as f:
+        f.write('Date,Time,Open,High,Low,Close,Volume,OpenInterest\n')
+        for i in range(bars):
+            o = close
+            close = max(1.0, o + rng.gauss(0.0, 0.1))
+            h = max(o, close) + rng.random() * 0.05
+            l = min(o, close) - rng.random() * 0.05
+            f.write('%s,%s,%.4f,%.4f,%.4f,%.4f,%d,0\n' % (
+                dt.date().isoformat(), dt.time().isoformat(),
+                o, h, l, close, rng.randint(1, 1000)))
+
+            dt += datetime.timedelta(minutes=1)
+            if dt.hour == 17 and dt.minute == 30:
+                dt += datetime.timedelta(days=1, hours=-8, minutes=-30)
+                while dt.weekday() > 4:
+                    dt += datetime.timedelta(days=1)
+
+
+def synthetic(args):
+    return bt.feeds.BacktraderCSVData(dataname=args.synthetic,
+                                      timeframe=bt.TimeFrame.Minutes)
+
+
+def runsimple(args, strategy=CrossStrategy, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(synthetic(args))
+    cerebro.addstrategy(strategy)
+    cerebro.run()
+    return args.bars
+
+
+def case_runnext(args):
+    return runsimple(args, runonce=False)
+
+
+def case_runonce(args):
+    return runsimple(args, runonce=True)
+
+
+def case_nopreload(args):
+    return runsimple(args, preload=False)
+
+
+def case_exactbars(exactbars):
+    def case(args):
+        return runsimple(args, exactbars=exactbars)
+
+    return case
+
+
+def case_indicators(args):
+    return runsimple(args, strategy=MixStrategy)
+
+
+def case_resample(args):
+    cerebro = bt.Cerebro()
+    cerebro.resampledata(synthetic(args), timeframe=bt.TimeFrame.Days)
+    cerebro.addstrategy(CrossStrategy)
+    cerebro.run()
+    return args.bars
+
+
+def case_replay(args):
+    cerebro = bt.Cerebro()
+    cerebro.replaydata(synthetic(args), timeframe=bt.TimeFrame.Days)
+    cerebro.addstrategy(CrossStrategy)
+    cerebro.run()
+    return args.bars
+
+
+def case_optimize(args):
+    fasts, slows = (5, 10, 15), (30, 50)
+    cerebro = bt.Cerebro(maxcpus=args.maxcpus, optreturn=True)
+    cerebro.adddata(synthetic(args))
+    cerebro.optstrategy(CrossStrategy, fast=fasts, slow=slows)
+    cerebro.run()
+    return args.bars * len(fasts) * len(slows)
+
+
+def case_setup(args):
+    # 40 bars: the run is dominated by the creation of the strategies with
+    # their indicators, observers and analyzers
+    bars = 40
+    dataname = os.path.join(os.path.dirname(args.synthetic), 'setup.txt')
+    makesynthetic(dataname, bars)
+
+    fasts, slows = range(2, 12), range(12, 32)
+    cerebro = bt.Cerebro(maxcpus=1, optreturn=True)
+    cerebro.adddata(bt.feeds.BacktraderCSVData(
+        dataname=dataname, timeframe=bt.TimeFrame.Minutes))
+    cerebro.optstrategy(MixStrategy, fast=fasts, slow=slows)
+    cerebro.addanalyzer(bt.analyzers.SharpeRatio)
+    cerebro.run()
+
+    instances = len(fasts) * len(slows)
+    return bars * instances, instances
+
+
+def case_bundled(args):
+    cerebro = bt.Cerebro()
+    for name in BUNDLED:
+        cerebro.adddata(bt.feeds.YahooFinanceCSVData(
+            dataname=os.path.join(args.datadir, name)))
+
+    cerebro.addstrategy(MixStrategy)
+    strat = cerebro.run()[0]
+    return sum(len(data) for data in strat.datas)
+
+
+CASES = collections.OrderedDict([
+    ('runnext', (case_runnext, 'next mode (runonce=False)')),
+    ('runonce', (case_runonce, 'vectorized mode (runonce=True)')),
+    ('nopreload', (case_nopreload, 'preload=False')),
+    ('exactbars=1', (case_exactbars(1), 'exactbars=1')),
+    ('exactbars=-1', (case_exactbars(-1), 'exactbars=-1')),
+    ('exactbars=-2', (case_exactbars(-2), 'exactbars=-2')),
+    ('resample', (case_resample, 'resampling minutes to days')),
+    ('replay', (case_replay, 'replaying minutes as days')),
+    ('optimize', (case_optimize, 'optimization of 6 combinations')),
+    ('indicators', (case_indicators, 'indicator mix')),
+    ('setup', (case_setup, 'creation of 200 strategies run on 40 bars')),
+    ('bundled', (case_bundled, 'indicator mix on 3 bundled datas')),
+])
+
+
+def maxrss():
+    '''Returns the peak resident set size in MiB of the process and its
+    finished children or ``None`` if it cannot be measured'''
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    # kilobytes but bytes in macOS
+    return rss / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0)
+
+
+def runcase(name, args, queue=None):
+    '''Runs the case and returns (or puts in ``queue``) its measurements'''
+    func, _ = CASES[name]
+    t0 = perf_counter()
+    bars = func(args)
+    seconds = perf_counter() - t0
+
+    instances = None
+    if isinstance(bars, tuple):  # (bars, strategy instances)
+        bars, instances = bars
+
+    result = dict(bars=bars, seconds=seconds, barspersec=bars / seconds,
+                  maxrss=maxrss())
+    if instances:
+        result.update(instances=instances, perinstance=seconds / instances)
+    if queue is not None:
+        queue.put(result)
+
+    return result
+
+
+def measure(name, args):
+    '''Runs the case ``args.repeat`` times and keeps the fastest run and the
+    highest peak memory. Unless ``args.noisolate`` is set each run takes
+    place in a fresh process, to measure the peak memory of the case alone'''
+    best = None
+    for i in range(args.repeat):
+        if args.noisolate:
+            result = runcase(name, args)
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            queue = ctx.Queue()
+            proc = ctx.Process(target=runcase, args=(name, args, queue))
+            proc.start()
+            proc.join()
+            if proc.exitcode:
+                raise RuntimeError('Benchmark case %s failed' % name)
+
+            result = queue.get()
+
+        if best is None:
+            best = result
+        else:
+            rss = max(best['maxrss'] or 0, result['maxrss'] or 0) or None
+            if result['seconds'] < best['seconds']:
+                best = result
+            best['maxrss'] = rss
+
+    return best
+
+
+def compare(results, baseline, tolerance=0.10):
+    '''Compares the ``results`` of a benchmark run with those in
+    ``baseline`` (both as returned/saved by ``btbench``)
+
+    Returns a list of ``(case, metric, baseline, current, change)`` for the
+    cases slower (``barspersec``) or using more memory (``maxrss``) than the
+    baseline by more than ``tolerance`` (a fraction)
+    '''
+    regressions = list()
+    base = baseline['results']
+    for name, cur in results['results'].items():
+        if name not in base:
+            continue
+
+        old = base[name]
+        if cur['barspersec'] < old['barspersec'] * (1.0 - tolerance):
+            regressions.append(
+                (name, 'barspersec', old['barspersec'], cur['barspersec'],
+                 cur['barspersec'] / old['barspersec'] - 1.0))
+
+        if cur['maxrss'] and old['maxrss'] and \
+                cur['maxrss'] > old['maxrss'] * (1.0 + tolerance):
+            regressions.append(
+                (name, 'maxrss', old['maxrss'], cur['maxrss'],
+                 cur['maxrss'] / old['maxrss'] - 1.0))
+
+    return regressions
+
+
+def btbench(pargs=''):
+    args = parse_args(pargs)
+
+    if args.list:
+        for name, (_, desc) in CASES.items():
+            print('%-14s %s' % (name, desc))
+        return
+
+    names = list(CASES)
+    if args.cases:
+        names = [n for c in args.cases for n in c.split(',') if n]
+        for name in names:
+            if name not in CASES:
+                raise ValueError('Unknown benchmark case: %s' % name)
+
+    if 'bundled' in names and \
+            not all(os.path.exists(os.path.join(args.datadir, x))
+                    for x in BUNDLED):
+        print('Skipping case bundled: datas not found in', args.datadir)
+        names.remove('bundled')
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        args.synthetic = os.path.join(tmpdir, 'synthetic.txt')
+        makesynthetic(args.synthetic, args.bars)
+
+        results = collections.OrderedDict()
+        for name in names:
+            results[name] = r = measure(name, args)
+            print('%-14s %10d bars %9.3f s %12.1f bars/s %10s MiB%s' % (
+                name, r['bars'], r['seconds'], r['barspersec'],
+                '%.1f' % r['maxrss'] if r['maxrss'] else '-',
+                ' %9.3f ms/strategy' % (r['perinstance'] * 1000.0)
+                if 'perinstance' in r else ''))
+    finally:
+        shutil.rmtree(tmpdir)
+
+    run = collections.OrderedDict([
+        ('meta', collections.OrderedDict([
+            ('date', datetime.datetime.now().isoformat()),
+            ('version', bt.__version__),
+            ('python', platform.python_version()),
+            ('platform', platform.platform()),
+            ('bars', args.bars),
+            ('repeat', args.repeat),
+            ('maxcpus', args.maxcpus),
+            ('isolated', not args.noisolate),
+        ])),
+        ('results', results),
+    ])
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(run, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(run, baseline, args.tolerance)
+        for name, metric, old, cur, change in regressions:
+            print('REGRESSION %-14s %-10s %12.1f -> %12.1f (%+.1f%%)' % (
+                name, metric, old, cur, change * 100.0))
+
+        if not regressions:
+            print('No regressions against', args.compare)
+        elif not args.noexit:
+            sys.exit(1)
+
+    return run
+
+
+def parse_args(pargs=''):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description=(
+            'Measures the throughput (bars/second) and peak memory of '
+            'backtrader in several configurations and compares the results '
+            'with a saved baseline'
+        )
+    )
+
+    parser.add_argument('--list', action='store_true',
+                        help='List the benchmark cases and exit')
+
+    parser.add_argument('--cases', action='append', required=False,
+                        help='Cases to run (comma separated, can be given '
+                        'several times). Default: all')
+
+    parser.add_argument('--bars', type=int, default=100000,
+                        help='Number of bars of the synthetic data')
+
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per case (the fastest is kept)')
+
+    parser.add_argument('--maxcpus', type=int, default=None,
+                        help='maxcpus for the optimization case')
+
+    parser.add_argument('--datadir', default=DATADIR,
+                        help='Directory with the bundled datas')
+
+    parser.add_argument('--noisolate', action='store_true',
+                        help='Run the cases in this process (peak memory '
+                        'is then that of the whole benchmark)')
+
+    parser.add_argument('--save', required=False, metavar='JSON',
+                        help='Save the results to this file')
+
+    parser.add_argument('--compare', required=False, metavar='JSON',
+                        help='Compare the results with a saved baseline')
+
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Fraction by which a case may be slower or use '
+                        'more memory before it is flagged as regression')
+
+    parser.add_argument('--noexit', action='store_true',
+                        help='Do not exit with status 1 on regressions')
+
+    if pargs:
+        return parser.parse_args(pargs)
+
+    return parser.parse_args()
@@ -23,8 +23,14 @@ from __future__ import (absolute_import, division, print_function,
 
 import datetime
 import collections
+import functools
+import heapq
 import itertools
 import multiprocessing
+import operator
+import time
+
+import numpy as np
 
 import backtrader as bt
 from .utils.py3 import (map, range, zip, with_metaclass, string_types,
@@ -35,6 +41,8 @@ from . import indicator
 from .brokers import BackBroker
 from .metabase import MetaParams
 from . import observers
+from .optscheduler import OptScheduler
+from .profiler import Profiler
 from .writer import WriterFile
 from .utils import OrderedDict, tzparse, num2date, date2num
 from .strategy import Strategy, SignalStrategy
@@ -65,6 +73,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Run ``Indicators`` in vectorized mode to speed up the entire system.
         Strategies and Observers will always be run on an event based basis
 
+      - ``preloadresample`` (default: ``False``)
+
+        Datas added with ``resampledata`` deactivate ``preload`` (and with it
+        ``runonce``) unless this is ``True``. The preloaded bars are then
+        resampled at once if possible (see ``Resampler.resamplebulk``) and
+        the strategies can run in ``runonce`` mode
+
+        The resampled bars are delivered in the same steps as when resampling
+        bar by bar, including the last bar of a data, which comes in an extra
+        step after the bars of the other datas
+
       - ``live`` (default: ``False``)
 
         If no data has reported itself as *live* (via the data's ``islive``
@@ -127,6 +146,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
             calculation of the Simple Moving Average
 
             - This setting will deactivate ``preload`` and ``runonce``
+              (unless ``chunkbars`` is set)
             - Using this setting also deactivates **plotting**
 
           - ``-1``: datafreeds and indicators/operations at strategy level will
@@ -155,6 +175,23 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
             - ``runonce`` will be deactivated
 
+      - ``chunkbars`` (default: ``0``)
+
+        If set with ``exactbars=1`` and ``runonce=True``, the vectorized
+        ``runonce`` mode is kept with bounded memory: the datas are preloaded
+        in chunks of ``chunkbars`` bars (of the first data, the other datas
+        load the bars up to the same datetime), the indicators calculate each
+        chunk at once and the strategies then process it. Between chunks the
+        lines only keep the values needed by the minimum periods
+
+        The buffers hold at most ``chunkbars`` values (plus the minimum
+        periods) instead of the minimum periods as with ``exactbars=1`` alone
+
+        Not available with replaying, resampling, live datas, clones,
+        ``oldsync``, indicators forcing ``next`` mode (like ``HeikinAshi``)
+        or lines setting values in past bars (a positive ``ago`` like in
+        ``data.close(26)``), in which case ``runonce`` is deactivated as usual
+
       - ``objcache`` (default: ``False``)
 
         Experimental option to implement a cache of lines objects and reduce
@@ -170,6 +207,41 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Corner cases may happen in which this drives a line object off its
         minimum period and breaks things and it is therefore disabled.
 
+      - ``numpybuffers`` (default: ``False``)
+
+        Store the values of the lines in growable ``numpy`` float64 buffers
+        instead of ``array.array`` instances (unless memory saving schemes
+        are in place). Whole-array views of the buffers can then be used by
+        vectorized ``once`` implementations without copying data, at the
+        cost of slower element by element access
+
+      - ``nextheap`` (default: ``False``)
+
+        In ``next`` mode (``runonce=False``), keep the datas in a priority
+        queue keyed by the timestamp of their next bar, so that each step
+        only moves the datas delivering a bar instead of moving all datas
+        and rewinding the ones which are ahead. This pays off with many
+        datas which do not deliver bars at the same times
+
+        It only applies if no data is resampled, replayed, live, a clone,
+        has filters with a ``check`` method or keeps a bounded buffer
+        (``exactbars`` >= 1). Otherwise the default scheduler is used
+
+      - ``profile`` (default: ``False``)
+
+        If ``True`` the wall time and the number of calls of the methods
+        driving the run are recorded per object: ``_next``, ``_once``,
+        ``next``, ``once`` ... of the strategies, indicators, observers and
+        analyzers, ``next`` of the broker and writers and the broker
+        notifications, timers and writers of cerebro itself
+
+        The results of the last run are kept in the attribute ``profiler``
+        (a ``Profiler`` instance) which offers them as a tree (``tree``), a
+        flat table (``table``) and prints both with ``report``
+
+        The methods are only wrapped if this is ``True``. With the default
+        value the run is not affected
+
       - ``writer`` (default: ``False``)
 
         If set to ``True`` a default WriterFile will be created which will
@@ -209,6 +281,40 @@ class Cerebro(with_metaclass(MetaParams, object)):
         with ``optdatas`` the total gain increases to a total speed-up of
         ``32%`` in an optimization run.
 
+      - ``optshm`` (default: ``False``)
+
+        If ``True`` and the datas are preloaded only once in the main process
+        (see ``optdatas``), the values of the data lines are placed in shared
+        memory blocks (``multiprocessing.shared_memory``, python >= 3.8)
+        before starting the optimization processes.
+
+        The processes attach to the blocks with read-only views instead of
+        receiving a pickled copy of the values with each run, which keeps the
+        memory used for the datas constant regardless of the number of
+        processes. The source of the bars (like the ``DataFrame`` of a pandas
+        feed) is not handed over either
+
+      - ``optcache`` (default: ``False``)
+
+        If ``True`` and using ``runonce``, the calculated values of the
+        indicators are kept across the runs of an optimization (in each
+        process). An indicator with the same class, parameters and inputs
+        (datas or other indicators fulfilling the same condition) as one
+        already calculated, takes the values (including the ones of all the
+        objects it creates) instead of calculating them again
+
+        Only the values of indicators calculated in more than one run are
+        kept, i.e.: indicators which differ with each combination (like a
+        crossover of moving averages with optimized periods) are not stored
+
+        The indicators must only depend on their parameters and inputs
+
+      - ``optcachesize`` (default: ``2 ** 28``)
+
+        Maximum number of bytes kept by ``optcache`` in each process. The
+        least recently used values are discarded to stay within the limit.
+        ``None`` removes the limit
+
       - ``oldsync`` (default: ``False``)
 
         Starting with release 1.9.0.99 the synchronization of multiple datas
@@ -269,15 +375,23 @@ class Cerebro(with_metaclass(MetaParams, object)):
     params = (
         ('preload', True),
         ('runonce', True),
+        ('preloadresample', False),
         ('maxcpus', None),
         ('stdstats', True),
         ('oldbuysell', False),
         ('oldtrades', False),
         ('lookahead', 0),
         ('exactbars', False),
+        ('chunkbars', 0),
         ('optdatas', True),
         ('optreturn', True),
+        ('optshm', False),
+        ('optcache', False),
+        ('optcachesize', 2 ** 28),
         ('objcache', False),
+        ('numpybuffers', False),
+        ('nextheap', False),
+        ('profile', False),
         ('live', False),
         ('writer', False),
         ('tradehistory', False),
@@ -291,6 +405,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
     def __init__(self):
         self._dolive = False
         self._doreplay = False
+        self._doresample = False
         self._dooptimize = False
         self.stores = list()
         self.feeds = list()
@@ -298,6 +413,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self.datasbyname = collections.OrderedDict()
         self.strats = list()
         self.optcbs = list()  # holds a list of callbacks for opt strategies
+        self.optprogresscbs = list()  # callbacks for optimization progress
+        self.optabortcbs = list()  # callbacks which may stop optimizations
+        self._optscheduler = (OptScheduler, tuple(), dict())
+        self.profiler = None
         self.observers = list()
         self.analyzers = list()
         self.indicators = list()
@@ -832,13 +951,16 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         Any other kwargs like ``timeframe``, ``compression``, ``todate`` which
         are supported by the resample filter will be passed transparently
+
+        ``preload`` is deactivated unless the parameter ``preloadresample``
+        is ``True``
         '''
         if any(dataname is x for x in self.datas):
             dataname = dataname.clone()
 
         dataname.resample(**kwargs)
         self.adddata(dataname, name=name)
-        self._doreplay = True
+        self._doresample = True
 
         return dataname
 
@@ -851,6 +973,41 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         self.optcbs.append(cb)
 
+    def optprogress(self, cb):
+        '''
+        Adds a *callback* to the list of callbacks that will be called during
+        optimizations each time the run of a combination of parameters has
+        finished
+
+        The signature: cb(done, total, elapsed, eta)
+
+          - ``done``: number of finished combinations
+          - ``total``: number of combinations
+          - ``elapsed``: seconds since the start of the optimization
+          - ``eta``: estimated seconds until the end of the optimization
+        '''
+        self.optprogresscbs.append(cb)
+
+    def optabort(self, cb):
+        '''
+        Adds a *callback* which can stop an optimization. It is called with
+        the strategies of each finished combination (after the callbacks
+        added with ``optcallback``). If it returns ``True``, the remaining
+        combinations are cancelled and ``run`` returns the results gathered
+        until then
+
+        The signature: cb(strategy) -> bool
+        '''
+        self.optabortcbs.append(cb)
+
+    def optscheduler(self, schedcls, *args, **kwargs):
+        '''
+        Sets the class of the scheduler which distributes the combinations of
+        an optimization over the processes. It will be instantiated with
+        ``args`` and ``kwargs`` at run time. The default is ``OptScheduler``
+        '''
+        self._optscheduler = (schedcls, args, kwargs)
+
     def optstrategy(self, strategy, *args, **kwargs):
         '''
         Adds a ``Strategy`` class to the mix for optimization. Instantiation
@@ -1015,8 +1172,56 @@ class Cerebro(with_metaclass(MetaParams, object)):
         rv = vars(self).copy()
         if 'runstrats' in rv:
             del(rv['runstrats'])
+
+        # only needed in the main process and maybe not picklable (lambdas)
+        for key in ('optprogresscbs', 'optabortcbs', '_optscheduler'):
+            rv.pop(key, None)
+
         return rv
 
+    # queue for the results and abort event of the optimization processes
+    _optqueue = None
+    _optstop = None
+
+    @staticmethod
+    def _optinit(queue, stop):
+        '''
+        Initializer of the optimization processes (the queue and the event
+        can only be shared when creating the processes)
+        '''
+        Cerebro._optqueue = queue
+        Cerebro._optstop = stop
+
+    def _runoptchunk(self, chunk):
+        '''
+        Used during optimization to run in a subprocess a chunk of ``(index,
+        iterstrat)`` combinations as created by the scheduler
+
+        The result of each combination is put in the queue as soon as
+        available. The remaining combinations are skipped once the
+        optimization has been aborted
+        '''
+        for idx, iterstrat in chunk:
+            if self._optstop.is_set():
+                break
+
+            self._optqueue.put((idx, self(iterstrat)))
+
+    def _optnotify(self, runstrat, done, total, tstart):
+        '''
+        Delivers the progress of an optimization after the run of a
+        combination. Returns ``True`` if the optimization has to be stopped
+        '''
+        for cb in self.optcbs:
+            cb(runstrat)  # callback receives finished strategy
+
+        elapsed = time.time() - tstart
+        eta = elapsed / done * (total - done)
+        for cb in self.optprogresscbs:
+            cb(done, total, elapsed, eta)
+
+        return any([cb(runstrat) for cb in self.optabortcbs])
+
     def runstop(self):
         '''If invoked from inside a strategy or anywhere else, including other
         threads the execution will stop as soon as possible.'''
@@ -1050,28 +1255,54 @@ class Cerebro(with_metaclass(MetaParams, object)):
         # Manage activate/deactivate object cache
         linebuffer.LineActions.cleancache()  # clean cache
         indicator.Indicator.cleancache()  # clean cache
+        indicator.Indicator.cleanruncache()  # clean cross-run cache
 
         linebuffer.LineActions.usecache(self.p.objcache)
         indicator.Indicator.usecache(self.p.objcache)
 
+        # the storage is chosen class-wide: restore it for other cerebros
+        npstorage = linebuffer.LineBuffer._npstorage
+        linebuffer.LineBuffer.usenumpy(self.p.numpybuffers)
+        try:
+            return self._runall()
+        finally:
+            linebuffer.LineBuffer.usenumpy(npstorage)
+
+    def _runall(self):
         self._dorunonce = self.p.runonce
         self._dopreload = self.p.preload
         self._exactbars = int(self.p.exactbars)
 
+        # runonce in chunks of preloaded bars
+        # (clones copy the bars of their preloaded data and the last bar
+        # of a resampled data must wait for the other datas to be over)
+        self._dochunks = self._dorunonce and self._exactbars > 0 and \
+            self.p.chunkbars > 0 and not self.p.oldsync and \
+            not any(x._clone or x.resampling for x in self.datas)
+
         if self._exactbars:
             self._dorunonce = False  # something is saving memory, no runonce
             self._dopreload = self._dopreload and self._exactbars < 1
 
         self._doreplay = self._doreplay or any(x.replaying for x in self.datas)
+        if self._doresample and not self.p.preloadresample:
+            self._doreplay = True  # resampled bar by bar as in replaying
+
+        for data in self.datas:
+            # preloaded resampled datas deliver the bar of "last" at the end
+            # as when resampling bar by bar (see AbstractDataBase.preload)
+            data._holdlast = self.p.preloadresample
         if self._doreplay:
             # preloading is not supported with replay. full timeframe bars
             # are constructed in realtime
             self._dopreload = False
+            self._dochunks = False
 
         if self._dolive or self.p.live:
             # in this case both preload and runonce must be off
             self._dorunonce = False
             self._dopreload = False
+            self._dochunks = False
 
         self.runwriters = list()
 
@@ -1119,7 +1350,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if not self.strats:  # Datas are present, add a strategy
             self.addstrategy(Strategy)
 
-        iterstrats = itertools.product(*self.strats)
+        strats = [list(strat) for strat in self.strats]  # sized for progress
+        iterstrats = itertools.product(*strats)
+        optotal = functools.reduce(operator.mul, map(len, strats), 1)
+        optstart = time.time()
         if not self._dooptimize or self.p.maxcpus == 1:
             # If no optimmization is wished ... or 1 core is to be used
             # let's skip process "spawning"
@@ -1127,10 +1361,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 runstrat = self.runstrategies(iterstrat)
                 self.runstrats.append(runstrat)
                 if self._dooptimize:
-                    for cb in self.optcbs:
-                        cb(runstrat)  # callback receives finished strategy
+                    if self._optnotify(runstrat, len(self.runstrats),
+                                       optotal, optstart):
+                        break
         else:
-            if self.p.optdatas and self._dopreload and self._dorunonce:
+            predata = self.p.optdatas and self._dopreload and self._dorunonce
+            shared = predata and self.p.optshm
+            if predata:
                 for data in self.datas:
                     data.reset()
                     if self._exactbars < 1:  # datas can be full length
@@ -1139,15 +1376,60 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     if self._dopreload:
                         data.preload()
 
-            pool = multiprocessing.Pool(self.p.maxcpus or None)
-            for r in pool.imap(self, iterstrats):
-                self.runstrats.append(r)
-                for cb in self.optcbs:
-                    cb(r)  # callback receives finished strategy
+                    if shared:  # pickled as a reference to the memory
+                        for line in data.lines:
+                            line.share()
+
+                        data._srcdrop = True  # the source is not needed
 
-            pool.close()
+            procs = self.p.maxcpus or multiprocessing.cpu_count()
+            schedcls, schedargs, schedkwargs = self._optscheduler
+            chunks = schedcls(*schedargs, **schedkwargs).schedule(iterstrats,
+                                                                  procs)
 
-            if self.p.optdatas and self._dopreload and self._dorunonce:
+            # results are delivered combination by combination as soon as
+            # available, but are returned in the order of the combinations
+            results = dict()
+            try:
+                queue = multiprocessing.SimpleQueue()
+                stop = multiprocessing.Event()
+                pool = multiprocessing.Pool(procs, initializer=self._optinit,
+                                            initargs=(queue, stop))
+                try:
+                    # a worker raising puts None in the queue
+                    work = pool.map_async(
+                        self._runoptchunk, chunks, chunksize=1,
+                        error_callback=lambda exc: queue.put(None))
+
+                    ncombos = sum(map(len, chunks))
+                    while len(results) < ncombos:
+                        res = queue.get()
+                        if res is None:
+                            work.get()  # raises the error of the worker
+
+                        idx, r = res
+                        results[idx] = r
+                        if self._optnotify(r, len(results), optotal,
+                                           optstart):
+                            stop.set()  # workers skip what is left
+                            break
+                finally:
+                    # done, aborted or raising (in a worker or in a callback)
+                    # no work is left to wait for: cancel it if any
+                    pool.terminate()
+                    pool.join()
+
+                self.runstrats.extend(results[idx] for idx in sorted(results))
+
+            finally:
+                if shared:  # the shared memory must always be released
+                    for data in self.datas:
+                        for line in data.lines:
+                            line.unshare()
+
+                        data._srcdrop = False
+
+            if predata:
                 for data in self.datas:
                     data.stop()
 
@@ -1211,10 +1493,16 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 if self._dopreload:
                     data.preload()
 
+        # set here to also be active in optimization processes
+        indicator.Indicator.useruncache(
+            self.p.optcache and self._dorunonce and self._dooptimize,
+            budget=self.p.optcachesize)
+        indicator.Indicator.runcachedatas(self.datas)
+
         for stratcls, sargs, skwargs in iterstrat:
             sargs = self.datas + list(sargs)
             try:
-                strat = stratcls(*sargs, **skwargs)
+                strat = stratcls(*sargs, _owner=self, **skwargs)
             except bt.errors.StrategySkipError:
                 continue  # do not add strategy to the mix
 
@@ -1267,7 +1555,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     if writer.p.csv:
                         writer.addheaders(strat.getwriterheaders())
 
-            if not predata:
+            if self._dochunks and not all(map(self._chunkable, runstrats)):
+                self._dochunks = False
+
+            if not predata and not self._dochunks:
+                # chunks keep the buffers bounded themselves
                 for strat in runstrats:
                     strat.qbuffer(self._exactbars, replaying=self._doreplay)
 
@@ -1286,16 +1578,28 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 else:
                     self._timers.append(timer)
 
-            if self._dopreload and self._dorunonce:
-                if self.p.oldsync:
-                    self._runonce_old(runstrats)
-                else:
-                    self._runonce(runstrats)
-            else:
-                if self.p.oldsync:
-                    self._runnext_old(runstrats)
+            profiler = Profiler() if self.p.profile else None
+            try:
+                if profiler is not None:
+                    profiler.attach(self, runstrats)
+
+                if self._dopreload and self._dorunonce:
+                    if self.p.oldsync:
+                        self._runonce_old(runstrats)
+                    else:
+                        self._runonce(runstrats)
+                elif self._dochunks:
+                    self._runonce_chunks(runstrats)
                 else:
-                    self._runnext(runstrats)
+                    if self.p.oldsync:
+                        self._runnext_old(runstrats)
+                    else:
+                        self._runnext(runstrats)
+            finally:
+                if profiler is not None:
+                    # also if the run raises: no wrappers left behind
+                    profiler.detach()
+                    self.profiler = profiler
 
             for strat in runstrats:
                 strat._stop()
@@ -1489,6 +1793,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
     def _disable_runonce(self):
         '''API for lineiterators to disable runonce (see HeikinAshi)'''
         self._dorunonce = False
+        self._dochunks = False
+
+    @staticmethod
+    def _chunkable(strat):
+        # Lines with a positive ago set values in past bars, which the
+        # strategies have already gone over at the end of the previous chunk
+        objs = [strat]
+        while objs:
+            obj = objs.pop()
+            if isinstance(obj, linebuffer._LineForward):
+                return False
+
+            for its in getattr(obj, '_lineiterators', {}).values():
+                objs.extend(its)
+
+        return True
 
     def _runnext(self, runstrats):
         '''
@@ -1497,6 +1817,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         datas = sorted(self.datas,
                        key=lambda x: (x._timeframe, x._compression))
+        if self.p.nextheap and all(map(self._heapable, datas)):
+            return self._runnext_heap(runstrats, datas)
+
         datas1 = datas[1:]
         data0 = datas[0]
         d0ret = True
@@ -1641,6 +1964,103 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if self._event_stop:  # stop if requested
             return
 
+    @staticmethod
+    def _heapable(data):
+        # The next bar of the data can be looked at in advance (loaded and
+        # rewound) without changing what the data delivers later. Bounded
+        # buffers (exactbars >= 1) may drop bars when loading in advance
+        return not (data.resampling or data.replaying or data._clone or
+                    data.islive() or
+                    any(hasattr(f, 'check') for f, _, _ in data._filters) or
+                    any(x.mode == x.QBuffer for x in data.lines))
+
+    def _runnext_heap(self, runstrats, datas):
+        '''
+        Implementation of ``_runnext`` with a priority queue of datas keyed by
+        the timestamp of their next bar (already loaded and rewound). Only the
+        datas delivering at the current step are moved
+        '''
+        def peek(i, data):
+            # load/move to the next bar, queue its timestamp and go back
+            if data.next(ticks=False):
+                heapq.heappush(dheap, (data.datetime[0], i))
+                data.rewind()
+
+        dheap = []
+        for i, data in enumerate(datas):
+            peek(i, data)
+
+        dt0 = date2num(datetime.datetime.max) - 2  # default at max
+
+        while True:
+            # Notify anything from the store even before moving datas
+            # because datas may not move due to an error reported by the store
+            self._storenotify()
+            if self._event_stop:  # stop if requested
+                return
+            self._datanotify()
+            if self._event_stop:  # stop if requested
+                return
+
+            if not dheap:
+                lastret = datas[0]._last()
+                for data in datas[1:]:
+                    lastret += data._last(datamaster=datas[0])
+
+                if not lastret:
+                    # Only go extra round if something was changed by "lasts"
+                    break
+            else:
+                lastret = False
+                dt0, i = dheap[0]  # lowest index is the master with ties
+                dmaster = datas[i]
+                self._dtmaster = dmaster.num2date(dt0)
+                self._udtmaster = num2date(dt0)
+
+                due = []
+                while dheap and dheap[0][0] == dt0:
+                    due.append(heapq.heappop(dheap)[1])
+
+                for i in due:
+                    data = datas[i]
+                    data.next(ticks=False)  # bar is in the buffer
+                    data._tick_fill(force=True)
+
+                for i in due:
+                    peek(i, datas[i])
+
+            # Datas may have generated a new notification after next
+            self._datanotify()
+            if self._event_stop:  # stop if requested
+                return
+
+            self._check_timers(runstrats, dt0, cheat=True)
+            if self.p.cheat_on_open:
+                for strat in runstrats:
+                    strat._next_open()
+                    if self._event_stop:  # stop if requested
+                        return
+
+            self._brokernotify()
+            if self._event_stop:  # stop if requested
+                return
+
+            self._check_timers(runstrats, dt0, cheat=False)
+            for strat in runstrats:
+                strat._next()
+                if self._event_stop:  # stop if requested
+                    return
+
+                self._next_writers(runstrats)
+
+        # Last notification chance before stopping
+        self._datanotify()
+        if self._event_stop:  # stop if requested
+            return
+        self._storenotify()
+        if self._event_stop:  # stop if requested
+            return
+
     def _runonce(self, runstrats):
         '''
         Actual implementation of run in vector mode.
@@ -1659,24 +2079,74 @@ class Cerebro(with_metaclass(MetaParams, object)):
         datas = sorted(self.datas,
                        key=lambda x: (x._timeframe, x._compression))
 
+        self._runonce_loop(runstrats, datas)
+
+    def _runonce_chunks(self, runstrats):
+        '''
+        Implementation of run in vector mode with bounded memory (see the
+        parameter ``chunkbars``).
+
+        The datas are preloaded chunk by chunk. Each chunk is calculated by
+        the indicators at once and then processed by the strategies as in
+        ``_runonce``. The lines are then trimmed down to the values needed by
+        the largest minimum period
+        '''
+        # lines and if they are calculated (all values are used at the end
+        # of a chunk) or stepped (the values after the index are not used)
+        lines, keep = list(), 1
+        seen = set()
+        objs = list(runstrats) + list(self.datas)
+        while objs:
+            obj = objs.pop()
+            keep = max(keep, getattr(obj, '_minperiod', 1))
+            calc = getattr(obj, '_ltype', None) == Strategy.IndType
+            for line in obj.lines:
+                if id(line) not in seen:
+                    seen.add(id(line))
+                    lines.append((line, calc))
+
+            for its in getattr(obj, '_lineiterators', {}).values():
+                objs.extend(its)
+
+        keep += 1  # the value before a calculated one is also at hand
+        chunkbars = max(self.p.chunkbars, keep)
+
+        datas = sorted(self.datas,
+                       key=lambda x: (x._timeframe, x._compression))
+
+        first = True
         while True:
-            # Check next incoming date in the datas
-            dts = [d.advance_peek() for d in datas]
-            dt0 = min(dts)
-            if dt0 == float('inf'):
-                break  # no data delivers anything
-
-            # Timemaster if needed be
-            # dmaster = datas[dts.index(dt0)]  # and timemaster
-            slen = len(runstrats[0])
-            for i, dti in enumerate(dts):
-                if dti <= dt0:
-                    datas[i].advance()
-                    # self._plotfillers2[i].append(slen)  # mark as fill
+            # the first data with bars sets the datetime of the chunk end
+            loaded, dtlimit = 0, None
+            for data in self.datas:
+                if dtlimit is None:
+                    size = data.preloadchunk(size=chunkbars)
+                    if size:
+                        dtlimit = data.lines.datetime[size]
                 else:
-                    # self._plotfillers[i].append(slen)
-                    pass
+                    size = data.preloadchunk(dtlimit=dtlimit)
+
+                loaded += size
+
+            if not loaded:
+                break
+
+            for strat in runstrats:
+                strat._once()
+                if first:
+                    strat.reset()  # strat called next by next - reset lines
+
+            first = False
+
+            self._runonce_loop(runstrats, datas)
+            if self._event_stop:  # stop if requested
+                return
+
+            for line, calc in lines:
+                line.trim(keep, line.buflen() - line.trimmed if calc else None)
 
+    def _runonce_loop(self, runstrats, datas):
+        for dt0 in self._runonce_steps(datas):
             self._check_timers(runstrats, dt0, cheat=True)
 
             if self.p.cheat_on_open:
@@ -1698,6 +2168,110 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
                 self._next_writers(runstrats)
 
+    def _runonce_steps(self, datas):
+        '''
+        Generator moving the datas forward step by step in ``runonce`` mode.
+        Yields the datetime of each step once the datas delivering a bar in
+        the step have advanced
+        '''
+        # with preloadresample the datas only resampling deliver (as in
+        # _runnext) in the steps of the other datas
+        rsonly = [self.p.preloadresample and x.resampling and not x.replaying
+                  for x in datas]
+        if any(rsonly) and not all(rsonly):
+            plan = None
+        else:
+            rsonly = None
+            plan = self._runonce_plan(datas)
+
+        dt0 = date2num(datetime.datetime.max) - 2  # default at max
+        if plan is None:
+            while True:
+                # Check next incoming date in the datas
+                dts = [d.advance_peek() for d in datas]
+                dtmin = min(dts)
+                if rsonly is not None:
+                    dtmin = min(dt for dt, rs in zip(dts, rsonly) if not rs)
+                    if dtmin == float('inf'):  # only the resampled are left
+                        dtmin = min(dts)
+
+                if dtmin == float('inf'):
+                    break  # no data delivers anything
+
+                dt0 = dtmin
+                for i, dti in enumerate(dts):
+                    if dti <= dt0:
+                        datas[i].advance()
+
+                yield dt0
+
+        else:
+            stepdts, bounds, idxs = plan
+            advances = [d.advance for d in datas]
+            for step, dt0 in enumerate(stepdts):
+                for i in idxs[bounds[step]:bounds[step + 1]]:
+                    advances[i]()
+
+                yield dt0
+
+        # The bars delivered by "last" of the resamplers come in an extra
+        # step as in _runnext (see AbstractDataBase.preload)
+        lasts = [d for d in datas if len(d) < d.buflen()]
+        if lasts:
+            for d in lasts:
+                d.advance(size=d.buflen() - len(d))
+
+            yield dt0
+
+    @staticmethod
+    def _runonce_plan(datas):
+        '''
+        Merges the datetimes of the preloaded datas into the steps the
+        ``advance_peek`` loop would take: a step for each distinct datetime
+        (repeated as many times as a data repeats it) in which the datas
+        having a bar at that datetime advance.
+
+        Returns ``(stepdts, bounds, idxs)``: the datetime of each step and
+        the indices of the datas advancing in step ``n`` in
+        ``idxs[bounds[n]:bounds[n + 1]]``. Returns ``None`` if the datetimes
+        of a data are not ordered (or not stored in a plain buffer)
+        '''
+        dts, ranks, idxs = [], [], []
+        for i, data in enumerate(datas):
+            dtline = data.lines.datetime
+            if dtline.useislice:
+                return None
+
+            trimmed = dtline.trimmed  # chunked runonce
+            end = data.buflen() - data._lastbars  # lasts: see _runonce_steps
+            dt = np.asarray(dtline.getndarray()[len(data) - trimmed:
+                                                end - trimmed])
+            if not len(dt):
+                continue
+
+            if np.isnan(dt).any() or (dt[1:] < dt[:-1]).any():
+                return None
+
+            # rank of each bar among the consecutive bars with the datetime
+            pos = np.arange(len(dt))
+            first = np.r_[True, dt[1:] != dt[:-1]]
+            ranks.append(pos - np.maximum.accumulate(np.where(first, pos, 0)))
+            dts.append(dt)
+            idxs.append(np.full(len(dt), i))
+
+        if not dts:
+            return [], [0], []
+
+        dts, ranks, idxs = map(np.concatenate, (dts, ranks, idxs))
+        order = np.lexsort((idxs, ranks, dts))
+        dts, ranks, idxs = dts[order], ranks[order], idxs[order]
+
+        newstep = np.r_[True,
+                        (dts[1:] != dts[:-1]) | (ranks[1:] != ranks[:-1])]
+        starts = np.flatnonzero(newstep)
+        bounds = np.r_[starts, len(dts)]
+        return dts[starts].tolist(), bounds.tolist(), idxs.tolist()
+
     def _check_timers(self, runstrats, dt0, cheat=False):
         timers = self._timers if not cheat else self._timerscheat
         for t in timers:
@@ -22,11 +22,14 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import collections
+import copy
 import datetime
 import inspect
 import io
 import os.path
 
+import numpy as np
+
 import backtrader as bt
 from backtrader import (date2num, num2date, time2num, TimeFrame, dataseries,
                         metabase)
@@ -152,6 +155,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     _compensate = None
     _feed = None
     _store = None
+    _env = None
 
     _clone = False
     _qcheck = 0.0
@@ -162,8 +166,35 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     resampling = 0
     replaying = 0
 
+    # preloaded bars (at the end) which the "last" of the resampler
+    # delivered: held until the other datas are over if _holdlast is set
+    # (see preload)
+    _holdlast = False
+    _lastbars = 0
+
+    # attributes and params holding the source of the bars. Not pickled if
+    # _srcdrop is set, i.e.: when the preloaded lines are handed over in
+    # shared memory to optimization processes (see Cerebro optshm)
+    _srcattrs = ('_dataname',)
+    _srcparams = ('dataname',)
+    _srcdrop = False
+
     _started = False
 
+    def __getstate__(self):
+        state = vars(self).copy()
+        if self._srcdrop:
+            for attr in self._srcattrs:
+                state[attr] = None
+
+            params = copy.copy(self.p)
+            for pname in self._srcparams:
+                setattr(params, pname, None)
+
+            state['p'] = state['params'] = params
+
+        return state
+
     def _start_finish(self):
         # A live feed (for example) may have learnt something about the
         # timezones after the start and that's why the date/time related
@@ -193,7 +224,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
 
         self._calendar = cal = self.p.calendar
         if cal is None:
-            self._calendar = self._env._tradingcal
+            # that of cerebro (if added to one)
+            self._calendar = getattr(self._env, '_tradingcal', None)
         elif isinstance(cal, string_types):
             self._calendar = PandasMarketCalendar(calendar=cal)
 
@@ -208,15 +240,21 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     def _timeoffset(self):
         return self._tmoffset
 
-    def _getnexteos(self):
-        '''Returns the next eos using a trading calendar if available'''
+    def _getnexteos(self, dt=None):
+        '''Returns the next eos using a trading calendar if available
+
+        The eos is that of the current bar unless the datetime (float) of
+        another bar is given in ``dt``
+        '''
         if self._clone:
-            return self.data._getnexteos()
+            return self.data._getnexteos(dt)
 
-        if not len(self):
-            return datetime.datetime.min, 0.0
+        if dt is None:
+            if not len(self):
+                return datetime.datetime.min, 0.0
+
+            dt = self.lines.datetime[0]
 
-        dt = self.lines.datetime[0]
         dtime = num2date(dt)
         if self._calendar is None:
             nexteos = datetime.datetime.combine(dtime, self.p.sessionend)
@@ -303,6 +341,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         self._barstack = collections.deque()
         self._barstash = collections.deque()
         self._laststatus = self.CONNECTED
+        self._chunkdone = False
 
     def stop(self):
         pass
@@ -367,7 +406,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             self.tick_last = getattr(self.lines, alias0)[0]
 
     def advance_peek(self):
-        if len(self) < self.buflen():
+        if len(self) < self.buflen() - self._lastbars:
             return self.lines.datetime[1]  # return the future
 
         return float('inf')  # max date else
@@ -399,6 +438,9 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
 
     def next(self, datamaster=None, ticks=True):
 
+        if self._lastbars and len(self) >= self.buflen() - self._lastbars:
+            return False  # held bars (if any) are delivered by _last
+
         if len(self) >= self.buflen():
             if ticks:
                 self._tick_nullify()
@@ -435,11 +477,109 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         return True
 
     def preload(self):
-        while self.load():
-            pass
+        self._lastbars = 0
+        cols = None
+        if not self._tzinput:
+            resampler = self._bulkresampler()
+            if not self._filters or resampler is not None:
+                # bars need no per bar processing: try the bulk path
+                cols = self._loadbulk()
+
+            if cols is not None:
+                cols = self._bulkdates(cols)
+                if resampler is not None:
+                    cols = resampler.resamplebulk(cols)
+
+        if cols is None:
+            while self.load():
+                pass
+        else:
+            self._preloadbulk(cols)
 
+        blen = self.buflen()
         self._last()
+        if self._holdlast and self.resampling and not self.replaying:
+            # the bar delivered by "last" comes after the bars of the other
+            # datas as when resampling bar by bar
+            self._lastbars = self.buflen() - blen
+            if cols is not None:
+                self._lastbars += resampler.bulklast
+
+        self.home()
+
+    def preloadchunk(self, size=None, dtlimit=None):
+        '''Preloads the next ``size`` bars (all up to ``dtlimit`` if
+        ``size`` is ``None``) for the chunked ``runonce`` mode and moves back
+        to the current position
+
+        Returns the number of bars loaded
+        '''
+        blen = self.buflen()
+        while not self._chunkdone and \
+                (size is None or self.buflen() - blen < size):
+            if not self.load():
+                self._last()
+                self._chunkdone = True
+            elif dtlimit is not None and self.lines.datetime[0] > dtlimit:
+                # beyond the chunk: keep the bar for the next one
+                self._barstack.appendleft(
+                    [line[0] for line in self.itersize()])
+                self.backwards(force=True)
+                break
+
         self.home()
+        return self.buflen() - blen
+
+    def _bulkdates(self, cols):
+        '''Returns the column arrays returned by ``_loadbulk`` (as float
+        arrays) applying the standard date from/to filters like ``load``
+        does'''
+        dts = np.asarray(cols['datetime'], dtype=np.float64)
+
+        # bars before fromdate are discarded, the 1st after todate stops
+        past = np.flatnonzero(dts > self.todate)
+        end = past[0] if len(past) else len(dts)
+        keep = dts[:end] >= self.fromdate
+
+        return {alias: np.asarray(vals, dtype=np.float64)[:end][keep]
+                for alias, vals in cols.items()}
+
+    def _preloadbulk(self, cols):
+        '''Fills the lines with the column arrays of ``_bulkdates``'''
+        size = len(cols['datetime'])
+        for alias, line in zip(self.lines.getlinealiases(), self.lines):
+            vals = cols.get(alias)
+            if vals is None:
+                vals = np.full(size, float('NaN'))
+
+            line.forwardvals(vals)
+
+    def _bulkresampler(self):
+        '''Returns the resampler if it is the only filter and can resample
+        all bars at once during ``preload`` (see ``Resampler.resamplebulk``),
+        else ``None``'''
+        if len(self._filters) != 1:
+            return None
+
+        resampler = self._filters[0][0]
+        if not getattr(resampler, 'canresamplebulk', lambda: False)():
+            return None
+
+        return resampler
+
+    def _loadbulk(self):
+        '''Can be overriden by subclasses to deliver all remaining bars at
+        once during ``preload``.
+
+        Returns a dict with line aliases as keys and arrays of float values
+        as values (``datetime`` must be present, missing lines are filled
+        with ``NaN``) or ``None`` if not supported, in which case bars are
+        preloaded one by one with ``_load``
+
+        Not called if filters (including replaying and resampling which
+        cannot be done at once) or input timezones have to process the bars
+        '''
+        return None
 
     def _last(self, datamaster=None):
         # Last chance for filters to deliver something
@@ -455,6 +595,12 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             # consume bar(s) produced by "last"s - adding room
             pass
 
+        if self._lastbars and len(self) < self.buflen():
+            # preloaded bars produced by "last" (see preload)
+            self.advance(size=self.buflen() - len(self), ticks=False)
+            doticks = datamaster is not None
+            ret += 1
+
         if doticks:
             self._tick_fill()
 
@@ -685,11 +831,7 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
             self.f = None
 
     def preload(self):
-        while self.load():
-            pass
-
-        self._last()
-        self.home()
+        super(CSVDataBase, self).preload()
 
         # preloaded - no need to keep the object around - breaks multip in 3.x
         self.f.close()
@@ -723,6 +865,14 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
         linetokens = line.split(self.separator)
         return linetokens
 
+    def _getlines(self):
+        '''Returns the tokens of all remaining lines (for ``_loadbulk``)'''
+        if self.f is None:
+            return []
+
+        sep = self.separator
+        return [line.rstrip('\n').split(sep) for line in self.f]
+
 
 class CSVFeedBase(FeedBase):
     params = (('basepath', ''),) + CSVDataBase.params._gettuple()
@@ -807,6 +957,17 @@ class DataClone(AbstractDataBase):
 
         return True
 
+    def _loadbulk(self):
+        if not self._preloading:
+            return None
+
+        # the remaining bars of the preloaded guest data
+        data = self.data
+        start, end = len(data), data.buflen()
+        return {alias: line.getndarray()[start:end]
+                for alias, line in zip(data.lines.getlinealiases(),
+                                       data.lines)}
+
     def advance(self, size=1, datamaster=None, ticks=True):
         self._dlen += size
         super(DataClone, self).advance(size, datamaster, ticks=ticks)
@@ -22,9 +22,12 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 from datetime import date, datetime, time
+import itertools
+
+import numpy as np
 
 from .. import feed
-from ..utils import date2num
+from ..utils import date2num, dates2num
 
 
 class BacktraderCSVData(feed.CSVDataBase):
@@ -58,6 +61,34 @@ class BacktraderCSVData(feed.CSVDataBase):
 
         return True
 
+    def _loadbulk(self):
+        if type(self)._loadline is not BacktraderCSVData._loadline:
+            return None  # subclass parses lines its own way
+
+        rows = self._getlines()
+        if not rows:
+            return dict(datetime=[])
+
+        # Format is YYYY-MM-DD[,HH:MM:SS]. Rebuild it as ISO for numpy
+        tmtxt = self.p.sessionend.isoformat()
+        dts = np.array(
+            ['%s-%s-%sT%s' % (r[0][0:4], r[0][5:7], r[0][8:10],
+                              '%s:%s:%s' % (r[1][0:2], r[1][3:5], r[1][6:8])
+                              if len(r) == 8 else tmtxt)
+             for r in rows],
+            dtype='datetime64[us]')
+
+        # the last 6 fields are always open ... openinterest
+        vals = np.array(list(map(float, itertools.chain.from_iterable(
+            r[-6:] for r in rows)))).reshape(-1, 6)
+
+        cols = dict(datetime=dates2num(dts))
+        for i, alias in enumerate(('open', 'high', 'low', 'close',
+                                   'volume', 'openinterest')):
+            cols[alias] = vals[:, i]
+
+        return cols
+
 
 class BacktraderCSV(feed.CSVFeedBase):
     DataCls = BacktraderCSVData
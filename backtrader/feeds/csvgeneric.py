@@ -24,8 +24,10 @@ from __future__ import (absolute_import, division, print_function,
 from datetime import datetime
 import itertools
 
+import numpy as np
+
 from .. import feed, TimeFrame
-from ..utils import date2num
+from ..utils import date2num, dates2num
 from ..utils.py3 import integer_types, string_types
 
 
@@ -100,7 +102,7 @@ class GenericCSVData(feed.CSVDataBase):
         else:  # assume callable
             self._dtconvert = self.p.dtformat
 
-    def _loadline(self, linetokens):
+    def _loaddatetime(self, linetokens):
         # Datetime needs special treatment
         dtfield = linetokens[self.p.datetime]
         if self._dtstr:
@@ -128,12 +130,48 @@ class GenericCSVData(feed.CSVDataBase):
             dteosnum = self.date2num(dteos)  # utc'ize
 
             if dteosnum > dtnum:
-                self.lines.datetime[0] = dteosnum
-            else:
-                # Avoid reconversion if already converted dtin == dt
-                self.l.datetime[0] = date2num(dt) if self._tzinput else dtnum
+                return dteosnum
+
+            # Avoid reconversion if already converted dtin == dt
+            return date2num(dt) if self._tzinput else dtnum
+
+        return date2num(dt)
+
+    def _loaddatetimes(self, rows):
+        # Vectorized _loaddatetime for the rows of _loadbulk if possible
+        if not self._dtstr or self._tz is not None or not rows:
+            return [self._loaddatetime(r) for r in rows]
+
+        try:
+            import pandas as pd
+        except ImportError:
+            return [self._loaddatetime(r) for r in rows]
+
+        dtformat = self.p.dtformat
+        if self.p.time >= 0:
+            # add time value and format if it's in a separate field
+            dtfields = [r[self.p.datetime] + 'T' + r[self.p.time]
+                        for r in rows]
+            dtformat += 'T' + self.p.tmformat
         else:
-            self.lines.datetime[0] = date2num(dt)
+            dtfields = [r[self.p.datetime] for r in rows]
+
+        dts = pd.to_datetime(dtfields, format=dtformat).values
+        dtnums = dates2num(dts)
+
+        if self.p.timeframe >= TimeFrame.Days:
+            # check if the expected end of session is larger than parsed
+            send = self.p.sessionend
+            eos = np.timedelta64(
+                ((send.hour * 60 + send.minute) * 60 + send.second) *
+                1000000 + send.microsecond, 'us')
+            dteosnums = dates2num(dts.astype('datetime64[D]') + eos)
+            dtnums = np.where(dteosnums > dtnums, dteosnums, dtnums)
+
+        return dtnums
+
+    def _loadline(self, linetokens):
+        self.lines.datetime[0] = self._loaddatetime(linetokens)
 
         # The rest of the fields can be done with the same procedure
         for linefield in (x for x in self.getlinealiases() if x != 'datetime'):
@@ -157,6 +195,30 @@ class GenericCSVData(feed.CSVDataBase):
 
         return True
 
+    def _loadbulk(self):
+        if type(self)._loadline is not GenericCSVData._loadline:
+            return None  # subclass parses lines its own way
+
+        rows = self._getlines()
+        cols = dict(datetime=self._loaddatetimes(rows))
+
+        for linefield in (x for x in self.getlinealiases() if x != 'datetime'):
+            # Get the index created from the passed params
+            csvidx = getattr(self.params, linefield)
+
+            if csvidx is None or csvidx < 0:
+                # the field will not be present, assignt the "nullvalue"
+                cols[linefield] = np.full(len(rows), float(self.p.nullvalue))
+                continue
+
+            # if empty ... assign the "nullvalue"
+            nullvalue = float(self.p.nullvalue)
+            cols[linefield] = np.array(
+                [float(r[csvidx]) if r[csvidx] != '' else nullvalue
+                 for r in rows], dtype=np.float64)
+
+        return cols
+
 
 class GenericCSV(feed.CSVFeedBase):
     DataCls = GenericCSVData
@@ -1,3 +1,5 @@
+import functools
+
 import pandas as pd
 import numpy as np
 
@@ -6,10 +8,30 @@ class DataSynchronizer():
        Data feeds are provided with addData method
        Slices provided data feeds so that each data feed containes
         only candles with same datetimes (i.e. datas are synchronized)
-       Adds synchronized data feeds into provided cerebro"""
+       Adds synchronized data feeds into provided cerebro
+
+       Params:
+        how: join mode used to build the common timeline
+         'inner' - keep only dts present in all data feeds (default)
+         'outer' - keep dts present in any data feed, missing candles
+                   are filled with NaN and delivered as bars whose
+                   values are all NaN
+         'ffill' - as 'outer', but missing candles are forward filled
+                   with the last known candle of the data feed; a data
+                   feed starting after the beginning of the timeline
+                   starts with its own first candle (no NaN bars)
+        progress: optional callable progress(msg, pct) receiving
+                  a message and percentage of finished work"""
+
+    JOINS = ('inner', 'outer', 'ffill')
+
+    def __init__(self, how='inner', progress=None):
 
-    def __init__(self):
+        if how not in self.JOINS:
+            raise ValueError('DataSynchronizer: unknown join mode "%s"' % how)
 
+        self.how = how
+        self.progress = progress
         self.instDct = dict()
         self.dtLst = list()
 
@@ -18,38 +40,79 @@ class DataSynchronizer():
            Save instance reference to instDct"""
         self.instDct[dct['name']] = dct['method'](**dct['kwargs'])
 
+    def _notify(self, msg, pct=100.0):
+        """Pass progress info to the progress callback if any"""
+        if self.progress is not None:
+            self.progress('DataSynchronizer: %s' % msg, pct)
+
+    @staticmethod
+    def _getTimes(full):
+        """Return unique sorted datetimes of given df as datetime64 array
+           The 'time' column is used if present, index otherwise"""
+        if 'time' in full.columns:
+            return np.unique(full['time'].values)
+
+        return np.unique(full.index.values)
+
+    def _timeline(self, times):
+        """Compute common timeline of all data feeds in one pass
+           using sorted array intersection/union"""
+        if self.how == 'inner':
+            return functools.reduce(
+                lambda a, b: np.intersect1d(a, b, assume_unique=True), times)
+
+        return functools.reduce(np.union1d, times)
+
+    def _crop(self, full, timeline):
+        """Align df to given timeline according to the join mode"""
+        hastime = 'time' in full.columns
+
+        if self.how == 'inner':
+            if hastime:
+                return full[full['time'].isin(timeline)]
+            return full[full.index.isin(timeline)]
+
+        # outer/ffill joins reindex df to the whole timeline
+        df = full.set_index('time') if hastime else full
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        if self.how == 'ffill' and len(df):
+            # nothing to fill before the first candle: crop leading dts
+            timeline = timeline[timeline >= df.index.values[0]]
+
+        df = df.reindex(pd.Index(timeline, name=df.index.name),
+                        method='ffill' if self.how == 'ffill' else None)
+
+        return df.reset_index() if hastime else df
+
     def synchronize(self):
         """Actual synchronization is implemented here"""
 
         # load data into full attribute of each data feed object
+        n = len(self.instDct)
         for i, (key, inst) in enumerate(self.instDct.items()):
-            print('DataSynchronizer: initiating datafeed "%s"' % key)
+            self._notify('initiating datafeed "%s"' % key, i * 100.0 / n)
             inst.init()
             inst.p.preloaded = True
 
         # synchronize Pandas dfs
-        if all([type(inst.full) == pd.core.frame.DataFrame
+        if all([isinstance(inst.full, pd.DataFrame)
                 for inst
                 in self.instDct.values()]):
-           
-            # find dts that are present in all data feeds
-            for i, row in enumerate(list(self.instDct.values())[0].full.iterrows()):
-                print('DataSynchronizer: looking for overlapping dts %.1f%%' % \
-                      (i*100/list(self.instDct.values())[0].full.shape[0]),
-                      end='\r')
-                
-                dt = np.datetime64(row[1]['time'])
-                if all([dt in inst.full.time.values
-                        for inst
-                        in self.instDct.values()]):
-                    self.dtLst.append(dt)
-           
-            print('DataSynchronizer: looking for overlapping dts 100.0%')
+
+            # find dts of the common timeline
+            self._notify('looking for %s dts' % self.how, 0.0)
+            times = [self._getTimes(inst.full)
+                     for inst in self.instDct.values()]
+            timeline = self._timeline(times)
+            self.dtLst = list(timeline)
+            self._notify('looking for %s dts' % self.how)
 
             # crop data feeds based on datetimes in dtLst
-            print('DataSynchronizer: cropping data feeds based on overlapping dts')
-            for inst in self.instDct.values():
-                inst.full = inst.full[inst.full['time'].isin(self.dtLst)]
+            for i, (key, inst) in enumerate(self.instDct.items()):
+                self._notify('aligning datafeed "%s"' % key, i * 100.0 / n)
+                inst.full = self._crop(inst.full, timeline)
+
+            self._notify('data feeds synchronized')
 
     def process(self, cerebro):
         """Execute synchronization and add synchronized
@@ -57,6 +120,6 @@ class DataSynchronizer():
 
         self.synchronize()
 
-        print('DataSynchronizer: adding synchronized data feeds to cerebro')
+        self._notify('adding synchronized data feeds to cerebro')
         for name, inst in self.instDct.items():
             cerebro.adddata(inst, name=name)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+Binary columnar format for feed data
+
+Layout of a file (all numbers little-endian):
+
+  - 8 bytes: magic ``BTMMAP01``
+  - 8 bytes: unsigned length of the header
+  - header: utf-8 encoded JSON object with the keys ``rows`` (number of
+    bars), ``columns`` (line aliases in storage order), ``timeframe``,
+    ``compression`` and ``name``
+  - zero padding up to a multiple of 8 bytes
+  - the columns, each one holding ``rows`` contiguous float64 values
+
+The values are the ones held by the lines of the feed which was written.
+``datetime`` is therefore in the same float format and already in UTC
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import struct
+
+import numpy as np
+
+from .. import feed
+from ..utils.py3 import string_types, with_metaclass
+
+
+__all__ = ['MmapData', 'writemmap']
+
+
+MAGIC = b'BTMMAP01'
+
+
+def readmmapheader(filename):
+    '''Returns the header (dict) of a file and the offset of the columns'''
+    with open(filename, 'rb') as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError('%s is not a backtrader mmap file' % filename)
+
+        hlen, = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(hlen).decode('utf-8'))
+
+    offset = len(MAGIC) + 8 + hlen
+    return header, offset + (-offset % 8)
+
+
+def writemmap(data, filename, tz=None, calendar=None):
+    '''Writes the bars of any data feed to ``filename`` in the binary
+    columnar format read by ``MmapData``
+
+    The feed is preloaded (applying its own parameters like ``fromdate``,
+    ``todate``, filters ...) and all its lines are written. It must not be in
+    use by a running ``Cerebro``
+
+    ``tz`` and ``calendar`` (if not ``None``) replace the parameters of the
+    same name of the feed. The trading calendar of a ``Cerebro`` only applies
+    if the feed has been added to it
+
+    Returns the number of written bars
+    '''
+    if tz is not None:
+        data.p.tz = tz
+
+    if calendar is not None:
+        data.p.calendar = calendar
+
+    data.reset()
+    data._start()
+    data.preload()
+
+    try:
+        rows = data.buflen()
+        columns = list(data.lines.getlinealiases())
+        name = data._name if isinstance(data._name, string_types) else ''
+        header = dict(rows=rows, columns=columns,
+                      timeframe=data._timeframe,
+                      compression=data._compression,
+                      name=name)
+
+        hbytes = json.dumps(header).encode('utf-8')
+        offset = len(MAGIC) + 8 + len(hbytes)
+        with open(filename, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', len(hbytes)))
+            f.write(hbytes)
+            f.write(b'\0' * (-offset % 8))
+            for line in data.lines:
+                values = line.getndarray()[:rows]
+                f.write(np.ascontiguousarray(values, dtype='<f8').tobytes())
+    finally:
+        data.stop()
+
+    return rows
+
+
+class MetaMmapData(feed.DataBase.__class__):
+    def donew(cls, *args, **kwargs):
+        '''Intercept const. to take timeframe, compression and name from the
+        header of the file unless given'''
+        given = set(kwargs)
+        _obj, args, kwargs = super(MetaMmapData, cls).donew(*args, **kwargs)
+
+        # before the data is added to cerebro, where filters (resampling)
+        # and the names of the datas take the timeframe and name
+        header, _ = readmmapheader(_obj.p.dataname)
+        for pname in ('timeframe', 'compression', 'name'):
+            if pname not in given and header.get(pname) not in (None, ''):
+                setattr(_obj.p, pname, header[pname])
+
+        return _obj, args, kwargs
+
+
+class MmapData(with_metaclass(MetaMmapData, feed.DataBase)):
+    '''
+    Reads the binary columnar files created with ``writemmap`` through a
+    read-only memory map. There is no parsing: preloading copies the columns
+    to the lines in a single step
+
+    ``fromdate`` and ``todate`` are applied with a binary search on the
+    ``datetime`` column
+
+    Columns are matched by name to the line aliases. Columns without line
+    are ignored (subclass and add ``lines`` to get them) and lines without
+    column are filled with ``NaN``
+
+    ``timeframe``, ``compression`` and ``name`` are taken from the header of
+    the file unless given
+
+    Specific parameters:
+
+      - ``dataname``: The filename to read
+    '''
+    # source of the bars, not pickled when the lines are shared
+    _srcattrs = ('_mmap', '_columns')
+    _srcparams = ()
+
+    def start(self):
+        super(MmapData, self).start()
+
+        self.header, offset = readmmapheader(self.p.dataname)
+        columns = self.header['columns']
+        self._mmap = np.memmap(self.p.dataname, dtype='<f8', mode='r',
+                               offset=offset,
+                               shape=(len(columns), self.header['rows']))
+
+        aliases = self.lines.getlinealiases()
+        self._columns = [(alias, self._mmap[columns.index(alias)])
+                         for alias in aliases if alias in columns]
+        self._idx = None  # dates are known after start, see _bounds
+
+    def stop(self):
+        super(MmapData, self).stop()
+        self._mmap = self._columns = None
+
+    def _bounds(self):
+        if self._idx is None:
+            dts = dict(self._columns)['datetime']
+            self._idx = int(np.searchsorted(dts, self.fromdate, 'left'))
+            self._end = int(np.searchsorted(dts, self.todate, 'right'))
+
+        return self._idx, self._end
+
+    def _loadbulk(self):
+        idx, end = self._bounds()
+        self._idx = end
+        return dict((alias, col[idx:end]) for alias, col in self._columns)
+
+    def _load(self):
+        idx, end = self._bounds()
+        if idx >= end:
+            return False
+
+        for alias, col in self._columns:
+            getattr(self.lines, alias)[0] = col[idx]
+
+        self._idx += 1
+        return True
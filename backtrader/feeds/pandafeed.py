@@ -24,8 +24,10 @@ from __future__ import (absolute_import, division, print_function,
 from backtrader.utils.py3 import filter, string_types, integer_types
 
 from backtrader import date2num, TimeFrame
+from backtrader.utils import dates2num
 import backtrader.feed as feed
 import pandas as pd
+import numpy as np
 import datetime
 
 class PandasDirectData(feed.DataBase):
@@ -104,6 +106,30 @@ class PandasDirectData(feed.DataBase):
         # Done ... return
         return True
 
+    def _loadbulk(self):
+        if type(self)._load is not PandasDirectData._load:
+            return None
+
+        df = self.p.dataname
+        self._rows = iter(())  # all rows are delivered now
+
+        # indices refer to the tuples of "itertuples": 0 is the index
+        def column(colidx):
+            if colidx == 0:
+                return df.index.values
+
+            return df.iloc[:, colidx - 1].values
+
+        cols = dict(datetime=dates2num(column(self.p.datetime)))
+        for datafield in self.getlinealiases():
+            colidx = getattr(self.params, datafield)
+            if datafield == 'datetime' or colidx < 0:
+                continue
+
+            cols[datafield] = column(colidx)
+
+        return cols
+
 
 class PdData(feed.DataBase):
     '''
@@ -274,7 +300,78 @@ class PdData(feed.DataBase):
         return True
 
 
-class PandasData(feed.DataBase):
+class _PandasColumnar(feed.DataBase):
+    """Base for feeds keeping the rates in the pandas ``full`` attribute
+
+    The columns are extracted once as contiguous NumPy arrays (datetimes
+    converted to float dates in a single vectorized call) and bars are
+    delivered by indexing into them, avoiding a Series per bar"""
+
+    # df columns delivered to the lines of the same name (if present)
+    _columns = ('open', 'high', 'low', 'close', 'spread')
+
+    # source of the bars, not pickled when the lines are shared
+    _srcattrs = ('_dataname', 'full', '_dtarray', '_colarrays')
+    _srcparams = ('dataname', 'df')
+
+    # df column holding the datetimes of the bars (None: the index)
+    _timecol = None
+
+    def _gettimes(self):
+        """Return the datetime64 values of the bars in full"""
+        if self._timecol is None:
+            return self.full.index.values
+
+        return self.full[self._timecol].values
+
+    def _columnar(self):
+        """Extract columns of full as arrays and reset the bar index"""
+        self._idx = -1
+        self._dtarray = dates2num(self._gettimes())
+
+        aliases = self.getlinealiases()
+        self._colarrays = [
+            (col, getattr(self.lines, col),
+             self.full[col].to_numpy(np.float64))
+            for col in self._columns
+            if col in aliases and col in self.full.columns]
+
+    def stop(self):
+        if self.full is not None: self.full = None
+        self._dtarray, self._colarrays = None, []
+
+    def _load(self):
+
+        # If no file, no reading
+        if self.full is None: return False
+
+        self._idx += 1
+        if self._idx >= len(self._dtarray):
+            return False
+
+        # Put rates to lines attribute
+        i = self._idx
+        self.lines.datetime[0] = self._dtarray[i]
+        for _, line, arr in self._colarrays:
+            line[0] = arr[i]
+
+        return True
+
+    def _loadbulk(self):
+        if self.full is None or \
+           type(self)._load is not _PandasColumnar._load:
+            return None
+
+        # deliver all remaining bars at once
+        i, self._idx = self._idx + 1, len(self._dtarray)
+        cols = dict(datetime=self._dtarray[i:])
+        for col, _, arr in self._colarrays:
+            cols[col] = arr[i:]
+
+        return cols
+
+
+class PandasData(_PandasColumnar):
     """Implementation of data loading from file via pandas read_csv method"""
 
     params = dict(fileName=None, # fileName
@@ -296,6 +393,8 @@ class PandasData(feed.DataBase):
                   preloaded=False)
     
     plotinfo = dict(plot=False)
+
+    _timecol = 'time'
     
     def __init__(self):
         
@@ -334,34 +433,10 @@ class PandasData(feed.DataBase):
         # get data length
         self.p.len = self.full.shape[0]
 
-        # create row iterator
-        self.itr = self.full.iterrows()
-    
-    def stop(self):
-        if self.full is not None: self.full = None
-
-    def _load(self):
-        
-        # If no file, no reading
-        if self.full is None: return False
-        
-        try:
-            candle = next(self.itr)
-        except StopIteration:
-            return False
-        
-        # Put rates to lines attribute
-        self.lines.datetime[0] = date2num(candle[1]['time'])
-        self.lines.open[0] = candle[1]['open']
-        self.lines.high[0] = candle[1]['high']
-        self.lines.low[0] = candle[1]['low']
-        self.lines.close[0] = candle[1]['close']
-        if 'spread' in self.p.names:
-            self.lines.spread[0] = candle[1]['spread']
-        
-        return True
+        # extract column arrays
+        self._columnar()
 
-class PandasPreloaded(feed.DataBase):
+class PandasPreloaded(_PandasColumnar):
     """Implementation of data loading from file via pandas read_csv method"""
 
     params = dict(df=None,
@@ -400,29 +475,5 @@ class PandasPreloaded(feed.DataBase):
         # get data length
         self.p.len = self.full.shape[0]
 
-        # create row iterator
-        self.itr = self.full.iterrows()
-    
-    def stop(self):
-        if self.full is not None: self.full = None
-
-    def _load(self):
-        
-        # If no file, no reading
-        if self.full is None: return False
-        
-        try:
-            candle = next(self.itr)
-        except StopIteration:
-            return False
-        
-        # Put rates to lines attribute
-        self.lines.datetime[0] = date2num(candle[0])
-        self.lines.open[0] = candle[1]['open']
-        self.lines.high[0] = candle[1]['high']
-        self.lines.low[0] = candle[1]['low']
-        self.lines.close[0] = candle[1]['close']
-        if 'spread' in self.full.columns:
-            self.lines.spread[0] = candle[1]['spread']
-        
-        return True
+        # extract column arrays
+        self._columnar()
@@ -24,6 +24,8 @@ from __future__ import (absolute_import, division, print_function,
 import functools
 import math
 
+import numpy as np
+
 from .linebuffer import LineActions
 from .utils.py3 import cmp, range
 
@@ -62,15 +64,12 @@ class DivByZero(Logic):
         self[0] = self.a[0] / b if b else self.zero
 
     def once(self, start, end):
-        # cache python dictionary lookups
-        dst = self.array
-        srca = self.a.array
-        srcb = self.b.array
-        zero = self.zero
+        a = self.ndslice(self.args[0], start, end)
+        b = self.ndslice(self.args[1], start, end)
 
-        for i in range(start, end):
-            b = srcb[i]
-            dst[i] = srca[i] / b if b else zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.getndarray()[start:end] = \
+                np.where(b != 0.0, np.true_divide(a, b), self.zero)
 
 
 class DivZeroByZero(Logic):
@@ -101,20 +100,13 @@ class DivZeroByZero(Logic):
             self[0] = self.a[0] / b
 
     def once(self, start, end):
-        # cache python dictionary lookups
-        dst = self.array
-        srca = self.a.array
-        srcb = self.b.array
-        single = self.single
-        dual = self.dual
+        a = self.ndslice(self.args[0], start, end)
+        b = self.ndslice(self.args[1], start, end)
 
-        for i in range(start, end):
-            b = srcb[i]
-            a = srca[i]
-            if b == 0.0:
-                dst[i] = dual if a == 0.0 else single
-            else:
-                dst[i] = a / b
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.getndarray()[start:end] = np.where(
+                b == 0.0, np.where(a == 0.0, self.dual, self.single),
+                np.true_divide(a, b))
 
 
 class Cmp(Logic):
@@ -127,13 +119,11 @@ class Cmp(Logic):
         self[0] = cmp(self.a[0], self.b[0])
 
     def once(self, start, end):
-        # cache python dictionary lookups
-        dst = self.array
-        srca = self.a.array
-        srcb = self.b.array
+        a = self.ndslice(self.a, start, end)
+        b = self.ndslice(self.b, start, end)
 
-        for i in range(start, end):
-            dst[i] = cmp(srca[i], srcb[i])
+        self.getndarray()[start:end] = \
+            np.greater(a, b).astype(np.float64) - np.less(a, b)
 
 
 class CmpEx(Logic):
@@ -149,24 +139,13 @@ class CmpEx(Logic):
         self[0] = cmp(self.a[0], self.b[0])
 
     def once(self, start, end):
-        # cache python dictionary lookups
-        dst = self.array
-        srca = self.a.array
-        srcb = self.b.array
-        r1 = self.r1.array
-        r2 = self.r2.array
-        r3 = self.r3.array
+        a = self.ndslice(self.a, start, end)
+        b = self.ndslice(self.b, start, end)
+        r1, r2, r3 = (self.ndslice(r, start, end)
+                      for r in (self.r1, self.r2, self.r3))
 
-        for i in range(start, end):
-            ai = srca[i]
-            bi = srcb[i]
-
-            if ai < bi:
-                dst[i] = r1[i]
-            elif ai > bi:
-                dst[i] = r3[i]
-            else:
-                dst[i] = r2[i]
+        self.getndarray()[start:end] = \
+            np.where(a < b, r1, np.where(a > b, r3, r2))
 
 
 class If(Logic):
@@ -180,21 +159,27 @@ class If(Logic):
         self[0] = self.a[0] if self.cond[0] else self.b[0]
 
     def once(self, start, end):
-        # cache python dictionary lookups
-        dst = self.array
-        srca = self.a.array
-        srcb = self.b.array
-        cond = self.cond.array
+        a = self.ndslice(self.a, start, end)
+        b = self.ndslice(self.b, start, end)
+        cond = self.ndslice(self.cond, start, end)
 
-        for i in range(start, end):
-            dst[i] = srca[i] if cond[i] else srcb[i]
+        self.getndarray()[start:end] = np.where(np.not_equal(cond, 0.0), a, b)
 
 
 class MultiLogic(Logic):
+    # vectorized flogic which takes the list of the ndarray slices (or
+    # scalars) of the arguments. The loop is used if not defined
+    vlogic = None
+
     def next(self):
         self[0] = self.flogic([arg[0] for arg in self.args])
 
     def once(self, start, end):
+        if self.vlogic is not None:
+            vals = [self.ndslice(arg, start, end) for arg in self.args]
+            self.getndarray()[start:end] = self.vlogic(vals)
+            return
+
         # cache python dictionary lookups
         dst = self.array
         arrays = [arg.array for arg in self.args]
@@ -212,6 +197,7 @@ class MultiLogicReduce(MultiLogic):
         else:
             self.flogic = functools.partial(functools.reduce, self.flogic,
                                             initializer=kwargs['initializer'])
+            self.vlogic = None  # vlogic knows nothing about the initializer
 
 
 class Reduce(MultiLogicReduce):
@@ -226,33 +212,67 @@ def _andlogic(x, y):
     return bool(x and y)
 
 
+def _vandlogic(vals):
+    return functools.reduce(
+        lambda x, y: np.logical_and(x != 0.0, y != 0.0), vals)
+
+
 class And(MultiLogicReduce):
     flogic = staticmethod(_andlogic)
+    vlogic = staticmethod(_vandlogic)
 
 
 def _orlogic(x, y):
     return bool(x or y)
 
 
+def _vorlogic(vals):
+    return functools.reduce(
+        lambda x, y: np.logical_or(x != 0.0, y != 0.0), vals)
+
+
 class Or(MultiLogicReduce):
     flogic = staticmethod(_orlogic)
+    vlogic = staticmethod(_vorlogic)
+
+
+# the comparisons replicate the builtins max/min which only replace the
+# running value if the comparison holds (relevant for NaN values)
+def _vmax(vals):
+    return functools.reduce(lambda x, y: np.where(y > x, y, x), vals)
+
+
+def _vmin(vals):
+    return functools.reduce(lambda x, y: np.where(y < x, y, x), vals)
 
 
 class Max(MultiLogic):
     flogic = max
+    vlogic = staticmethod(_vmax)
 
 
 class Min(MultiLogic):
     flogic = min
+    vlogic = staticmethod(_vmin)
 
 
 class Sum(MultiLogic):
     flogic = math.fsum
 
 
+def _vanylogic(vals):
+    return np.logical_or.reduce([np.not_equal(v, 0.0) for v in vals])
+
+
 class Any(MultiLogic):
     flogic = any
+    vlogic = staticmethod(_vanylogic)
+
+
+def _valllogic(vals):
+    return np.logical_and.reduce([np.not_equal(v, 0.0) for v in vals])
 
 
 class All(MultiLogic):
     flogic = all
+    vlogic = staticmethod(_valllogic)
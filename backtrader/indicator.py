@@ -21,11 +21,12 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import collections
 
 from .utils.py3 import range, with_metaclass
 
 from .lineiterator import LineIterator, IndicatorBase
-from .lineseries import LineSeriesMaker, Lines
+from .lineseries import LineSeriesMaker, LineSeriesStub, Lines
 from .metabase import AutoInfoClass
 
 
@@ -44,11 +45,114 @@ class MetaIndicator(IndicatorBase.__class__):
     def usecache(cls, onoff):
         cls._icacheuse = onoff
 
+    # Cache of calculated values which survives the runs of strategies (the
+    # combinations of an optimization). The values of an indicator (and of
+    # all objects it creates) are keyed by class, params and the keys of the
+    # inputs. Inputs are only known if they are datas or indicators with a
+    # key. The keys of the live objects are in _rckeys (by id), rebuilt with
+    # each run of strategies
+    #
+    # Values are only stored for keys already calculated once before
+    # (_rcseen): objects used in a single combination never enter the cache.
+    # The stored values are kept within _rcbudget bytes (if not None) by
+    # evicting the least recently used
+    _rcache = collections.OrderedDict()
+    _rckeys = dict()
+    _rcseen = set()
+    _rcbytes = 0
+    _rcbudget = None
+    _rcacheuse = False
+
+    @classmethod
+    def cleanruncache(cls):
+        cls._rcache = collections.OrderedDict()
+        cls._rckeys = dict()
+        cls._rcseen = set()
+        cls._rcbytes = 0
+
+    @classmethod
+    def useruncache(cls, onoff, budget=None):
+        cls._rcacheuse = onoff
+        cls._rcbudget = budget
+
+    @classmethod
+    def runcacheget(cls, rkey):
+        '''Returns the values stored for ``rkey`` or ``None``'''
+        values = cls._rcache.get(rkey)
+        if values is not None:
+            cls._rcache.move_to_end(rkey)
+
+        return values
+
+    @classmethod
+    def runcacheput(cls, rkey, values):
+        '''Stores the arrays in ``values`` for ``rkey`` if the key has already
+        been calculated before and the arrays fit in the budget'''
+        if rkey not in cls._rcseen:
+            cls._rcseen.add(rkey)
+            return
+
+        nbytes = sum(x.nbytes for x in values)
+        budget = cls._rcbudget
+        if budget is not None and nbytes > budget:
+            return
+
+        old = cls._rcache.pop(rkey, None)
+        if old is not None:
+            cls._rcbytes -= sum(x.nbytes for x in old)
+
+        while budget is not None and cls._rcbytes + nbytes > budget:
+            _, old = cls._rcache.popitem(last=False)
+            cls._rcbytes -= sum(x.nbytes for x in old)
+
+        cls._rcache[rkey] = values
+        cls._rcbytes += nbytes
+
+    @classmethod
+    def runcachedatas(cls, datas):
+        '''Starts a run of strategies on the given ``datas``, which are keyed
+        by their position'''
+        cls._rckeys = rckeys = dict()
+        for i, data in enumerate(datas):
+            rckeys[id(data)] = ('data', i)
+            for j, line in enumerate(data.lines):
+                rckeys[id(line)] = ('data', i, j)
+
+    def _runcachekey(cls, _obj):
+        rckeys = cls._rckeys
+        dkeys = list()
+        for data in _obj.datas:
+            if isinstance(data, LineSeriesStub):
+                data = data.lines[0]
+
+            dkey = rckeys.get(id(data))
+            if dkey is None:
+                return None  # unknown input
+
+            dkeys.append(dkey)
+
+        rkey = (cls, tuple(_obj.p._getkwargs().items()), tuple(dkeys))
+        try:
+            hash(rkey)
+        except TypeError:  # some param is not hashable
+            return None
+
+        rckeys[id(_obj)] = ('ind', rkey)
+        for i, line in enumerate(_obj.lines):
+            rckeys[id(line)] = ('ind', rkey, i)
+
+        return rkey
+
     # Object cache deactivated on 2016-08-17. If the object is being used
     # inside another object, the minperiod information carried over
     # influences the first usage when being modified during the 2nd usage
 
     def __call__(cls, *args, **kwargs):
+        if cls._rcacheuse:
+            _obj = super(MetaIndicator, cls).__call__(*args, **kwargs)
+            _obj._rkey = cls._runcachekey(_obj)
+            return _obj
+
         if not cls._icacheuse:
             return super(MetaIndicator, cls).__call__(*args, **kwargs)
 
@@ -92,6 +196,38 @@ class Indicator(with_metaclass(MetaIndicator, IndicatorBase)):
 
     csv = False
 
+    _rkey = None  # key for the run cache
+
+    def _runcachelines(self):
+        # lines of the indicator and of all objects it has created, which
+        # are calculated during _once. Ordered and unique
+        lines = list(self.lines)
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            if isinstance(indicator, Indicator):
+                lines.extend(indicator._runcachelines())
+            else:
+                lines.extend(indicator.lines)  # LineActions
+
+        seen = set()
+        return [x for x in lines if id(x) not in seen and not seen.add(id(x))]
+
+    def _once(self):
+        if self._rkey is None:
+            return super(Indicator, self)._once()
+
+        lines = self._runcachelines()
+        cached = Indicator.runcacheget(self._rkey)
+        if cached is None or len(cached) != len(lines):
+            super(Indicator, self)._once()
+            Indicator.runcacheput(self._rkey,
+                                  [x.getndarray().copy() for x in lines])
+            return
+
+        # Same indicator on the same inputs already calculated
+        for line, values in zip(lines, cached):
+            line.forwardvals(values)
+            line.home()
+
     def advance(self, size=1):
         # Need intercepting this call to support datas with
         # different lengths (timeframes)
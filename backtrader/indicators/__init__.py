@@ -90,3 +90,6 @@ from .ols import *
 from .hadelta import *
 
 from .sinTrans import *
+
+# Load contributed indicators
+from . import contrib
@@ -25,11 +25,106 @@ import functools
 import math
 import operator
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
 from ..utils.py3 import map, range
 
 from . import Indicator
 
 
+# Smallest running product of the decay factor allowed inside a block of the
+# closed form exponential smoothing (keeps the rescaled terms well-conditioned)
+_EXPSMOOTH_LOGMIN = math.log(1e-8)
+
+
+def _nanwindows(src, start, end, period):
+    '''
+    Returns the positions (relative to ``start``) of the windows of ``period``
+    values ending in [start, end) which contain at least one NaN
+    '''
+    nans = np.isnan(src[start - period + 1:end])
+    counts = np.concatenate(([0], np.cumsum(nans)))
+    return np.flatnonzero(counts[period:] - counts[:-period])
+
+
+def _fsumrows(windows):
+    '''
+    Sums of the rows of the 2d array ``windows``, equal to the ones of
+    ``math.fsum`` unless the rounding errors of the additions cancel out
+    beyond twice the float precision
+
+    The rounding errors of the additions (column by column) are accumulated
+    apart (compensated summation) and added at the end. Rows with non-finite
+    values get the plain sum
+
+    Returns:
+      a ``numpy.ndarray`` with the sums
+    '''
+    s = windows[:, 0].copy()
+    err = np.zeros(len(s))
+    with np.errstate(invalid='ignore'):
+        for i in range(1, windows.shape[1]):
+            x = windows[:, i]
+            t = s + x
+            z = t - s
+            err += (s - (t - z)) + (x - z)
+            s = t
+
+    return np.where(np.isfinite(err), s + err, s)
+
+
+def _expsmooth(src, alpha, alpha1, prev):
+    '''
+    Vectorized recursive filter ``prev = prev * alpha1 + src * alpha``
+
+    ``alpha`` and ``alpha1`` can be scalars or arrays of the same length as
+    ``src``. ``scipy.signal.lfilter`` is used for scalar factors if available.
+    Else the closed form is evaluated in blocks short enough for the running
+    product of ``alpha1`` not to vanish. Factors outside (0, inf) fall back to
+    the plain loop
+
+    The results differ from the ones of the loop in the last digits (relative
+    differences in the order of 1e-15 per step, growing with the length of
+    the blocks)
+
+    Returns:
+      a ``numpy.ndarray`` with the smoothed values
+    '''
+    if lfilter is not None and np.ndim(alpha1) == 0:
+        return lfilter([alpha], [1.0, -alpha1], src, zi=[prev * alpha1])[0]
+
+    alpha1 = np.broadcast_to(np.asarray(alpha1, dtype=np.float64), src.shape)
+    asrc = src * alpha
+    out = np.empty(len(src))
+
+    lo, hi = np.min(alpha1, initial=1.0), np.max(alpha1, initial=1.0)
+    if not lo > 0.0 or not np.isfinite(hi):
+        for i in range(len(src)):
+            out[i] = prev = prev * alpha1[i] + asrc[i]
+        return out
+
+    block = len(src)
+    if lo < 1.0:
+        block = min(block, int(_EXPSMOOTH_LOGMIN / math.log(lo)))
+    if hi > 1.0:
+        block = min(block, int(-_EXPSMOOTH_LOGMIN / math.log(hi)))
+    block = max(1, block)
+
+    for b in range(0, len(src), block):
+        prods = np.cumprod(alpha1[b:b + block])
+        out[b:b + block] = blk = \
+            prods * (prev + np.cumsum(asrc[b:b + block] / prods))
+        prev = blk[-1]
+
+    return out
+
+
 class PeriodN(Indicator):
     '''
     Base class for indicators which take a period (__init__ has to be called
@@ -54,13 +149,23 @@ class OperationN(PeriodN):
     Note:
       Base classes must provide a "func" attribute which is a callable
 
+      Base classes may provide a "vfunc" attribute, a vectorized version of
+      "func" which takes a 2d array with one window of data per row and
+      returns the 1d array of results. It is used in runonce mode. Windows
+      with NaN values are still handed over to "func"
+
     Formula:
       - line = func(data, period)
     '''
+    vfunc = None
+
     def next(self):
         self.line[0] = self.func(self.data.get(size=self.p.period))
 
     def once(self, start, end):
+        if self.vfunc is not None:
+            return self._oncev(start, end)
+
         dst = self.line.array
         src = self.data.array
         period = self.p.period
@@ -69,6 +174,21 @@ class OperationN(PeriodN):
         for i in range(start, end):
             dst[i] = func(src[i - period + 1: i + 1])
 
+    def _oncev(self, start, end):
+        if start >= end:
+            return
+
+        dst = self.line.getndarray()
+        src = self.data.getndarray()
+        period = self.p.period
+
+        windows = sliding_window_view(src[start - period + 1:end], period)
+        res = self.vfunc(windows)
+        for i in _nanwindows(src, start, end, period):
+            res[i] = self.func(windows[i])
+
+        dst[start:end] = res
+
 
 class BaseApplyN(OperationN):
     '''
@@ -112,6 +232,7 @@ class Highest(OperationN):
     alias = ('MaxN',)
     lines = ('highest',)
     func = max
+    vfunc = functools.partial(np.max, axis=1)
 
 
 class Lowest(OperationN):
@@ -126,6 +247,7 @@ class Lowest(OperationN):
     alias = ('MinN',)
     lines = ('lowest',)
     func = min
+    vfunc = functools.partial(np.min, axis=1)
 
 
 class ReduceN(OperationN):
@@ -163,13 +285,15 @@ class SumN(OperationN):
     Calculates the Sum of the data values over a given period
 
     Uses ``math.fsum`` for the calculation rather than the built-in ``sum`` to
-    avoid precision errors
+    avoid precision errors (and a compensated summation of the windows which
+    delivers the same sums in runonce mode)
 
     Formula:
       - sumn = sum(data, period)
     '''
     lines = ('sumn',)
     func = math.fsum
+    vfunc = staticmethod(_fsumrows)
 
 
 class AnyN(OperationN):
@@ -322,20 +446,17 @@ class Accum(Indicator):
         self.line[0] = self.line[-1] + self.data[0]
 
     def oncestart(self, start, end):
-        dst = self.line.array
-        src = self.data.array
-        prev = self.p.seed
-
-        for i in range(start, end):
-            dst[i] = prev = prev + src[i]
+        self._accum(start, end, self.p.seed)
 
     def once(self, start, end):
-        dst = self.line.array
-        src = self.data.array
-        prev = dst[start - 1]
+        self._accum(start, end, self.line.array[start - 1])
 
-        for i in range(start, end):
-            dst[i] = prev = prev + src[i]
+    def _accum(self, start, end, prev):
+        # prepending prev keeps the order of the additions of the loop
+        dst = self.line.getndarray()
+        src = self.data.getndarray()
+        dst[start:end] = \
+            np.cumsum(np.concatenate(([prev], src[start:end])))[1:]
 
 
 class Average(PeriodN):
@@ -356,12 +477,15 @@ class Average(PeriodN):
             math.fsum(self.data.get(size=self.p.period)) / self.p.period
 
     def once(self, start, end):
-        src = self.data.array
-        dst = self.line.array
+        if start >= end:
+            return
+
+        src = self.data.getndarray()
+        dst = self.line.getndarray()
         period = self.p.period
 
-        for i in range(start, end):
-            dst[i] = math.fsum(src[i - period + 1:i + 1]) / period
+        windows = sliding_window_view(src[start - period + 1:end], period)
+        dst[start:end] = _fsumrows(windows) / period
 
 
 class ExponentialSmoothing(Average):
@@ -401,15 +525,13 @@ class ExponentialSmoothing(Average):
         super(ExponentialSmoothing, self).once(start, end)
 
     def once(self, start, end):
-        darray = self.data.array
-        larray = self.line.array
-        alpha = self.alpha
-        alpha1 = self.alpha1
+        darray = self.data.getndarray()
+        larray = self.line.getndarray()
 
         # Seed value from SMA calculated with the call to oncestart
         prev = larray[start - 1]
-        for i in range(start, end):
-            larray[i] = prev = prev * alpha1 + darray[i] * alpha
+        larray[start:end] = _expsmooth(
+            darray[start:end], self.alpha, self.alpha1, prev)
 
 
 class ExponentialSmoothingDynamic(ExponentialSmoothing):
@@ -444,15 +566,14 @@ class ExponentialSmoothingDynamic(ExponentialSmoothing):
             self.line[-1] * self.alpha1[0] + self.data[0] * self.alpha[0]
 
     def once(self, start, end):
-        darray = self.data.array
-        larray = self.line.array
-        alpha = self.alpha.array
-        alpha1 = self.alpha1.array
+        darray = self.data.getndarray()
+        larray = self.line.getndarray()
+        alpha = self.alpha.getndarray()[start:end]
+        alpha1 = self.alpha1.getndarray()[start:end]
 
         # Seed value from SMA calculated with the call to oncestart
         prev = larray[start - 1]
-        for i in range(start, end):
-            larray[i] = prev = prev * alpha1[i] + darray[i] * alpha[i]
+        larray[start:end] = _expsmooth(darray[start:end], alpha, alpha1, prev)
 
 
 class WeightedAverage(PeriodN):
@@ -483,12 +604,15 @@ class WeightedAverage(PeriodN):
         self.line[0] = self.p.coef * math.fsum(dataweighted)
 
     def once(self, start, end):
-        darray = self.data.array
-        larray = self.line.array
+        darray = self.data.getndarray()
+        larray = self.line.getndarray()
         period = self.p.period
-        coef = self.p.coef
-        weights = self.p.weights
 
-        for i in range(start, end):
-            data = darray[i - period + 1: i + 1]
-            larray[i] = coef * math.fsum(map(operator.mul, data, weights))
+        # weight by weight over shifted views of the data to avoid
+        # materializing the windows
+        first = start - period + 1
+        res = np.zeros(end - start)
+        for j, weight in enumerate(self.p.weights[:period]):
+            res += darray[first + j:end - period + 1 + j] * weight
+
+        larray[start:end] = self.p.coef * res
@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 from . import MovingAverageBase, ExponentialSmoothing
+from .basicops import _expsmooth
 import numpy as np
 
 class ExponentialMovingAverage(MovingAverageBase):
@@ -84,3 +85,18 @@ class EMA(MovingAverageBase):
     def next(self):
 
         self.l.ema[0] = self.l.ema[-1] + self.c * (self.data[0] - self.l.ema[-1])
+
+    def oncestart(self, start, end):
+        src = self.data.getndarray()
+        dst = self.l.ema.getndarray()
+        period = self.p.period
+
+        for i in range(start, end):
+            dst[i] = np.mean(src[i - period + 1:i + 1]) / period
+
+    def once(self, start, end):
+        src = self.data.getndarray()
+        dst = self.l.ema.getndarray()
+
+        dst[start:end] = _expsmooth(src[start:end], self.c, 1.0 - self.c,
+                                    dst[start - 1])
@@ -21,6 +21,8 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import numpy as np
+
 from . import PeriodN
 
 
@@ -55,9 +57,23 @@ class HurstExponent(PeriodN):
     The original values (40, 2, self.p.period / 2) are kept for backwards
     compatibility
 
+    Calculation:
+
+      - The standard deviations of the lagged differences come from the sums
+        of the differences and of their squares in the window. The slope of
+        the linear fit is a dot product with precalculated weights
+
+      - ``runonce``: the window sums of all bars are calculated with
+        cumulative sums, lag by lag, in batches of bars
+
+      - ``next``: the window sums are updated with the difference entering
+        and the one leaving the window, i.e.: O(lags) per bar. They are
+        recalculated from scratch every ``period`` bars to avoid accumulating
+        rounding errors and when a ``NaN`` enters or leaves the window
+
     '''
     frompackages = (
-        ('numpy', ('asarray', 'log10', 'polyfit', 'sqrt', 'std', 'subtract')),
+        ('numpy', ('asarray', 'log10', 'subtract')),
     )
 
     alias = ('Hurst',)
@@ -82,15 +98,92 @@ class HurstExponent(PeriodN):
         self.lags = asarray(range(lag_start, lag_end))
         self.log10lags = log10(self.lags)
 
-    def next(self):
-        # Fetch the data
-        ts = asarray(self.data.get(size=self.p.period))
-
-        # Calculate the array of the variances of the lagged differences
-        tau = [sqrt(std(subtract(ts[lag:], ts[:-lag]))) for lag in self.lags]
+        # slope of the linear fit of y on log10lags == dot(_lsqw, y)
+        dev = self.log10lags - self.log10lags.mean()
+        self._lsqw = dev / dev.dot(dev)
+        self._counts = self.p.period - self.lags  # differences per window
+        self._batch = max(1024, 2 ** 22 // max(1, len(self.lags)))
+
+    def _hurst(self, s1, s2):
+        # s1/s2: sums of the lagged differences and of their squares
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = np.maximum(s2 / self._counts - (s1 / self._counts) ** 2, 0.0)
+            # log10(tau) = log10(sqrt(std)) = log10(var) / 4
+            return 2.0 * np.dot(np.log10(var) / 4.0, self._lsqw)
+
+    def _rollreset(self, line):
+        ts = line.getndarray()[line.idx - self.p.period + 1:line.idx + 1]
+        self._shift = shift = np.empty(len(self.lags))
+        self._s1 = np.zeros(len(self.lags))
+        self._s2 = np.zeros(len(self.lags))
+        for i, lag in enumerate(self.lags):
+            diffs = subtract(ts[lag:], ts[:-lag])
+            shift[i] = diffs.mean()
+            diffs -= shift[i]  # keeps the sums well-conditioned
+            self._s1[i] = diffs.sum()
+            self._s2[i] = diffs.dot(diffs)
+
+        self._rolled = 0
+
+    def qbuffer(self, savemem=0):
+        super(HurstExponent, self).qbuffer(savemem=savemem)
+        # keep the value leaving the window for the incremental sums
+        for data in self.datas:
+            data.minbuffer(self._minperiod + 1)
+
+    def nextstart(self):
+        self._rollreset(self.data.lines[0])
+        self.lines.hurst[0] = self._hurst(self._s1, self._s2)
 
-        # Use a linear fit to estimate the Hurst Exponent
-        poly = polyfit(self.log10lags, log10(tau), 1)
-
-        # Return the Hurst exponent from the polyfit output
-        self.lines.hurst[0] = poly[0] * 2.0
+    def next(self):
+        line = self.data.lines[0]
+        ts, idx, lags = line.getndarray(), line.idx, self.lags
+        last = idx - self.p.period  # value which just left the window
+        self._rolled += 1
+        if (last < 0 or self._rolled >= self.p.period or
+                np.isnan(ts[idx]) or np.isnan(ts[last])):
+            # value leaving the window not in the buffer, time to refresh or
+            # a NaN entering/leaving the window (the sums are NaN with it)
+            self._rollreset(line)
+        else:
+            din = ts[idx] - ts[idx - lags] - self._shift
+            dout = ts[last + lags] - ts[last] - self._shift
+            self._s1 += din - dout
+            self._s2 += din * din - dout * dout
+
+        self.lines.hurst[0] = self._hurst(self._s1, self._s2)
+
+    def once(self, start, end):
+        src = self.data.getndarray()
+        dst = self.line.getndarray()
+        period = self.p.period
+
+        for bstart in range(start, end, self._batch):
+            bend = min(end, bstart + self._batch)
+            dst[bstart:bend] = self._hurstbatch(src[bstart - period + 1:bend])
+
+    def _hurstbatch(self, ts):
+        # Hurst exponents of all windows of period values in ts
+        size = len(ts) - self.p.period + 1
+        hurst = np.zeros(size)
+        nans = np.zeros(size, dtype=bool)
+        for lag, count, weight in zip(self.lags, self._counts, self._lsqw):
+            diffs = subtract(ts[lag:], ts[:-lag])
+            isnan = np.isnan(diffs)
+            if isnan.any():  # flag the windows and keep the sums clean
+                cnan = np.concatenate(([0], np.cumsum(isnan)))
+                nans |= (cnan[count:count + size] - cnan[:size]) > 0
+                diffs[isnan] = 0.0
+
+            diffs -= diffs.mean()  # keeps the sums well-conditioned
+            c1 = np.concatenate(([0.0], np.cumsum(diffs)))
+            c2 = np.concatenate(([0.0], np.cumsum(diffs * diffs)))
+            s1 = c1[count:count + size] - c1[:size]
+            s2 = c2[count:count + size] - c2[:size]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                var = np.maximum(s2 / count - (s1 / count) ** 2, 0.0)
+                hurst += weight * np.log10(var) / 2.0
+
+        hurst[nans] = float('NaN')
+        return hurst
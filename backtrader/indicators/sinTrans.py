@@ -1,12 +1,30 @@
 from backtrader import Indicator
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
 
 class SinTransform(Indicator):
-    """Implementation of sinus transform indicator"""
+    """Implementation of sinus transform indicator
+
+       Params:
+        pastBars: number of candles the harmonics are fitted to
+        predBars: number of forecasted candles
+        harmNo: number of fitted harmonics
+        warmStart: start the Quinn-Fernandes frequency iteration from the
+                   solution of the previous candle (of the previous batch
+                   in runonce mode) instead of the cold start. From a
+                   different starting point the iteration may converge to
+                   a different frequency: the forecasts can then differ
+                   markedly from the cold start ones and between runonce
+                   and next mode"""
     
     lines = ('pred',)
     
-    params = dict(pastBars=300, predBars=100, harmNo=1)
+    params = dict(pastBars=300, predBars=100, harmNo=1, warmStart=False)
     
     # Parameters for plotting
     plotinfo = dict(
@@ -26,72 +44,101 @@ class SinTransform(Indicator):
         plothlines = [50])
     
     
-    def calcFreq(self, priceArray, pv, pastBars):
-        """Quinn-Fernandes algorithm to fit constants w,m,c,s"""
-        
-        z = np.zeros(pastBars)
-        a = 0.0
-        b = 2.0
-        z[0] = priceArray[0] - pv[0];
-        
-        while(abs(a-b) > 0.0001):
-            a = b
-            z[1] = priceArray[1] - pv[1] + a*z[0]
-            num=z[0]*z[1]
-            den=z[0]*z[0]
-            for i in range(2,pastBars):
-                z[i] = priceArray[i] - pv[i] + a*z[i-1] - z[i-2]
-                num += z[i-1]*(z[i]+z[i-2])
-                den += z[i-1]*z[i-1]
-            b = num/den
-        
-        w = np.arccos(b/2.0)
-        
-        Sc = 0.0
-        Ss = 0.0
-        Scc = 0.0
-        Sss = 0.0
-        Scs = 0.0
-        Sx = 0.0
-        Sxx = 0.0
-        Sxc = 0.0
-        Sxs = 0.0
-        
-        for i in range(0, pastBars):
-            cos = np.cos(w*i)
-            sin = np.sin(w*i)
-            Sc += cos
-            Ss += sin
-            Scc += cos*cos
-            Sss += sin*sin
-            Scs += cos*sin
-            Sx += priceArray[i] - pv[i]
-            Sxx += (priceArray[i] - pv[i])**2
-            Sxc += (priceArray[i] - pv[i])*cos
-            Sxs += (priceArray[i] - pv[i])*sin
-            
-        Sc /= pastBars
-        Ss /= pastBars
-        Scc /= pastBars
-        Sss /= pastBars
-        Scs /= pastBars
-        Sx /= pastBars
-        Sxx /= pastBars
-        Sxc /= pastBars
-        Sxs /= pastBars
-        
-        if w == 0.0:
-            m = Sx
-            c = 0.0
-            s = 0.0
-        else:
+    def calcFreq(self, priceArray, pv, pastBars, start=2.0):
+        """Quinn-Fernandes algorithm to fit constants w,m,c,s
+           The frequency iteration starts from start (2.0: cold start)"""
+        x = (np.asarray(priceArray[:pastBars], float) - pv[:pastBars])
+        w, m, c, s, _ = self.fitFreq(x[None, :], np.array([start]))
+        return w[0], m[0], c[0], s[0]
+
+    @staticmethod
+    def filterZ(x, a):
+        """z[i] = x[i] + a*z[i-1] - z[i-2] for each row of x
+           (one a per row)"""
+        if len(x) == 1:
+            if lfilter is not None:
+                return lfilter([1.0], [1.0, -a[0], 1.0], x, axis=-1)
+
+            a = float(a[0])
+            z = x[0].tolist()
+            z[1] += a*z[0]
+            for i in range(2, len(z)):
+                z[i] += a*z[i-1] - z[i-2]
+            return np.array([z])
+
+        # many rows: run the recursion over the columns
+        z = x.copy()
+        z[:, 1] += a*z[:, 0]
+        for i in range(2, x.shape[1]):
+            z[:, i] += a*z[:, i-1] - z[:, i-2]
+        return z
+
+    @classmethod
+    def iterFreq(cls, x, start, maxiter=None):
+        """Quinn-Fernandes frequency iteration for each row of x
+           Returns b and the mask of rows which have converged
+           within maxiter iterations"""
+        b = np.array(start, float)
+        active = np.ones(len(x), dtype=bool)
+        niter = 0
+        while active.any() and (maxiter is None or niter < maxiter):
+            niter += 1
+            a = b[active]
+            z = cls.filterZ(x[active], a)
+            num = np.einsum('ij,ij->i', z[:, 1:-1], z[:, 2:] + z[:, :-2])
+            num += z[:, 0]*z[:, 1]
+            den = np.einsum('ij,ij->i', z[:, :-1], z[:, :-1])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                b[active] = num/den
+            # NaN compares False: such rows stop as in the scalar loop
+            active[active] = abs(a - b[active]) > 0.0001
+
+        return b, ~active
+
+    @classmethod
+    def fitFreq(cls, x, start, warmiter=50):
+        """Vectorized Quinn-Fernandes fit of w,m,c,s for each row of x
+           Rows not converging within warmiter iterations from start
+           are iterated again from the cold start 2.0"""
+        b, done = cls.iterFreq(x, start, warmiter)
+        if not done.all():
+            b[~done] = cls.iterFreq(x[~done], np.full((~done).sum(), 2.0))[0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.arccos(b/2.0)
+
+            wi = np.outer(w, np.arange(x.shape[1]))
+            cos = np.cos(wi)
+            sin = np.sin(wi)
+
+            Sc = cos.mean(axis=1)
+            Ss = sin.mean(axis=1)
+            Scc = np.einsum('ij,ij->i', cos, cos)/x.shape[1]
+            Sss = np.einsum('ij,ij->i', sin, sin)/x.shape[1]
+            Scs = np.einsum('ij,ij->i', cos, sin)/x.shape[1]
+            Sx = x.mean(axis=1)
+            Sxc = np.einsum('ij,ij->i', x, cos)/x.shape[1]
+            Sxs = np.einsum('ij,ij->i', x, sin)/x.shape[1]
+
             den = (Scs-Sc*Ss)**2 - (Scc-Sc*Sc)*(Sss-Ss*Ss)
             c = ((Sxs-Sx*Ss)*(Scs-Sc*Ss) - (Sxc-Sx*Sc)*(Sss-Ss*Ss))/den
             s = ((Sxc-Sx*Sc)*(Scs-Sc*Ss) - (Sxs-Sx*Ss)*(Scc-Sc*Sc))/den
             m = Sx-c*Sc-s*Ss
-        
-        return w, m, c, s
-    
+
+        flat = w == 0.0
+        m = np.where(flat, Sx, m)
+        c = np.where(flat, 0.0, c)
+        s = np.where(flat, 0.0, s)
+
+        return w, m, c, s, b
+
+    def iterStart(self, h):
+        """Start of the frequency iteration of harmonic h"""
+        b = self.bs[h]
+        if self.p.warmStart and abs(b) < 2.0:  # False for NaN too
+            return b
+        return 2.0
+
     def _plotlabel(self):
         # This method returns a list of labels that will be displayed
         # behind the name of the indicator on the plot
@@ -105,50 +152,74 @@ class SinTransform(Indicator):
     def __init__(self):
         self.addminperiod(self.params.pastBars)
         self.cnt = 0
-        
+        # last solution (b = 2*cos(w)) of each harmonic for warm starts
+        self.bs = [2.0] * self.p.harmNo
+
     def prenext(self):
         self.cnt += 1
-        
+
+    def fitHarmonics(self, priceArray):
+        """Fit harmNo harmonics to the rows of priceArray (latest candles
+           first). Returns the mean price and the w,m,c,s of each harmonic"""
+        idx = np.arange(priceArray.shape[1])
+        averPrice = priceArray.mean(axis=1)
+        pv = np.repeat(averPrice[:, None], priceArray.shape[1], axis=1)
+
+        fits = []
+        for h in range(self.p.harmNo):
+            start = np.full(len(priceArray), self.iterStart(h))
+            w, m, c, s, b = self.fitFreq(priceArray - pv, start)
+            self.bs[h] = b[-1]
+            wi = np.outer(w, idx)
+            pv += m[:, None] + c[:, None]*np.cos(wi) + s[:, None]*np.sin(wi)
+            fits.append((w, m, c, s))
+
+        return averPrice, fits
+
+    def forecast(self, averPrice, fits, row=-1):
+        """Forecast curve of predBars values of given row"""
+        j = np.arange(self.p.predBars)
+        fv = np.full(self.p.predBars, averPrice[row])
+        for w, m, c, s in fits:
+            fv += m[row] + c[row]*np.cos(w[row]*j) - s[row]*np.sin(w[row]*j)
+        return fv
+
     def next(self):
         self.cnt += 1
-        # Get price array
-        priceArrayRev = self.data.open.get(ago=0,size=self.p.pastBars)
-        # Reverse price array (latest candles first)
-        priceArray = np.empty(0, float)
-        for i in range(self.p.pastBars):
-            priceArray = np.append(priceArray, priceArrayRev[self.p.pastBars-1-i])
-        
-        pv = np.zeros(self.p.pastBars)
-        fv = np.zeros(self.p.predBars)
-        # Calculate mean value from price array and put it to lines
-        averPrice = np.mean(priceArray)
-        for i in range(self.p.pastBars):
-            pv[i] = averPrice
-        for i in range(self.p.predBars):
-            fv[i] = averPrice
-        
-        # Calculate transform function
-        for _ in range(self.p.harmNo):
-            # Calculate function parameters
-            w, m, c, s = self.calcFreq(priceArray, pv, self.p.pastBars)
-            #if self.cnt == self.p.pastBars:
-            #        print(w,m,c,s)
-            # Create lines
-            for i in range(self.p.pastBars):
-                pv[i] += m + c*np.cos(w*i) + s*np.sin(w*i)
-            for i in range(self.p.predBars):
-                fv[i] += m + c*np.cos(w*i) - s*np.sin(w*i)
-        
-        # Write resulting curves to lines
-        #for i in range(self.p.pastBars):
-        #    pastTrans[self.p.pastBars-1-i] = pv[self.p.pastBars-1-i]
+        # Get price array, reversed (latest candles first)
+        priceArray = np.asarray(
+            self.data.open.get(ago=0, size=self.p.pastBars))[None, ::-1]
+
+        fv = self.forecast(*self.fitHarmonics(priceArray))
+
+        # Write resulting curve to lines
         for i in range(self.p.predBars):
-            #print(self.p.predBars-1-i, fv[i], self.lines.predTrans[self.p.predBars-1-i])
             self.lines.pred[-(self.p.predBars-1-i)] = fv[i]
-        
-        #if self.cnt == self.p.pastBars:
-        #    with open('/home/jan/forex/oanda-api/fftVal', 'w') as file:
-        #        for i in range(self.p.pastBars):
-        #            file.write(str(pv[self.p.pastBars-1-i])+'\n')
-        #        for i in range(self.p.predBars):
-        #            file.write(str(fv[i])+'\n')
+
+    def once(self, start, end):
+        """Fit the windows of the full history in batches. The windows of
+           a batch are warm-started from the last solution of the previous
+           batch"""
+        src = self.data.open.getndarray()
+        dst = self.lines.pred.getndarray()
+        pastBars, predBars = self.p.pastBars, self.p.predBars
+        batch = max(1, 2**20 // pastBars)
+
+        for bstart in range(start, end, batch):
+            bend = min(end, bstart + batch)
+            windows = sliding_window_view(
+                src[bstart - pastBars + 1:bend], pastBars)[:, ::-1]
+            averPrice, fits = self.fitHarmonics(windows)
+
+            # Each bar writes its forecast to the last predBars bars. The
+            # first value of the forecasts is the one to remain
+            fv = averPrice + sum(m + c for w, m, c, s in fits)
+            pos = np.arange(bstart, bend) - (predBars - 1)
+            dst[pos[pos >= 0]] = fv[pos >= 0]
+
+        if end > start:
+            # the forecast of the last bar remains in full
+            dst[max(0, end - predBars):end] = \
+                self.forecast(averPrice, fits)[max(0, predBars - end):]
+
+        self.cnt = end
@@ -32,12 +32,18 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import array
-import collections
 import datetime
-from itertools import islice
+import functools
 import math
+import numbers
+import operator
 import numpy as np
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
 from .utils.py3 import range, with_metaclass, string_types
 
 from .lineroot import LineRoot, LineSingle, LineMultiple
@@ -47,6 +53,200 @@ from .utils import num2date, time2num
 
 NAN = float('NaN')
 
+# numpy equivalents of the operations applied by LinesOperation and
+# LineOwnOperation, used to calculate a whole "once" slice in one go
+_UFUNCS = {
+    operator.add: np.add,
+    operator.sub: np.subtract,
+    operator.mul: np.multiply,
+    operator.truediv: np.true_divide,
+    operator.floordiv: np.floor_divide,
+    operator.mod: np.remainder,
+    operator.lt: np.less,
+    operator.gt: np.greater,
+    operator.le: np.less_equal,
+    operator.ge: np.greater_equal,
+    operator.eq: np.equal,
+    operator.ne: np.not_equal,
+}
+
+# python raises exceptions where numpy delivers nan/inf for finite operands.
+# The loop is used in that case to keep the original behavior. (pow is left
+# out, numpy and python round some results differently)
+_UFUNCS_STRICT = (np.true_divide, np.floor_divide, np.remainder)
+
+_OWNUFUNCS = {
+    abs: np.absolute,
+    operator.abs: np.absolute,
+    operator.neg: np.negative,
+    operator.pos: np.positive,
+    bool: functools.partial(np.not_equal, 0.0),
+}
+
+
+class NumPyBuffer(object):
+    '''
+    Growable buffer of float64 values backed by a ``numpy.ndarray``
+
+    It offers the subset of the ``array.array`` interface used by
+    ``LineBuffer`` (indexing, slicing, append, pop, extend, frombytes). The
+    capacity is doubled when exhausted, which keeps appends amortized O(1)
+
+    The property ``ndarray`` returns a zero-copy view of the valid range. The
+    view is no longer backing the buffer after a reallocation (growth)
+    '''
+    typecode = str('d')
+
+    def __init__(self, capacity=64):
+        self._buf = np.empty(capacity, dtype=np.float64)
+        self._len = 0
+
+    @property
+    def ndarray(self):
+        return self._buf[:self._len]
+
+    def _reserve(self, size):
+        capacity = len(self._buf)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        buf = np.empty(capacity, dtype=np.float64)
+        buf[:self._len] = self._buf[:self._len]
+        self._buf = buf
+
+    def _index(self, idx):
+        if idx < 0:
+            idx += self._len
+
+        if not 0 <= idx < self._len:
+            raise IndexError('array index out of range')
+
+        return idx
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(self.ndarray.tolist())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.ndarray[key]
+
+        # python floats keep arithmetic semantics (ZeroDivisionError ...)
+        return self._buf.item(self._index(key))
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            self.ndarray[key] = value
+        else:
+            self._buf[self._index(key)] = value
+
+    def append(self, value):
+        if self._len == len(self._buf):
+            self._reserve(self._len + 1)
+
+        self._buf[self._len] = value
+        self._len += 1
+
+    def extend(self, values):
+        if not hasattr(values, '__len__'):
+            values = list(values)
+
+        size = len(values)
+        self._reserve(self._len + size)
+        self._buf[self._len:self._len + size] = values
+        self._len += size
+
+    def frombytes(self, values):
+        self.extend(np.frombuffer(values, dtype=np.float64))
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice):
+            key = slice(self._index(key), self._index(key) + 1)
+
+        values = np.delete(self.ndarray, key)
+        self._len = len(values)
+        self._buf[:self._len] = values
+
+    def pop(self):
+        if not self._len:
+            raise IndexError('pop from empty array')
+
+        self._len -= 1
+        return self._buf.item(self._len)
+
+    def tolist(self):
+        return self.ndarray.tolist()
+
+
+class SharedBuffer(NumPyBuffer):
+    '''
+    Fixed size ``NumPyBuffer`` whose values live in a
+    ``multiprocessing.shared_memory`` block
+
+    Pickling the buffer only transfers the name of the block. The unpickled
+    buffer attaches to the block with a read-only view, i.e.: the values are
+    not copied to other processes
+
+    The creator of the block has to call ``release`` when the buffer is no
+    longer needed by any process
+    '''
+    def __init__(self, values):
+        if shared_memory is None:
+            raise ImportError('SharedBuffer needs the module '
+                              'multiprocessing.shared_memory (python >= 3.8)')
+
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        # a block cannot be empty
+        self._shm = shared_memory.SharedMemory(create=True,
+                                               size=max(1, values.nbytes))
+        self._owner = True
+        self._buf = np.ndarray(len(values), dtype=np.float64,
+                               buffer=self._shm.buf)
+        self._buf[:] = values
+        self._len = len(values)
+
+    @classmethod
+    def _attach(cls, name, size):
+        self = cls.__new__(cls)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self._buf = np.ndarray(size, dtype=np.float64, buffer=self._shm.buf)
+        self._buf.flags.writeable = False
+        self._len = size
+        return self
+
+    def __reduce__(self):
+        return (self._attach, (self._shm.name, self._len))
+
+    def _reserve(self, size):
+        if size > len(self._buf):
+            raise BufferError('SharedBuffer cannot grow')
+
+    def release(self):
+        '''Detaches from the block, which is destroyed if it was created by
+        this buffer. The buffer holds no values afterwards'''
+        self._buf = np.empty(0, dtype=np.float64)  # drop the view first
+        self._len = 0
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                pass  # views still alive, the mapping goes away with them
+
+            if self._owner:
+                self._shm.unlink()
+
+            self._shm = None
+
+    def __del__(self):
+        if not getattr(self, '_owner', True):
+            self.release()
+
 
 class LineBuffer(LineSingle):
     '''
@@ -73,6 +273,17 @@ class LineBuffer(LineSingle):
 
     UnBounded, QBuffer = (0, 1)
 
+    # QBuffer: values held beyond the needed ones before trimming the buffer
+    QSlack = 64
+
+    _npstorage = False
+
+    @classmethod
+    def usenumpy(cls, onoff):
+        '''Activates (for buffers reset from now on) the storage of values in
+        a ``NumPyBuffer`` instead of an ``array.array`` in UnBounded mode'''
+        cls._npstorage = onoff
+
     def __init__(self):
         self.lines = [self]
         self.mode = self.UnBounded
@@ -84,19 +295,11 @@ class LineBuffer(LineSingle):
         return self._idx
 
     def set_idx(self, idx, force=False):
-        # if QBuffer and the last position of the buffer was reached, keep
-        # it (unless force) as index 0. This allows resampling
-        #  - forward adds a position, but the 1st one is discarded, the 0 is
-        #  invariant
-        # force supports replaying, which needs the extra bar to float
-        # forward/backwards, because the last input is read, and after a
-        # "backwards" is used to update the previous data. Unless the position
-        # 0 was moved to the previous index, it would fail
-        if self.mode == self.QBuffer:
-            if force or self._idx < self.lenmark:
-                self._idx = idx
-        else:  # default: UnBounded
-            self._idx = idx
+        # The index moves in QBuffer mode as in UnBounded mode: the values
+        # which can no longer be reached are trimmed from the left of the
+        # buffer (see _qtrim) and the index is moved back accordingly. "force"
+        # (used by replaying to float forward/backwards) is no longer needed
+        self._idx = idx
 
     idx = property(get_idx, set_idx)
 
@@ -106,11 +309,18 @@ class LineBuffer(LineSingle):
         if self.mode == self.QBuffer:
             # add extrasize to ensure resample/replay work because they will
             # use backwards to erase the last bar/tick before delivering a new
-            # bar The previous forward would have discarded the bar "period"
-            # times ago and it will not come back. Having + 1 in the size
-            # allows the forward without removing that bar
-            self.array = collections.deque(maxlen=self.maxlen + self.extrasize)
-            self.useislice = True
+            # bar. Having + 1 in the size allows the forward without losing
+            # the bar "period" times ago
+            self._qkeep = self.maxlen + self.extrasize
+            # The values are held contiguously in an array.array (windows are
+            # views of it) which is trimmed when QSlack values (or as many as
+            # the kept ones) more than the kept ones are held
+            self._qtrimlen = self._qkeep + max(self._qkeep, self.QSlack)
+            self.array = array.array(str('d'))
+            self.useislice = True  # bounded buffer
+        elif self._npstorage:
+            self.array = NumPyBuffer()
+            self.useislice = False
         else:
             self.array = array.array(str('d'))
             self.useislice = False
@@ -118,12 +328,37 @@ class LineBuffer(LineSingle):
         self.lencount = 0
         self.idx = -1
         self.extension = 0
+        self.trimmed = 0  # values removed with trim (chunked runonce)
+        self._homelen = 0
+
+    def share(self):
+        '''Moves the values to a ``SharedBuffer`` to hand them over to other
+        processes without copies. ``unshare`` has to be called to release the
+        shared memory
+
+        Returns the ``SharedBuffer``
+        '''
+        self.array = SharedBuffer(self.getndarray())
+        return self.array
+
+    def unshare(self):
+        '''Moves the values back from a ``SharedBuffer`` to the regular
+        storage and releases the shared memory'''
+        shared = self.array
+        if not isinstance(shared, SharedBuffer):
+            return
+
+        if self._npstorage:
+            self.array = NumPyBuffer()
+        else:
+            self.array = array.array(str('d'))
+        self.array.frombytes(shared.ndarray.tobytes())
+        shared.release()
 
     def qbuffer(self, savemem=0, extrasize=0):
         self.mode = self.QBuffer
         self.maxlen = self._minperiod
         self.extrasize = extrasize
-        self.lenmark = self.maxlen - (not self.extrasize)
         self.reset()
 
     def getindicators(self):
@@ -144,9 +379,29 @@ class LineBuffer(LineSingle):
             return
 
         self.maxlen = size
-        self.lenmark = self.maxlen - (not self.extrasize)
         self.reset()
 
+    def _qtrim(self):
+        '''QBuffer: removes the values which can no longer be reached (the
+        ones before the last ``maxlen + extrasize`` up to the index)'''
+        size = self._idx + 1 - self._qkeep
+        if size > 0:
+            try:
+                del self.array[:size]
+            except BufferError:  # views alive (see _unpin)
+                self.array = self.array[size:]
+
+            self._idx -= size
+
+    def _unpin(self):
+        '''QBuffer: the windows returned by ``get`` are views of the buffer,
+        which cannot be resized while they are alive. The buffer is replaced
+        by a copy, the views keep the values they had'''
+        if self.mode != self.QBuffer:
+            raise BufferError('cannot resize a buffer with views alive')
+
+        self.array = self.array[:]
+
     def __len__(self):
         return self.lencount
 
@@ -158,7 +413,7 @@ class LineBuffer(LineSingle):
         held/can be held in the buffer
         is returned
         '''
-        return len(self.array) - self.extension
+        return len(self.array) - self.extension + self.trimmed
 
     def __getitem__(self, ago):
         return self.array[self.idx + ago]
@@ -178,9 +433,9 @@ class LineBuffer(LineSingle):
             A slice of the underlying buffer
         '''
         if self.useislice:
-            start = self.idx + ago - size + 1
+            # bounded buffer (values only until the next trimming): no copy
             end = self.idx + ago + 1
-            return list(islice(self.array, start, end))
+            return np.frombuffer(self.array)[max(0, end - size):end]
 
         return np.array(self.array[self.idx + ago - size + 1:self.idx + ago + 1])
 
@@ -207,11 +462,25 @@ class LineBuffer(LineSingle):
         Returns:
             A slice of the underlying buffer
         '''
-        if self.useislice:
-            return list(islice(self.array, idx, idx + size))
-
         return self.array[idx:idx + size]
 
+    def getndarray(self):
+        ''' Returns the entire buffer as a ``numpy.ndarray`` indexed like
+        ``array``, to operate on it with whole-array ufuncs
+
+        With numpy storage the result is a zero-copy view of the valid range.
+        With the default ``array.array`` storage it is also a zero-copy view
+        (the buffer cannot grow while the view is alive). In QBuffer mode the
+        view holds only the values which have not been trimmed
+
+        Returns:
+            A ``numpy.ndarray`` of float64 values
+        '''
+        if isinstance(self.array, NumPyBuffer):
+            return self.array.ndarray
+
+        return np.frombuffer(self.array, dtype=np.float64)
+
     def getMinPeriod(self):
         '''
         Returns number of NaN values on the beginning of the line
@@ -247,13 +516,43 @@ class LineBuffer(LineSingle):
             binding[ago] = value
 
     def home(self):
-        ''' Rewinds the logical index to the beginning
+        ''' Rewinds the logical index to the beginning (or to the position
+        of the last ``trim``)
 
         The underlying buffer remains untouched and the actual len can be found
         out with buflen
         '''
-        self.idx = -1
-        self.lencount = 0
+        self.idx = self._homelen - self.trimmed - 1
+        self.lencount = self._homelen
+
+    def trim(self, keep, end=None):
+        ''' Removes the values before the last ``keep`` ones up to ``end``
+        and the ones after it, moving the logical index to ``end``. Used by
+        the chunked ``runonce`` mode between chunks
+
+        ``len`` and ``buflen`` still count the removed values, which are
+        accounted in ``trimmed``: position ``n`` of ``array`` (and of
+        ``getndarray``) holds the value ``n + trimmed`` of the line. ``home``
+        rewinds to ``end`` afterwards
+
+        Keyword Args:
+            keep (int): values to keep up to ``end``
+            end (int): position in ``array`` (default: after the index)
+        '''
+        if end is None:
+            end = self.idx + 1
+
+        size = max(0, end - keep)
+        try:
+            del self.array[end:]
+            del self.array[:size]
+        except BufferError:  # views alive (see _unpin)
+            self.array = self.array[size:end]
+
+        self.extension = 0
+        self.lencount = self._homelen = self.trimmed + end
+        self.trimmed += size
+        self.idx = end - size - 1
 
     def forward(self, value=NAN, size=1):
         ''' Moves the logical index foward and enlarges the buffer as much as needed
@@ -265,8 +564,37 @@ class LineBuffer(LineSingle):
         self.idx += size
         self.lencount += size
 
-        for i in range(size):
-            self.array.append(value)
+        try:
+            for i in range(size):
+                self.array.append(value)
+        except BufferError:
+            self._unpin()
+            for i in range(size):
+                self.array.append(value)
+
+        if self.useislice and len(self.array) >= self._qtrimlen:
+            self._qtrim()
+
+    def forwardvals(self, values):
+        ''' Moves the logical index forward storing the given values in the
+        new positions in a single step
+
+        Keyword Args:
+            values (numpy.ndarray): float64 values for the new positions
+        '''
+        size = len(values)
+        self.idx += size
+        self.lencount += size
+
+        values = np.ascontiguousarray(values, dtype=np.float64).tobytes()
+        try:
+            self.array.frombytes(values)
+        except BufferError:
+            self._unpin()
+            self.array.frombytes(values)
+
+        if self.useislice and len(self.array) >= self._qtrimlen:
+            self._qtrim()
 
     def backwards(self, size=1, force=False):
         ''' Moves the logical index backwards and reduces the buffer as much as needed
@@ -278,8 +606,13 @@ class LineBuffer(LineSingle):
         # Go directly to property setter to support force
         self.set_idx(self._idx - size, force=force)
         self.lencount -= size
-        for i in range(size):
-            self.array.pop()
+        try:
+            for i in range(size):
+                self.array.pop()
+        except BufferError:
+            self._unpin()
+            for i in range(size):
+                self.array.pop()
 
     def rewind(self, size=1):
         self.idx -= size
@@ -305,8 +638,13 @@ class LineBuffer(LineSingle):
         set values in the buffer "future"
         '''
         self.extension += size
-        for i in range(size):
-            self.array.append(value)
+        try:
+            for i in range(size):
+                self.array.append(value)
+        except BufferError:
+            self._unpin()
+            for i in range(size):
+                self.array.append(value)
 
     def addbinding(self, binding):
         ''' Adds another line binding
@@ -337,9 +675,6 @@ class LineBuffer(LineSingle):
         return self.getzero(idx, size or len(self))
 
     def plotrange(self, start, end):
-        if self.useislice:
-            return list(islice(self.array, start, end))
-
         return self.array[start:end]
 
     def oncebinding(self):
@@ -347,7 +682,7 @@ class LineBuffer(LineSingle):
         Executes the bindings when running in "once" mode
         '''
         larray = self.array
-        blen = self.buflen()
+        blen = self.buflen() - self.trimmed
         for binding in self.bindings:
             binding.array[0:blen] = larray[0:blen]
 
@@ -620,6 +955,18 @@ class LineActions(with_metaclass(MetaLineActions, LineBuffer)):
 
         return obj
 
+    @staticmethod
+    def ndslice(obj, start, end):
+        '''
+        Returns the values of an arrayized object in the range [start, end)
+        as a ``numpy.ndarray`` or the wrapped value for a ``PseudoArray``,
+        ready to be broadcasted by numpy
+        '''
+        if isinstance(obj, PseudoArray):
+            return obj.wrapped
+
+        return obj.getndarray()[start:end]
+
     def _next(self):
         clock_len = len(self._clock)
         if clock_len > len(self):
@@ -634,12 +981,11 @@ class LineActions(with_metaclass(MetaLineActions, LineBuffer)):
             self.prenext()
 
     def _once(self):
-        self.forward(size=self._clock.buflen())
+        start = self.buflen()  # not 0 if calculated in chunks
+        self.forward(size=self._clock.buflen() - start)
         self.home()
 
-        self.preonce(0, self._minperiod - 1)
-        self.oncestart(self._minperiod - 1, self._minperiod)
-        self.once(self._minperiod, self.buflen())
+        self._oncerange(start, self.buflen(), self.trimmed)
 
         self.oncebinding()
 
@@ -674,13 +1020,9 @@ class _LineDelay(LineActions):
         self[0] = self.a[self.ago]
 
     def once(self, start, end):
-        # cache python dictionary lookups
-        dst = self.array
-        src = self.a.array
         ago = self.ago
-
-        for i in range(start, end):
-            dst[i] = src[i + ago]
+        self.getndarray()[start:end] = \
+            self.ndslice(self.a, start + ago, end + ago)
 
 
 class _LineForward(LineActions):
@@ -704,13 +1046,9 @@ class _LineForward(LineActions):
         self[-self.ago] = self.a[0]
 
     def once(self, start, end):
-        # cache python dictionary lookups
-        dst = self.array
-        src = self.a.array
         ago = self.ago
-
-        for i in range(start, end):
-            dst[i - ago] = src[i]
+        self.getndarray()[start - ago:end - ago] = \
+            self.a.getndarray()[start:end]
 
 
 class LinesOperation(LineActions):
@@ -725,14 +1063,10 @@ class LinesOperation(LineActions):
     next/once is chosen using the operation direction (normal or reversed)
     and the nature of the operands (LineBuffer vs non-LineBuffer)
 
-    In the "once" operations "map" could be used as in:
-
-        operated = map(self.operation, srca[start:end], srcb[start:end])
-        self.array[start:end] = array.array(str(self.typecode), operated)
-
-    No real execution time benefits were appreciated and therefore the loops
-    have been kept in place for clarity (although the maps are not really
-    unclear here)
+    In the "once" operations the ``operator`` functions with a ``numpy``
+    ufunc equivalent are applied to the whole slice at once. The loops are
+    kept for any other operation, for time operands and for the cases in
+    which python would raise an exception (division by zero ...)
     '''
 
     def __init__(self, a, b, operation, r=False):
@@ -762,6 +1096,9 @@ class LinesOperation(LineActions):
             self[0] = self.operation(self.a, self.b[0])
 
     def once(self, start, end):
+        if self._once_ufunc(start, end):
+            return
+
         if self.bline:
             self._once_op(start, end)
         elif not self.r:
@@ -772,6 +1109,33 @@ class LinesOperation(LineActions):
         else:
             self._once_val_op_r(start, end)
 
+    def _once_ufunc(self, start, end):
+        ufunc = _UFUNCS.get(self.operation)
+        if ufunc is None or self.btime:
+            return False
+
+        if self.bline:
+            srca = self.a.getndarray()[start:end]
+            srcb = self.b.getndarray()[start:end]
+        elif not self.r:
+            if not isinstance(self.b, numbers.Real):
+                return False
+            srca, srcb = self.a.getndarray()[start:end], self.b
+        else:
+            if not isinstance(self.a, numbers.Real):
+                return False
+            srca, srcb = self.a, self.b.getndarray()[start:end]
+
+        with np.errstate(all='ignore'):
+            res = ufunc(srca, srcb)
+            if ufunc in _UFUNCS_STRICT:
+                if (~np.isfinite(res) &
+                        np.isfinite(srca) & np.isfinite(srcb)).any():
+                    return False
+
+        self.getndarray()[start:end] = res
+        return True
+
     def _once_op(self, start, end):
         # cache python dictionary lookups
         dst = self.array
@@ -831,6 +1195,12 @@ class LineOwnOperation(LineActions):
         self[0] = self.operation(self.a[0])
 
     def once(self, start, end):
+        ufunc = _OWNUFUNCS.get(self.operation)
+        if ufunc is not None:
+            srca = self.a.getndarray()[start:end]
+            self.getndarray()[start:end] = ufunc(srca)
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
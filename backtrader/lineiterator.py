@@ -82,20 +82,17 @@ class MetaLineIterator(LineSeries.__class__):
         if _obj.datas:
             _obj.data = data = _obj.datas[0]
 
-            for l, line in enumerate(data.lines):
-                linealias = data._getlinealias(l)
-                if linealias:
-                    setattr(_obj, 'data_%s' % linealias, line)
-                setattr(_obj, 'data_%d' % l, line)
+            # the attribute names are memoized per lines class
+            lines = data.lines
+            for name, l in lines._getattrnames('data'):
+                setattr(_obj, name, lines[l])
 
             for d, data in enumerate(_obj.datas):
                 setattr(_obj, 'data%d' % d, data)
 
-                for l, line in enumerate(data.lines):
-                    linealias = data._getlinealias(l)
-                    if linealias:
-                        setattr(_obj, 'data%d_%s' % (d, linealias), line)
-                    setattr(_obj, 'data%d_%d' % (d, l), line)
+                lines = data.lines
+                for name, l in lines._getattrnames('data%d' % d):
+                    setattr(_obj, name, lines[l])
 
         # Parameter values have now been set before __init__
         _obj.dnames = DotDict([(d._name, d)
@@ -291,13 +288,14 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
         return clock_len
 
     def _once(self):
-        self.forward(size=self._clock.buflen())
+        start = self.buflen()  # not 0 if calculated in chunks
+        self.forward(size=self._clock.buflen() - start)
 
         for indicator in self._lineiterators[LineIterator.IndType]:
             indicator._once()
 
         for observer in self._lineiterators[LineIterator.ObsType]:
-            observer.forward(size=self.buflen())
+            observer.forward(size=self.buflen() - observer.buflen())
 
         for data in self.datas:
             data.home()
@@ -313,9 +311,7 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
         # These 3 remain empty for a strategy and therefore play no role
         # because a strategy will always be executed on a next basis
         # indicators are each called with its min period
-        self.preonce(0, self._minperiod - 1)
-        self.oncestart(self._minperiod - 1, self._minperiod)
-        self.once(self._minperiod, self.buflen())
+        self._oncerange(start, self.buflen(), self.lines[0].trimmed)
 
         for line in self.lines:
             line.oncebinding()
@@ -170,6 +170,31 @@ class LineRoot(with_metaclass(MetaLineRoot, object)):
         '''
         pass
 
+    def _oncerange(self, start, end, trimmed=0):
+        '''
+        Calls preonce/oncestart/once for the values from ``start`` to ``end``
+        of the line, which are at positions ``trimmed`` lower in the buffers
+        (see ``LineBuffer.trim``)
+
+        ``start`` is 0 unless values were calculated in previous chunks
+        '''
+        minperiod = self._minperiod
+        if not start:
+            self.preonce(0, minperiod - 1)
+            self.oncestart(minperiod - 1, minperiod)
+            self.once(minperiod, end - trimmed)
+            return
+
+        if start < minperiod - 1:
+            self.preonce(start - trimmed, min(minperiod - 1, end) - trimmed)
+
+        if start < minperiod <= end:
+            self.oncestart(minperiod - 1 - trimmed, minperiod - trimmed)
+
+        start = max(start, minperiod)
+        if start < end:
+            self.once(start - trimmed, end - trimmed)
+
     # Arithmetic operators
     def _makeoperation(self, other, operation, r=False, _ownerskip=None):
         raise NotImplementedError
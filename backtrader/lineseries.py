@@ -193,6 +193,30 @@ class Lines(object):
     def getlinealiases(cls):
         return cls._getlines()
 
+    _attrnames = dict()  # memoized results of _getattrnames
+
+    @classmethod
+    def _getattrnames(cls, prefix):
+        '''
+        Return the (attribute name, line index) pairs with which an owner
+        references the lines using the given prefix: prefix_alias and
+        prefix_index. Memoized per class and prefix
+        '''
+        try:
+            return cls._attrnames[(cls, prefix)]
+        except KeyError:
+            pass
+
+        names = list()
+        for l in range(len(cls._getlines()) + cls._getlinesextra()):
+            linealias = cls._getlinealias(l)
+            if linealias:
+                names.append(('%s_%s' % (prefix, linealias), l))
+            names.append(('%s_%d' % (prefix, l), l))
+
+        cls._attrnames[(cls, prefix)] = names = tuple(names)
+        return names
+
     def itersize(self):
         return iter(self.lines[0:self.size()])
 
@@ -403,6 +427,23 @@ class MetaLineSeries(LineMultiple.__class__):
         # return the class
         return cls
 
+    def _getlinenames(cls):
+        '''Return the (attribute name, line index) pairs of the line_x and
+        linex aliases of the lines of the class, memoized per class'''
+        try:
+            return cls.__dict__['_linenames']
+        except KeyError:
+            pass
+
+        names = list()
+        for l in range(len(cls.lines._getlines()) +
+                       cls.lines._getlinesextra()):
+            names.append(('line_%d' % l, l))
+            names.append(('line%d' % l, l))
+
+        cls._linenames = names = tuple(names)
+        return names
+
     def donew(cls, *args, **kwargs):
         '''
         Intercept instance creation, take over lines/plotinfo/plotlines
@@ -410,10 +451,7 @@ class MetaLineSeries(LineMultiple.__class__):
         aliases for "lines" and the "lines" held within it
         '''
         # _obj.plotinfo shadows the plotinfo (class) definition in the class
-        plotinfo = cls.plotinfo()
-
-        for pname, pdef in cls.plotinfo._getitems():
-            setattr(plotinfo, pname, kwargs.pop(pname, pdef))
+        plotinfo = cls.plotinfo._instantiate(kwargs)
 
         # Create the object and set the params in place
         _obj, args, kwargs = super(MetaLineSeries, cls).donew(*args, **kwargs)
@@ -432,10 +470,9 @@ class MetaLineSeries(LineMultiple.__class__):
         if _obj.lines.fullsize():
             _obj.line = _obj.lines[0]
 
-        for l, line in enumerate(_obj.lines):
-            setattr(_obj, 'line_%s' % l, _obj._getlinealias(l))
-            setattr(_obj, 'line_%d' % l, line)
-            setattr(_obj, 'line%d' % l, line)
+        lines = _obj.lines.lines
+        for name, l in cls._getlinenames():
+            setattr(_obj, name, lines[l])
 
         # Parameter values have now been set before __init__
         return _obj, args, kwargs
@@ -454,6 +491,9 @@ class LineSeries(with_metaclass(MetaLineSeries, LineMultiple)):
     def array(self):
         return self.lines[0].array
 
+    def getndarray(self):
+        return self.lines[0].getndarray()
+
     def getMinPeriod(self):
         '''
         Returns number of NaN values on the beginning of the line
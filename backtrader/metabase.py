@@ -29,6 +29,9 @@ import backtrader as bt
 from .utils.py3 import zip, string_types, with_metaclass
 
 
+_NOHINT = object()  # marker for "no explicit owner was given"
+
+
 def findbases(kls, topclass):
     retval = list()
     for base in kls.__bases__:
@@ -40,6 +43,14 @@ def findbases(kls, topclass):
 
 
 def findowner(owned, cls, startlevel=2, skip=None):
+    # Owner given explicitly at creation time with the keyword argument
+    # "_owner" (see MetaParams) ... no need to walk the stack
+    hint = getattr(owned, '__dict__', {}).get('_ownerhint', _NOHINT)
+    if hint is not _NOHINT:
+        if hint is not owned and hint is not skip and isinstance(hint, cls):
+            return hint
+        return None
+
     # skip this frame and the caller's -> start at 2
     for framelevel in itertools.count(startlevel):
         try:
@@ -90,10 +101,15 @@ class MetaBase(type):
         return _obj
 
 
+_NOPAIRS = dict()
+
+
 class AutoInfoClass(object):
     _getpairsbase = classmethod(lambda cls: OrderedDict())
     _getpairs = classmethod(lambda cls: OrderedDict())
     _getrecurse = classmethod(lambda cls: False)
+    # pairs without a copy, for instance creation. Must not be modified
+    _getpairsnocopy = classmethod(lambda cls: _NOPAIRS)
 
     @classmethod
     def _derive(cls, name, info, otherbases, recurse=False):
@@ -138,6 +154,9 @@ class AutoInfoClass(object):
         setattr(newcls, '_getpairsbase',
                 classmethod(lambda cls: baseinfo.copy()))
         setattr(newcls, '_getpairs', classmethod(lambda cls: clsinfo.copy()))
+        # a plain dict is faster to iterate
+        clspairs = dict(clsinfo)
+        setattr(newcls, '_getpairsnocopy', classmethod(lambda cls: clspairs))
         setattr(newcls, '_getrecurse', classmethod(lambda cls: recurse))
 
         for infoname, infoval in info2add.items():
@@ -166,19 +185,19 @@ class AutoInfoClass(object):
 
     @classmethod
     def _getkeys(cls):
-        return cls._getpairs().keys()
+        return cls._getpairsnocopy().keys()
 
     @classmethod
     def _getdefaults(cls):
-        return list(cls._getpairs().values())
+        return list(cls._getpairsnocopy().values())
 
     @classmethod
     def _getitems(cls):
-        return cls._getpairs().items()
+        return cls._getpairsnocopy().items()
 
     @classmethod
     def _gettuple(cls):
-        return tuple(cls._getpairs().items())
+        return tuple(cls._getpairsnocopy().items())
 
     def _getkwargs(self, skip_=False):
         l = [
@@ -193,12 +212,29 @@ class AutoInfoClass(object):
         obj = super(AutoInfoClass, cls).__new__(cls, *args, **kwargs)
 
         if cls._getrecurse():
-            for infoname in obj._getkeys():
+            for infoname in cls._getpairsnocopy():
                 recursecls = getattr(cls, infoname)
                 setattr(obj, infoname, recursecls())
 
         return obj
 
+    @classmethod
+    def _instantiate(cls, kwargs):
+        '''Returns an instance (of a non-recursive class) with the values
+        popped from ``kwargs`` if present or else the defaults'''
+        obj = cls()
+        pairs = cls._getpairsnocopy()
+        # setattr (and not __dict__.update) keeps the compact (key sharing)
+        # instance dictionaries of the interpreter
+        for name, value in pairs.items():
+            setattr(obj, name, value)
+
+        if kwargs:
+            for name in [x for x in kwargs if x in pairs]:
+                setattr(obj, name, kwargs.pop(name))
+
+        return obj
+
 
 class MetaParams(MetaBase):
     def __new__(meta, name, bases, dct):
@@ -241,6 +277,36 @@ class MetaParams(MetaBase):
         return cls
 
     def donew(cls, *args, **kwargs):
+        # owner passed explicitly, to be used by findowner during creation
+        ownerhint = kwargs.pop('_owner', _NOHINT)
+
+        # the packages are imported in the module once per class
+        if '_packagesdone' not in cls.__dict__:
+            cls._importpackages()
+
+        # Create params and set the values from the kwargs
+        params = cls.params._instantiate(kwargs)
+
+        # Create the object and set the params in place
+        _obj, args, kwargs = super(MetaParams, cls).donew(*args, **kwargs)
+        _obj.params = params
+        _obj.p = params  # shorter alias
+
+        if ownerhint is not _NOHINT:
+            _obj._ownerhint = ownerhint
+
+        # Parameter values have now been set before __init__
+        return _obj, args, kwargs
+
+    def dopostinit(cls, _obj, *args, **kwargs):
+        _obj, args, kwargs = \
+            super(MetaParams, cls).dopostinit(_obj, *args, **kwargs)
+
+        # the explicit owner is only meant for the creation
+        _obj.__dict__.pop('_ownerhint', None)
+        return _obj, args, kwargs
+
+    def _importpackages(cls):
         clsmod = sys.modules[cls.__module__]
         # import specified packages
         for p in cls.packages:
@@ -277,18 +343,7 @@ class MetaParams(MetaBase):
                 pattr = getattr(pmod, fp)
                 setattr(clsmod, falias, pattr)
 
-        # Create params and set the values from the kwargs
-        params = cls.params()
-        for pname, pdef in cls.params._getitems():
-            setattr(params, pname, kwargs.pop(pname, pdef))
-
-        # Create the object and set the params in place
-        _obj, args, kwargs = super(MetaParams, cls).donew(*args, **kwargs)
-        _obj.params = params
-        _obj.p = params  # shorter alias
-
-        # Parameter values have now been set before __init__
-        return _obj, args, kwargs
+        cls._packagesdone = True
 
 
 class ParamsBase(with_metaclass(MetaParams, object)):
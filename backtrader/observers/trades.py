@@ -105,6 +105,11 @@ class Trades(Observer):
 
 
 class MetaDataTrades(Observer.__class__):
+    # derived lines/plotlines classes per (class, line names). Deriving them
+    # for each instance (optimization) would add new classes to the module
+    # on each run
+    _derived = dict()
+
     def donew(cls, *args, **kwargs):
         _obj, args, kwargs = super(MetaDataTrades, cls).donew(*args, **kwargs)
 
@@ -114,11 +119,21 @@ class MetaDataTrades(Observer.__class__):
         else:
             lnames = tuple('data{}'.format(x) for x in range(len(_obj.datas)))
 
-        # Generate a new lines class
-        linescls = cls.lines._derive(uuid.uuid4().hex, lnames, 0, ())
+        try:
+            linescls, plotlinescls = cls._derived[(cls, lnames)]
+        except KeyError:
+            linescls, plotlinescls = cls._derived[(cls, lnames)] = \
+                cls._derivelines(lnames)
 
         # Instantiate lines
         _obj.lines = linescls()
+        _obj.plotlines = plotlinescls()
+
+        return _obj, args, kwargs  # return the instantiated object and args
+
+    def _derivelines(cls, lnames):
+        # Generate a new lines class
+        linescls = cls.lines._derive(uuid.uuid4().hex, lnames, 0, ())
 
         # Generate plotlines info
         markers = ['o', 'v', '^', '<', '>', '1', '2', '3', '4', '8', 's', 'p',
@@ -136,9 +151,8 @@ class MetaDataTrades(Observer.__class__):
 
         plotlines = cls.plotlines._derive(
             uuid.uuid4().hex, plines, [], recurse=True)
-        _obj.plotlines = plotlines()
 
-        return _obj, args, kwargs  # return the instantiated object and args
+        return linescls, plotlines
 
 
 class DataTrades(with_metaclass(MetaDataTrades, Observer)):
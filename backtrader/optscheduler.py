@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from .utils.py3 import range, with_metaclass, zip
+
+from .metabase import MetaParams
+
+
+__all__ = ['OptScheduler']
+
+
+class OptScheduler(with_metaclass(MetaParams, object)):
+    '''Distributes the parameter combinations of an optimization over the
+    processes of the pool
+
+    The combinations are grouped in chunks, which are the unit of work handed
+    over to a process. If a ``cost`` estimator is given, the combinations are
+    sorted by descending cost and grouped in chunks of similar total cost.
+    The expensive work is therefore started first and the processes finish
+    at about the same time
+
+    The results (and with them the progress and abort callbacks of
+    ``Cerebro``) are delivered combination by combination and not by chunk.
+    An abort skips the rest of the chunks being run
+
+    Subclasses may override ``schedule`` to implement other strategies
+
+    Params:
+
+      - ``chunksize`` (default: ``None``)
+
+        Number of combinations per chunk. If ``None`` the combinations are
+        split in ``chunks`` chunks per process
+
+      - ``chunks`` (default: ``4``)
+
+        Number of chunks per process when ``chunksize`` is ``None``
+
+      - ``cost`` (default: ``None``)
+
+        Callable which receives a combination and returns its estimated cost
+        (any number). A combination is a tuple holding a ``(stratcls, args,
+        kwargs)`` tuple for each strategy. With ``None`` all combinations are
+        equally costly and keep their order
+    '''
+    params = (
+        ('chunksize', None),
+        ('chunks', 4),
+        ('cost', None),
+    )
+
+    def schedule(self, iterstrats, procs):
+        '''Returns a list of chunks. Each chunk is a list of ``(index,
+        iterstrat)`` tuples where ``index`` is the position of the combination
+        ``iterstrat`` in ``iterstrats``
+
+        Params:
+
+          - ``iterstrats``: iterable with the combinations
+          - ``procs``: number of processes in the pool
+        '''
+        combos = list(enumerate(iterstrats))
+        if self.p.cost is None:
+            costs = [1.0] * len(combos)
+        else:
+            costs = [self.p.cost(iterstrat) for _, iterstrat in combos]
+            order = sorted(range(len(combos)), key=costs.__getitem__,
+                           reverse=True)
+            combos = [combos[i] for i in order]
+            costs = [costs[i] for i in order]
+
+        chunksize = self.p.chunksize
+        if chunksize:
+            return [combos[i:i + chunksize]
+                    for i in range(0, len(combos), chunksize)]
+
+        target = sum(costs) / max(1, procs * self.p.chunks)
+        chunks, chunk, chunkcost = list(), list(), 0.0
+        for combo, cost in zip(combos, costs):
+            chunk.append(combo)
+            chunkcost += cost
+            if chunkcost >= target:
+                chunks.append(chunk)
+                chunk, chunkcost = list(), 0.0
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import sys
+from time import perf_counter
+
+
+__all__ = ['ProfileNode', 'Profiler']
+
+
+class ProfileNode(object):
+    '''Holds the call counts and wall times of the profiled methods of an
+    object of the run and the nodes of the objects it owns
+
+    Times are inclusive: the time of a ``_next`` call of a strategy contains
+    the time of the ``_next`` calls of its indicators, observers and
+    analyzers
+    '''
+    def __init__(self, name, basename=None):
+        self.name = name
+        self.basename = basename or name
+        self.stats = collections.OrderedDict()  # method -> [calls, time]
+        self.children = list()
+
+    def addchild(self, name):
+        '''Adds and returns a child node. Siblings with the same name get a
+        ``#n`` suffix to keep paths unique'''
+        count = sum(1 for c in self.children if c.basename == name)
+        child = ProfileNode(name if not count else '%s#%d' % (name, count),
+                            basename=name)
+        self.children.append(child)
+        return child
+
+    def calls(self, method):
+        return self.stats.get(method, (0, 0.0))[0]
+
+    def time(self, method):
+        return self.stats.get(method, (0, 0.0))[1]
+
+    def astree(self):
+        '''Returns the node and its children as nested dictionaries'''
+        return collections.OrderedDict([
+            ('name', self.name),
+            ('stats', collections.OrderedDict(
+                (m, dict(calls=c, time=t)) for m, (c, t) in self.stats.items()
+            )),
+            ('children', [c.astree() for c in self.children]),
+        ])
+
+    def walk(self, path=''):
+        '''Yields ``(path, node)`` for the node and all its descendants'''
+        path = path + '/' + self.name if path else self.name
+        yield path, self
+        for child in self.children:
+            for item in child.walk(path):
+                yield item
+
+
+class Profiler(object):
+    '''Records the wall time and call count of the methods which drive a run
+    of ``Cerebro``
+
+    The methods are wrapped at instance level by ``attach`` and restored by
+    ``detach``. Nothing is wrapped (and nothing is paid) if the profiler is
+    not used
+
+    The nodes are:
+
+      - The root node for ``Cerebro`` with ``_brokernotify``,
+        ``_check_timers`` (timers and their notifications) and
+        ``_next_writers``
+      - The broker with ``next``
+      - The writers with ``next``
+      - The strategies and recursively the line iterators they own
+        (indicators, observers) with ``_next``, ``_once`` and the user
+        methods (``next``, ``once`` ...)
+      - The analyzers of the strategies (and their children) with ``_next``
+        and the user methods
+    '''
+    CEREBRO = ('_brokernotify', '_check_timers', '_next_writers')
+    BROKER = ('next',)
+    WRITER = ('next',)
+    LINEITERATOR = ('_next', 'prenext', 'nextstart', 'next',
+                    '_once', 'preonce', 'oncestart', 'once')
+    STRATEGY = LINEITERATOR + ('_oncepost',)
+    ANALYZER = ('_next', '_prenext', '_nextstart', 'prenext', 'nextstart',
+                'next')
+
+    def __init__(self):
+        self.root = ProfileNode('Cerebro')
+        self._wrapped = list()
+        self._seen = set()
+
+    def attach(self, cerebro, runstrats):
+        '''Wraps the methods of cerebro, the broker, the writers and the
+        strategies (with all what they own) of the run'''
+        root = self.root
+        self._wrap(root, cerebro, self.CEREBRO)
+
+        broker = cerebro.getbroker()
+        self._wrap(root.addchild(type(broker).__name__), broker, self.BROKER)
+
+        for writer in cerebro.runwriters:
+            self._wrap(root.addchild(type(writer).__name__), writer,
+                       self.WRITER)
+
+        for strat in runstrats:
+            self._attach_lineiterator(root, strat, self.STRATEGY)
+
+    def _attach_lineiterator(self, parent, obj, methods):
+        if id(obj) in self._seen:
+            return
+
+        node = parent.addchild(type(obj).__name__)
+        self._wrap(node, obj, methods)
+
+        # line actions (operations, delays) own no line iterators
+        for lineiterators in getattr(obj, '_lineiterators', {}).values():
+            for lineiterator in lineiterators:
+                self._attach_lineiterator(node, lineiterator,
+                                          self.LINEITERATOR)
+
+        for analyzer in getattr(obj, 'analyzers', ()):
+            self._attach_analyzer(node, analyzer)
+
+    def _attach_analyzer(self, parent, analyzer):
+        if id(analyzer) in self._seen:
+            return
+
+        node = parent.addchild(type(analyzer).__name__)
+        self._wrap(node, analyzer, self.ANALYZER)
+        for child in analyzer._children:
+            self._attach_analyzer(node, child)
+
+    def _wrap(self, node, obj, methods):
+        self._seen.add(id(obj))
+        for mname in methods:
+            func = getattr(obj, mname, None)
+            if func is None:
+                continue
+
+            stats = node.stats.setdefault(mname, [0, 0.0])
+            # keep what the instance had to restore it in detach
+            self._wrapped.append((obj, mname, obj.__dict__.get(mname)))
+            setattr(obj, mname, self._timed(func, stats))
+
+    @staticmethod
+    def _timed(func, stats):
+        def timed(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[0] += 1
+                stats[1] += perf_counter() - t0
+
+        return timed
+
+    def detach(self):
+        '''Restores the wrapped methods and releases the profiled objects'''
+        for obj, mname, orig in reversed(self._wrapped):
+            if orig is None:
+                delattr(obj, mname)
+            else:
+                setattr(obj, mname, orig)
+
+        self._wrapped = list()
+        self._seen = set()
+
+    def tree(self):
+        '''Returns the results as nested dictionaries with keys ``name``,
+        ``stats`` (method -> ``dict(calls=, time=)``) and ``children``'''
+        return self.root.astree()
+
+    def table(self):
+        '''Returns the results as a flat list of ``(path, method, calls,
+        time)`` tuples sorted by descending time. Methods which were never
+        called are left out'''
+        rows = [(path, m, c, t)
+                for path, node in self.root.walk()
+                for m, (c, t) in node.stats.items() if c]
+
+        rows.sort(key=lambda x: x[3], reverse=True)
+        return rows
+
+    def report(self, out=None):
+        '''Prints the tree and the flat table of the results to ``out``
+        (default: ``sys.stdout``)'''
+        out = out or sys.stdout
+
+        out.write('Profile tree (inclusive wall time in seconds)\n')
+        for path, node in self.root.walk():
+            depth = path.count('/')
+            stats = ', '.join('%s: %d / %.6f' % (m, c, t)
+                              for m, (c, t) in node.stats.items() if c)
+            out.write('%s%s%s\n' % ('  ' * depth, node.name,
+                                    ' - ' + stats if stats else ''))
+
+        out.write('\nProfile table\n')
+        out.write('%-50s %-12s %10s %12s %12s\n' %
+                  ('node', 'method', 'calls', 'time', 'per call'))
+        for path, m, c, t in self.table():
+            out.write('%-50s %-12s %10d %12.6f %12.9f\n' %
+                      (path, m, c, t, t / c))
@@ -24,12 +24,56 @@ from __future__ import (absolute_import, division, print_function,
 
 from datetime import datetime, date, timedelta
 
+import numpy as np
+
 from .dataseries import TimeFrame, _Bar
 from .utils.py3 import with_metaclass
 from . import metabase
 from .utils.date import date2num, num2date
 
 
+_USECS_PER_DAY = 86400000000
+
+
+def _num2parts(dts):
+    '''Returns the day ordinals and the microseconds into the day of the
+    datetimes (floats) in ``dts``, split (and rounded) like ``num2date``
+    does'''
+    ords = np.floor(dts)
+    hour, rem = np.divmod((dts - ords) * 24.0, 1.0)
+    minute, rem = np.divmod(rem * 60.0, 1.0)
+    second, rem = np.divmod(rem * 60.0, 1.0)
+    usecs = np.trunc(rem * 1e6)
+    usecs[usecs < 10] = 0.0  # compensate for rounding errors
+
+    tods = (((hour * 60.0 + minute) * 60.0 + second) * 1e6 +
+            np.where(usecs > 999990, 1e6, usecs)).astype(np.int64)
+
+    ords = ords.astype(np.int64) + tods // _USECS_PER_DAY
+    return ords, tods % _USECS_PER_DAY
+
+
+def _sumbars(vals, starts, ends):
+    '''Returns the sums of ``vals[start:end]`` for the given ``starts`` and
+    ``ends``, adding the values in order as a bar does (``reduceat`` sums
+    pairwise and may differ in the last digit)'''
+    lens = ends - starts
+    order = np.argsort(-lens, kind='stable')  # longest groups first
+    lens = lens[order]
+    starts = starts[order]
+
+    # per position i in the groups: number of groups with an i-th value
+    counts = np.searchsorted(-lens, -np.arange(lens[0] if len(lens) else 0))
+
+    sums = np.zeros(len(order))
+    for i, n in enumerate(counts.tolist()):
+        sums[:n] += vals[starts[:n] + i]
+
+    out = np.empty_like(sums)
+    out[order] = sums
+    return out
+
+
 class DTFaker(object):
     # This will only be used for data sources which at some point in time
     # return None from _load to indicate that a check of the resampler and/or
@@ -364,7 +408,13 @@ class _BaseResampler(with_metaclass(metabase.MetaParams, object)):
             # Session has been exceeded - end of session is the mark
             return self._lastdteos  # utc-like
 
-        dt = self.data.num2date(self.bar.datetime)
+        return self._edgetime(self.bar.datetime, self._nexteos)
+
+    def _edgetime(self, bardt, nexteos):
+        '''Returns the datetime (float) of the boundary of a bar whose last
+        seen datetime is ``bardt``, ``nexteos`` being the next end of session
+        '''
+        dt = self.data.num2date(bardt)
 
         # Get current time
         tm = dt.time()
@@ -397,7 +447,7 @@ class _BaseResampler(with_metaclass(metabase.MetaParams, object)):
             ps, pus = divmod(psec, 1e6)
         elif self.p.timeframe == TimeFrame.Days:
             # last resort
-            eost = self._nexteos.time()
+            eost = nexteos.time()
             ph = eost.hour
             pm = eost.minute
             ps = eost.second
@@ -492,6 +542,242 @@ class Resampler(_BaseResampler):
 
         return False
 
+    # methods defining what is delivered bar by bar, which resamplebulk
+    # reproduces
+    _bulkmethods = ('__call__', 'last', '_latedata', '_checkbarover',
+                    '_barover', '_eosset', '_eoscheck', '_barover_days',
+                    '_barover_weeks', '_barover_months', '_barover_years',
+                    '_gettmpoint', '_barover_subdays', '_dataonedge',
+                    '_calcadjtime', '_edgetime', '_adjusttime')
+
+    def canresamplebulk(self):
+        '''Returns ``True`` if ``resamplebulk`` can resample the bars of the
+        data (resampling to ``Seconds`` or larger timeframes with no output
+        timezone)'''
+        if not TimeFrame.Seconds <= self.p.timeframe <= TimeFrame.Years:
+            return False
+
+        if self.data._tz is not None:  # localized times needed per bar
+            return False
+
+        cls = type(self)
+        return all(getattr(cls, name) is getattr(Resampler, name)
+                   for name in self._bulkmethods)
+
+    def resamplebulk(self, cols):
+        '''Resamples at once all bars in ``cols`` (a dict of line aliases to
+        float arrays like the one returned by ``_loadbulk``) delivering the
+        bars which calling the filter bar by bar would have delivered
+
+        The boundaries of the resampled bars are sought with a scan over
+        values precalculated for all bars and the resampled values are then
+        calculated with group reductions
+
+        Returns a dict of line aliases to float arrays. ``bulklast`` tells if
+        the last bar is the one ``last`` delivers at the end of the data
+        '''
+        self.bulklast = False
+        data, p = self.data, self.p
+        tframe, comp = p.timeframe, p.compression
+        subdays, subweeks = self.subdays, self.subweeks
+        componly, doadjusttime = self.componly, self.doadjusttime
+
+        dts = cols['datetime']
+        size = len(dts)
+        nans = np.full(size, float('NaN'))
+        opens, highs, lows, closes, volumes, ois = [
+            cols.get(alias, nans) for alias in
+            ('open', 'high', 'low', 'close', 'volume', 'openinterest')]
+
+        # per bar: the intraday point (subdays) or the period (weeks and
+        # larger) to compare bars and the rest over the point (subdays)
+        ords, tods = _num2parts(dts)
+        keys = prests = None
+        if subdays:
+            unit = 60000000 if tframe == TimeFrame.Minutes else 1000000
+            keys = (tods // unit + p.boundoff).tolist()
+            prests = (tods % unit).tolist()
+        elif not subweeks:
+            uords, inv = np.unique(ords, return_inverse=True)
+            days = [date.fromordinal(int(o)) for o in uords]
+            if tframe == TimeFrame.Weeks:
+                ukeys = [y * 100 + w for y, w, _ in
+                         (d.isocalendar() for d in days)]
+            elif tframe == TimeFrame.Months:
+                ukeys = [d.year * 100 + d.month for d in days]
+            else:
+                ukeys = [d.year for d in days]
+
+            keys = np.asarray(ukeys)[inv].tolist()
+
+        lastdays = dict()  # per day ordinal: calendar says last of period
+        cal = data._calendar
+        if cal is not None and not subweeks:
+            lastday = {TimeFrame.Weeks: cal.last_weekday,
+                       TimeFrame.Months: cal.last_monthday,
+                       TimeFrame.Years: cal.last_yearday}[tframe]
+
+        dtl, ordl = dts.tolist(), ords.tolist()
+        validopens = (opens == opens).tolist()
+        takelate, bar2edge = p.takelate, p.bar2edge
+
+        # state of the resampled bar and of the sessions (see __call__)
+        isopen, bardt, barkey = False, _Bar.MAXDATE, None
+        compcount = 0
+        nexteos, nextdteos, lastdteos = None, float('-inf'), None
+        lastout = None  # datetime of the last delivered bar
+
+        nbars = 0  # bars (not skipped) so far
+        ends, outdts, skips = [], [], []
+
+        for i in range(size):
+            dt = dtl[i]
+            if subdays and lastout is not None and dt <= lastout:
+                # late data
+                if not takelate:
+                    skips.append(i)
+                    continue
+
+                nbars += 1
+                isopen = isopen or validopens[i]
+                bardt = lastout + 0.000001
+                barkey = self._gettmpoint(num2date(bardt).time())[0]
+                continue
+
+            onedge, docheckover = False, True
+            if componly:
+                consumed = True
+            elif not subweeks:
+                if cal is not None:
+                    o = ordl[i]
+                    if o not in lastdays:
+                        lastdays[o] = lastday(date.fromordinal(o))
+
+                    if lastdays[o]:
+                        docheckover = False
+                        compcount += 1
+                        onedge = not (compcount % comp)
+
+                consumed = onedge
+            else:
+                if nexteos is None:
+                    nexteos, nextdteos = data._getnexteos(dt)
+
+                if dt == nextdteos:  # exact end of session
+                    lastdteos = nextdteos
+                    nexteos, nextdteos = None, float('-inf')
+                    onedge = True
+                elif subdays and not prests[i]:
+                    onedge = not (keys[i] % comp)
+
+                consumed = onedge
+
+            if consumed:
+                nbars += 1
+                isopen = isopen or validopens[i]
+                bardt = dt
+                if keys is not None:
+                    barkey = keys[i]
+
+            cond = isopen
+            if cond and not onedge and docheckover:
+                over = componly
+                if not over:
+                    if subweeks:
+                        if nexteos is None:
+                            nexteos, nextdteos = data._getnexteos(dt)
+
+                        if dt > nextdteos:
+                            over = bardt <= nextdteos  # the bar is open
+                        else:
+                            over = dt == nextdteos
+
+                        if over:
+                            lastdteos = nextdteos
+                            nexteos, nextdteos = None, float('-inf')
+                        elif subdays and dt >= bardt:
+                            point, barpoint = barkey, keys[i]
+                            over = barpoint > point and (
+                                not bar2edge or comp == 1 or
+                                barpoint // comp > point // comp)
+
+                    elif tframe == TimeFrame.Weeks and cal is not None:
+                        over = lastdays[ordl[i]]
+                    else:
+                        over = keys[i] > barkey
+
+                if not over:
+                    cond = False
+                elif not (subdays and bar2edge):
+                    compcount += 1
+                    cond = not (compcount % comp)
+
+            if cond:
+                if not onedge and doadjusttime:
+                    if componly:
+                        lastdteos = data._getnexteos(dt)[1]
+
+                    if nexteos is None:
+                        dtnum = lastdteos
+                    else:
+                        dtnum = self._edgetime(bardt, nexteos)
+
+                    if dtnum > bardt:
+                        bardt = dtnum
+
+                ends.append(nbars)
+                outdts.append(bardt)
+                lastout = bardt
+                isopen, bardt = False, _Bar.MAXDATE
+
+            if not consumed:
+                nbars += 1
+                isopen = isopen or validopens[i]
+                bardt = dt
+                if keys is not None:
+                    barkey = keys[i]
+
+        if isopen:  # last
+            if doadjusttime:
+                if componly:
+                    lastdteos = data._getnexteos(dtl[-1])[1]
+
+                if nexteos is None:
+                    bardt = lastdteos
+                else:
+                    bardt = self._edgetime(bardt, nexteos)
+
+            ends.append(nbars)
+            outdts.append(bardt)
+            self.bulklast = True
+
+        if skips:
+            keep = np.ones(size, dtype=bool)
+            keep[skips] = False
+            opens, highs, lows, closes, volumes, ois = [
+                x[keep] for x in (opens, highs, lows, closes, volumes, ois)]
+
+        if not ends:
+            return {alias: np.empty(0) for alias in cols}
+
+        ends = np.asarray(ends)
+        starts = np.concatenate(([0], ends[:-1]))
+
+        # the open is the 1st seen one (not NaN), high/low ignore NaN
+        firsts = np.where(opens == opens, np.arange(len(opens)), len(opens))
+        highs = np.fmax.reduceat(highs, starts)
+        lows = np.fmin.reduceat(lows, starts)
+
+        return dict(
+            open=opens[np.minimum.reduceat(firsts, starts)],
+            high=np.where(highs == highs, highs, float('-inf')),
+            low=np.where(lows == lows, lows, float('inf')),
+            close=closes[ends - 1],
+            volume=_sumbars(volumes, starts, ends),
+            openinterest=ois[ends - 1],
+            datetime=np.asarray(outdts, dtype=np.float64),
+        )
+
     def __call__(self, data, fromcheck=False, forcedata=None):
         '''Called for each set of values produced by the data source'''
         consumed = False
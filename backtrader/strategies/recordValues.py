@@ -1,30 +1,154 @@
 import backtrader as bt
 import datetime
+import os
+import threading
+import time
+import weakref
+
+class CsvSink():
+    """Buffered csv log
+       Keeps one file descriptor open and writes rows in batches. Each batch
+       of complete rows goes in a single write at the end of the file, i.e.:
+       the rows are not split by other processes writing to the same file
+
+       Params:
+        fileName: output file (truncated)
+        flushRows: rows kept in memory before they are written
+        flushBytes: characters kept in memory before they are written
+        flushInterval: if set, a background thread writes the kept rows
+                       every flushInterval seconds (thresholds still apply)
+
+       Kept rows are also written if close is never called (a run raising
+       before the strategies are stopped): when the sink is garbage
+       collected or at the latest when the interpreter exits"""
+
+    def __init__(self, fileName, flushRows=10000, flushBytes=1 << 20,
+                 flushInterval=None):
+        self.fd = os.open(fileName,
+                          os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND,
+                          0o666)
+        self.flushRows = flushRows
+        self.flushBytes = flushBytes
+
+        self.rows = list()
+        self.nbytes = 0
+        self.rowsLock = threading.Lock() # guards rows/nbytes
+        self.fileLock = threading.Lock() # keeps batches in order
+
+        self.stopEvent = threading.Event()
+        self.thread = None
+        if flushInterval:
+            self.thread = threading.Thread(target=CsvSink._flusher,
+                                           args=(weakref.ref(self),
+                                                 flushInterval,
+                                                 self.stopEvent),
+                                           daemon=True)
+            self.thread.start()
+
+        self.finalizer = weakref.finalize(self, CsvSink._closefile, self.fd,
+                                          self.rows, self.fileLock,
+                                          self.stopEvent)
+
+    @staticmethod
+    def _append(fd, rows):
+        """Write rows in one call (appended at the end of the file)"""
+        data = ''.join(rows).encode('utf-8')
+        while data:  # a regular file takes all at once
+            data = data[os.write(fd, data):]
+
+    @staticmethod
+    def _closefile(fd, rows, fileLock, stopEvent):
+        """Write rows left and close file (no reference to the sink)"""
+        stopEvent.set()
+        with fileLock:
+            CsvSink._append(fd, rows)
+            os.close(fd)
+            del rows[:]
+
+    @staticmethod
+    def _flusher(sinkref, interval, stopEvent):
+        """Background thread flushing kept rows periodically (a weak
+        reference lets the sink be garbage collected)"""
+        while not stopEvent.wait(interval):
+            sink = sinkref()
+            if sink is None:
+                break
+
+            sink.flush()
+            del sink
+
+    def write(self, row):
+        """Keep row (newline terminated) and flush over thresholds"""
+        with self.rowsLock:
+            self.rows.append(row)
+            self.nbytes += len(row)
+            full = len(self.rows) >= self.flushRows or \
+                   self.nbytes >= self.flushBytes
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write kept rows into file"""
+        with self.fileLock:
+            with self.rowsLock:
+                # emptied in place: the finalizer holds the list
+                rows, self.nbytes = self.rows[:], 0
+                del self.rows[:]
+
+            if rows and self.finalizer.alive:  # else file closed
+                self._append(self.fd, rows)
+
+    def close(self):
+        """Stop background thread, flush kept rows and close file"""
+        if self.thread is not None:
+            self.stopEvent.set()
+            self.thread.join()
+            self.thread = None
+
+        self.finalizer()
 
 class RecordValues(bt.Strategy):
     """Record values
        Values are created in subclass
-       Output log complies with csv format"""
+       Output log complies with csv format
+
+       Params:
+        fileName: output csv file
+        columnNames: names of the columns written into the header
+        comment: optional comment line written into the header
+        flushRows/flushBytes/flushInterval: buffering of the output,
+                                            see CsvSink
+        progressInterval: seconds between progress lines printed to stdout
+                          (0 prints progress on every bar)"""
     
     params = dict(fileName='',
                   columnNames=list(),
-                  comment=None)
+                  comment=None,
+                  flushRows=10000,
+                  flushBytes=1 << 20,
+                  flushInterval=None,
+                  progressInterval=1.0)
     
     def __init__(self):
         self.cnt = 0
+        self.lastProgress = None
+        
+        self.sink = CsvSink(self.p.fileName,
+                            flushRows=self.p.flushRows,
+                            flushBytes=self.p.flushBytes,
+                            flushInterval=self.p.flushInterval)
         
         # Write data info into file
-        with open(self.p.fileName, 'w') as file:
-            file.write('# Execution time: %s\n' % (datetime.datetime.utcnow().strftime('%d.%m.%Y %H:%M UTC')))
+        self.sink.write('# Execution time: %s\n' % (datetime.datetime.utcnow().strftime('%d.%m.%Y %H:%M UTC')))
 
         # Write comment in case provided
         if self.p.comment:
-            with open(self.p.fileName, 'a') as file:
-                file.write('# ' + self.p.comment + '\n')
+            self.sink.write('# ' + self.p.comment + '\n')
         
         # Write column names into file
-        with open(self.p.fileName, 'a') as file:
-            file.write(','.join(self.params.columnNames)+'\n')
+        self.sink.write(','.join(self.params.columnNames)+'\n')
+        self.sink.flush()
         
     def log(self,
             txt,
@@ -32,8 +156,18 @@ class RecordValues(bt.Strategy):
         
         # Write log to file
         dt = bt.num2date(dt) if dt else bt.num2date(self.datas[0].datetime[0])
-        with open(self.p.fileName, 'a') as file:
-            file.write('%s,%s\n' % (dt.strftime("%d.%m.%Y %H:%M"), txt))
+        self.sink.write('%s,%s\n' % (dt.strftime("%d.%m.%Y %H:%M"), txt))
+    
+    def progress(self, final=False):
+        """Print progress to stdout at most every progressInterval seconds"""
+        now = time.monotonic()
+        if not final and self.lastProgress is not None and \
+           now - self.lastProgress < self.p.progressInterval:
+            return
+        
+        self.lastProgress = now
+        print('Backtesting: %.2f%%' % (self.cnt*100/self.datas[0].p.len),
+              end='\n' if final else '\r')
     
     def prenext(self):
         self.cnt += 1
@@ -42,15 +176,21 @@ class RecordValues(bt.Strategy):
         self.cnt += 1
         
         # Print progress to stdout
-        print('Backtesting: %.2f%%' % (self.cnt*100/self.datas[0].p.len), end='\r')
+        self.progress()
     
     def next(self):
         self.cnt += 1
         
         # Print progress to stdout
-        print('Backtesting: %.2f%%' % (self.cnt*100/self.datas[0].p.len), end='\r')
+        self.progress()
     
     def stop(self):
         
-        # Print final progress to stdout
-        print('Backtesting: %.2f%%' % (self.cnt*100/self.datas[0].p.len))
+        try:
+            # Print final progress to stdout
+            self.progress(final=True)
+        finally:
+            # Write remaining rows and close file (the sink cannot be
+            # pickled with the strategy: optimization results)
+            self.sink.close()
+            self.sink = None
@@ -223,7 +223,7 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         self.writers.append(writer)
 
     def _addindicator(self, indcls, *indargs, **indkwargs):
-        indcls(*indargs, **indkwargs)
+        indcls(*indargs, _owner=self, **indkwargs)
 
     def _addanalyzer_slave(self, ancls, *anargs, **ankwargs):
         '''Like _addanalyzer but meant for observers (or other entities) which
@@ -244,7 +244,7 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         anname = ankwargs.pop('_name', '') or ancls.__name__.lower()
         nsuffix = next(self._alnames[anname])
         anname += str(nsuffix or '')  # 0 (first instance) gets no suffix
-        analyzer = ancls(*anargs, **ankwargs)
+        analyzer = ancls(*anargs, _owner=self, **ankwargs)
         self.analyzers.append(analyzer, anname)
 
     def _addobserver(self, multi, obscls, *obsargs, **obskwargs):
@@ -254,7 +254,7 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
 
         if not multi:
             newargs = list(itertools.chain(self.datas, obsargs))
-            obs = obscls(*newargs, **obskwargs)
+            obs = obscls(*newargs, _owner=self, **obskwargs)
             self.stats.append(obs, obsname)
             return
 
@@ -262,7 +262,7 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         l = getattr(self.stats, obsname)
 
         for data in self.datas:
-            obs = obscls(data, *obsargs, **obskwargs)
+            obs = obscls(data, *obsargs, _owner=self, **obskwargs)
             l.append(obs)
 
     def _getminperstatus(self):
@@ -22,7 +22,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
-from datetime import datetime, timedelta, time
+import bisect
+import collections
+from datetime import date, datetime, timedelta, time
 
 from .metabase import MetaParams
 from backtrader.utils.py3 import string_types, with_metaclass
@@ -45,6 +47,9 @@ ONEDAY = timedelta(days=1)
 
 
 class TradingCalendarBase(with_metaclass(MetaParams, object)):
+    _cachedays = 365  # days of sessions loaded at once by _schedule
+    _lrusize = 1024  # days kept by _lrunextday
+
     def _nextday(self, day):
         '''
         Returns the next trading day (datetime/date instance) after ``day``
@@ -61,19 +66,74 @@ class TradingCalendarBase(with_metaclass(MetaParams, object)):
         '''
         raise NotImplementedError
 
+    def _sessions(self, start, end, tz=None):
+        '''
+        Returns the sessions of the days from ordinal ``start`` to ordinal
+        ``end`` (not included) as 3 lists: the ordinals of the days with a
+        session and the opening and closing times (``datetime`` instances,
+        in UTC if ``tz`` is given) of the sessions
+        '''
+        raise NotImplementedError
+
+    def _schedule(self, day, tz=None):
+        '''
+        Returns the opening and closing times of the 1st session from the
+        date of ``day`` on whose closing time is not before ``day``
+
+        The sessions returned by ``_sessions`` are kept in sorted lists
+        which are extended as needed and searched with ``bisect``
+        '''
+        caches = self.__dict__.setdefault('_scaches', {})
+        dayord = day.toordinal()
+        while True:
+            cache = caches.get(tz)
+            if cache is None or not cache[0] <= dayord < cache[1]:
+                # (re)start the cache at the day
+                end = dayord + self._cachedays
+                cache = caches[tz] = [dayord, end] + \
+                    list(self._sessions(dayord, end, tz))
+
+            start, end, ords, openings, closings = cache
+            i = bisect.bisect_left(closings, day,
+                                   bisect.bisect_left(ords, dayord))
+            if i < len(closings):
+                return openings[i], closings[i]
+
+            # the sessions of the day are over: load the next days
+            cache[1] = end + self._cachedays
+            for l, x in zip(cache[2:], self._sessions(end, cache[1], tz)):
+                l.extend(x)
+
+    def _lrunextday(self, day):
+        '''
+        ``_nextday`` with a cache of the last ``_lrusize`` looked up days
+        '''
+        lru = self.__dict__.setdefault('_lru', collections.OrderedDict())
+        try:
+            ret = lru[day]
+        except KeyError:
+            ret = lru[day] = self._nextday(day)
+            if len(lru) > self._lrusize:
+                lru.popitem(last=False)  # least recently used
+        else:
+            lru.move_to_end(day)
+
+        return ret
+
     def nextday(self, day):
         '''
         Returns the next trading day (datetime/date instance) after ``day``
         (datetime/date instance)
         '''
-        return self._nextday(day)[0]  # 1st ret elem is next day
+        return self._lrunextday(day)[0]  # 1st ret elem is next day
 
     def nextday_week(self, day):
         '''
         Returns the iso week number of the next trading day, given a ``day``
         (datetime/date) instance
         '''
-        self._nextday(day)[1][1]  # 2 elem is isocal / 0 - y, 1 - wk, 2 - day
+        # 2 elem is isocal / 0 - y, 1 - wk, 2 - day
+        self._lrunextday(day)[1][1]
 
     def last_weekday(self, day):
         '''
@@ -82,7 +142,7 @@ class TradingCalendarBase(with_metaclass(MetaParams, object)):
         '''
         # Next day must be greater than day. If the week changes is enough for
         # a week change even if the number is smaller (year change)
-        return day.isocalendar()[1] != self._nextday(day)[1][1]
+        return day.isocalendar()[1] != self._lrunextday(day)[1][1]
 
     def last_monthday(self, day):
         '''
@@ -91,7 +151,7 @@ class TradingCalendarBase(with_metaclass(MetaParams, object)):
         '''
         # Next day must be greater than day. If the week changes is enough for
         # a week change even if the number is smaller (year change)
-        return day.month != self._nextday(day)[0].month
+        return day.month != self._lrunextday(day)[0].month
 
     def last_yearday(self, day):
         '''
@@ -100,7 +160,7 @@ class TradingCalendarBase(with_metaclass(MetaParams, object)):
         '''
         # Next day must be greater than day. If the week changes is enough for
         # a week change even if the number is smaller (year change)
-        return day.year != self._nextday(day)[0].year
+        return day.year != self._lrunextday(day)[0].year
 
 
 class TradingCalendar(TradingCalendarBase):
@@ -144,7 +204,9 @@ class TradingCalendar(TradingCalendarBase):
     )
 
     def __init__(self):
-        self._earlydays = [x[0] for x in self.p.earlydays]  # speed up searches
+        self._earlydays = {}  # speed up searches (1st entry of a day wins)
+        for x in self.p.earlydays:
+            self._earlydays.setdefault(x[0], x[1:])
 
     def _nextday(self, day):
         '''
@@ -169,29 +231,26 @@ class TradingCalendar(TradingCalendarBase):
 
         The return value is a tuple with 2 components: opentime, closetime
         '''
-        while True:
-            dt = day.date()
-            try:
-                i = self._earlydays.index(dt)
-                o, c = self.p.earlydays[i][1:]
-            except ValueError:  # not found
-                o, c = self.p.open, self.p.close
-
-            closing = datetime.combine(dt, c)
-            if tz is not None:
-                closing = tz.localize(closing).astimezone(UTC)
-                closing = closing.replace(tzinfo=None)
+        return self._schedule(day, tz)
 
-            if day > closing:  # current time over eos
-                day += ONEDAY
-                continue
+    def _sessions(self, start, end, tz=None):
+        ords, openings, closings = [], [], []
+        for dayord in range(start, end):
+            dt = date.fromordinal(dayord)
+            o, c = self._earlydays.get(dt, (self.p.open, self.p.close))
 
-            opening = datetime.combine(dt, o)
+            opening, closing = datetime.combine(dt, o), datetime.combine(dt, c)
             if tz is not None:
                 opening = tz.localize(opening).astimezone(UTC)
                 opening = opening.replace(tzinfo=None)
+                closing = tz.localize(closing).astimezone(UTC)
+                closing = closing.replace(tzinfo=None)
+
+            ords.append(dayord)
+            openings.append(opening)
+            closings.append(closing)
 
-            return opening, closing
+        return ords, openings, closings
 
 
 class PandasMarketCalendar(TradingCalendarBase):
@@ -233,10 +292,9 @@ class PandasMarketCalendar(TradingCalendarBase):
             import pandas_market_calendars as mcal
             self._calendar = mcal.get_calendar(self._calendar)
 
-        import pandas as pd  # guaranteed because of pandas_market_calendars
-        self.dcache = pd.DatetimeIndex([0.0])
-        self.idcache = pd.DataFrame(index=pd.DatetimeIndex([0.0]))
+        self.dcache = [0, 0, [], []]  # start, end, ordinals, valid days
         self.csize = timedelta(days=self.p.cachesize)
+        self._cachedays = self.p.cachesize
 
     def _nextday(self, day):
         '''
@@ -245,16 +303,24 @@ class PandasMarketCalendar(TradingCalendarBase):
 
         The return value is a tuple with 2 components: (nextday, (y, w, d))
         '''
-        day += ONEDAY
+        dayord = day.toordinal() + 1
         while True:
-            i = self.dcache.searchsorted(day)
-            if i == len(self.dcache):
-                # keep a cache of 1 year to speed up searching
-                self.dcache = self._calendar.valid_days(day, day + self.csize)
-                continue
-
-            d = self.dcache[i].to_pydatetime()
-            return d, d.isocalendar()
+            start, end, ords, days = self.dcache
+            if not start <= dayord < end:
+                start = end = dayord  # (re)start the cache at the day
+                ords, days = [], []
+            else:
+                i = bisect.bisect_left(ords, dayord)
+                if i < len(ords):
+                    d = days[i].to_pydatetime()
+                    return d, d.isocalendar()
+
+            # keep a cache of 1 year to speed up searching
+            dt = date.fromordinal(end)
+            valid = self._calendar.valid_days(dt, dt + self.csize - ONEDAY)
+            valid = list(valid)
+            self.dcache = [start, end + self.p.cachesize,
+                           ords + [x.toordinal() for x in valid], days + valid]
 
     def schedule(self, day, tz=None):
         '''
@@ -264,17 +330,16 @@ class PandasMarketCalendar(TradingCalendarBase):
 
         The return value is a tuple with 2 components: opentime, closetime
         '''
-        while True:
-            i = self.idcache.index.searchsorted(day.date())
-            if i == len(self.idcache):
-                # keep a cache of 1 year to speed up searching
-                self.idcache = self._calendar.schedule(day, day + self.csize)
-                continue
-
-            st = (x.tz_localize(None) for x in self.idcache.iloc[i, 0:2])
-            opening, closing = st  # Get utc naive times
-            if day > closing:  # passed time is over the sessionend
-                day += ONEDAY  # wrap over to next day
-                continue
-
-            return opening.to_pydatetime(), closing.to_pydatetime()
+        return self._schedule(day, tz)
+
+    def _sessions(self, start, end, tz=None):
+        sched = self._calendar.schedule(date.fromordinal(start),
+                                        date.fromordinal(end - 1))
+
+        ords = [x.toordinal() for x in sched.index]
+        # Get utc naive times
+        openings, closings = (
+            [x.tz_localize(None).to_pydatetime() for x in sched.iloc[:, i]]
+            for i in range(2)
+        )
+        return ords, openings, closings
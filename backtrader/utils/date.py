@@ -22,8 +22,10 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
-from .dateintern import (num2date, num2dt, date2num, time2num, num2time,
-                         UTC, TZLocal, Localizer, tzparse, TIME_MAX, TIME_MIN)
+from .dateintern import (num2date, num2dt, date2num, dates2num, time2num,
+                         num2time, UTC, TZLocal, Localizer, tzparse,
+                         TIME_MAX, TIME_MIN)
 
-__all__ = ('num2date', 'num2dt', 'date2num', 'time2num', 'num2time',
-           'UTC', 'TZLocal', 'Localizer', 'tzparse', 'TIME_MAX', 'TIME_MIN')
+__all__ = ('num2date', 'num2dt', 'date2num', 'dates2num', 'time2num',
+           'num2time', 'UTC', 'TZLocal', 'Localizer', 'tzparse',
+           'TIME_MAX', 'TIME_MIN')
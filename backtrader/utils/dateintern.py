@@ -25,6 +25,8 @@ import datetime
 import math
 import time as _time
 
+import numpy as np
+
 from .py3 import string_types
 
 
@@ -227,6 +229,33 @@ def date2num(dt, tz=None):
     return base
 
 
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+MUSECONDS_PER_HOUR = 3600 * 1000000
+MUSECONDS_PER_MINUTE = 60 * 1000000
+
+
+def dates2num(dts):
+    """
+    Vectorized version of :func:`date2num` for an array of ``datetime64``
+    values (naive values are taken as UTC). Return value is a ``float64``
+    :class:`numpy.ndarray` with the same values ``date2num`` would deliver
+    for each element
+    """
+    mus = np.asarray(dts).astype('datetime64[us]').astype(np.int64)
+
+    days, mus = np.divmod(mus, int(MUSECONDS_PER_DAY))
+    hour, mus = np.divmod(mus, MUSECONDS_PER_HOUR)
+    minute, mus = np.divmod(mus, MUSECONDS_PER_MINUTE)
+    second, microsecond = np.divmod(mus, 1000000)
+
+    # Add the fractional terms before the base (like fsum does) to keep
+    # precision parity with date2num
+    frac = (hour / HOURS_PER_DAY + minute / MINUTES_PER_DAY +
+            second / SECONDS_PER_DAY + microsecond / MUSECONDS_PER_DAY)
+
+    return (days + EPOCH_ORDINAL).astype(np.float64) + frac
+
+
 def time2num(tm):
     """
     Converts the hour/minute/second/microsecond part of tm (datetime.datetime
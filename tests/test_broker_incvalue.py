@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import random
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    params = (('seed', 0),)
+
+    def start(self):
+        self.rng = random.Random(self.p.seed)
+        self.values = list()
+
+    def next(self):
+        self.values.append((self.broker.getvalue(), self.broker.getcash(),
+                            self.broker.get_leverage()))
+        for data in self.datas:
+            r = self.rng.random()
+            if r < 0.1:
+                self.buy(data=data, size=self.rng.randint(1, 5))
+            elif r < 0.2:
+                self.sell(data=data, size=self.rng.randint(1, 5))
+            elif r < 0.25:
+                self.close(data=data)
+
+
+def runvalues(incvalue, seed):
+    cerebro = bt.Cerebro(stdstats=False)
+    for i in range(2):
+        cerebro.adddata(testcommon.getdata(i), name='d%d' % i)
+
+    cerebro.broker.setcash(1e6)
+    cerebro.broker.set_incvalue(incvalue)
+    # futures-like (cash adjusted every bar) and stocks with interest
+    cerebro.broker.setcommission(commission=2.0, margin=1000.0, mult=10.0,
+                                 name='d0')
+    cerebro.broker.setcommission(commission=0.001, interest=0.03,
+                                 leverage=2.0, name='d1')
+    cerebro.addstrategy(RunStrategy, seed=seed)
+    strat = cerebro.run()[0]
+    return strat.values
+
+
+def test_run(main=False):
+    for seed in range(3):
+        full = runvalues(False, seed)
+        inc = runvalues(True, seed)
+        assert len(full) == len(inc)
+        for vfull, vinc in zip(full, inc):
+            for x, y in zip(vfull, vinc):
+                assert abs(x - y) <= 1e-9 * max(1.0, abs(x)), (vfull, vinc)
+
+        if main:
+            print(seed, full[-1], inc[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
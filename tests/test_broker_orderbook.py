@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+import backtrader as bt
+from backtrader.brokers.bbroker import OrderBook
+
+
+class RunStrategy(bt.Strategy):
+    def start(self):
+        self.broker.set_cash(1e9)
+        self.notifs = list()
+
+    def notify_order(self, order):
+        self.notifs.append((order.ref, order.status))
+
+    def nextstart(self):
+        close = self.data.close[0]
+        Limit, Stop = bt.Order.Limit, bt.Order.Stop
+        # resting far away from the prices: never tried
+        self.far = [self.buy(exectype=Limit, price=close * 0.1 - i)
+                    for i in range(100)]
+        self.far += [self.sell(exectype=Stop, price=close * 0.1 - i)
+                     for i in range(100)]
+        # close to the prices: execute
+        self.near = self.buy(exectype=Stop, price=close * 0.99)
+        self.oco = self.sell(exectype=Limit, price=close * 1.5, oco=self.near)
+        # expire
+        self.exp = self.buy(exectype=Limit, price=close * 0.1, valid=(
+            self.data.datetime.date() + datetime.timedelta(days=5)))
+
+
+def test_run(main=False):
+    book = OrderBook()
+    assert len(book) == 0 and list(book) == []
+
+    datas = [testcommon.getdata(0)]
+    cerebros = testcommon.runtest(datas, RunStrategy, plot=main)
+    for cerebro in cerebros:
+        strat = cerebro.runstrats[0][0]
+        open_ = strat.broker.get_orders_open()
+        assert open_ == strat.far  # in submission order
+        assert strat.near.status == bt.Order.Completed
+        assert strat.oco.status == bt.Order.Canceled
+        assert strat.exp.status == bt.Order.Expired
+
+        # refs of the orders notified as completed/canceled/expired
+        done = [ref for ref, status in strat.notifs
+                if status in (bt.Order.Completed, bt.Order.Canceled,
+                              bt.Order.Expired)]
+        assert sorted(done) == sorted(
+            [strat.near.ref, strat.oco.ref, strat.exp.ref])
+
+        if main:
+            print(len(open_), strat.near.executed.price, done)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
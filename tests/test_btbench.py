@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import copy
+import json
+import os.path
+import shutil
+import tempfile
+
+import testcommon  # noqa: F401 (puts the package in sys.path)
+
+from backtrader.btbench import btbench, compare
+
+
+def test_run(main=False):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        save = os.path.join(tmpdir, 'bench.json')
+        run = btbench(['--bars', '600', '--repeat', '1', '--noisolate',
+                       '--cases', 'runonce,resample', '--save', save])
+        with open(save) as f:
+            assert json.load(f) == json.loads(json.dumps(run))
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if main:
+        print(json.dumps(run, indent=2))
+
+    assert list(run['results']) == ['runonce', 'resample']
+    for result in run['results'].values():
+        assert result['bars'] == 600
+        assert result['barspersec'] > 0
+
+    # same run as baseline: no regressions
+    assert not compare(run, run)
+
+    # baseline twice as fast with half the memory
+    baseline = copy.deepcopy(run)
+    for result in baseline['results'].values():
+        result['barspersec'] *= 2.0
+        if result['maxrss']:
+            result['maxrss'] /= 2.0
+
+    regressions = compare(run, baseline, tolerance=0.10)
+    metrics = set((x[0], x[1]) for x in regressions)
+    assert ('runonce', 'barspersec') in metrics
+    assert ('resample', 'barspersec') in metrics
+
+    # within tolerance
+    assert not [x for x in compare(run, baseline, tolerance=0.60)
+                if x[1] == 'barspersec']
+
+
+if __name__ == '__main__':
+    test_run(main=True)
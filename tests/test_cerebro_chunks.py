@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.inds = [
+            bt.ind.SMA(self.data0, period=30),  # with a sub-indicator
+            bt.ind.RSI(self.data0),
+            bt.ind.Hurst(self.data0, period=40),
+            self.data0.close - self.data0.open(-1),
+            bt.ind.SMA(self.data1, period=5),
+        ]
+        self.cross = bt.ind.CrossOver(self.data0.close, self.inds[0])
+        self.values = []
+        self.maxbuf = 0
+
+    def next(self):
+        self.maxbuf = max(self.maxbuf, len(self.data0.close.array),
+                          len(self.inds[0].array))
+        if self.cross > 0:
+            self.buy()
+        elif self.cross < 0:
+            self.close()
+
+        self.values.append(
+            (len(self), self.data0.datetime[0], len(self.data1)) +
+            tuple(ind[0] for ind in self.inds))
+
+
+class NoChunkStrategy(bt.Strategy):
+    # chunks are not used: HeikinAshi forces next mode and the chikou span
+    # of Ichimoku sets values in past bars
+    params = (('ind', bt.ind.HeikinAshi),)
+
+    def __init__(self):
+        self.ind = self.p.ind(self.data0)
+        self.values = []
+
+    def next(self):
+        self.values.append(tuple(x[0] for x in self.ind.lines))
+
+
+def run(strategy=RunStrategy, ind=None, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    if ind is None:
+        cerebro.addstrategy(strategy)
+    else:
+        cerebro.addstrategy(strategy, ind=ind)
+    strat = cerebro.run()[0]
+    return strat, cerebro.broker.getvalue()
+
+
+def nanstr(values):
+    return [tuple(map(str, x)) for x in values]  # nan == nan
+
+
+def test_run(main=False):
+    strat, value = run()
+
+    for chunkbars in (1, 50, 100, 1000):
+        cstrat, cvalue = run(exactbars=1, chunkbars=chunkbars)
+
+        # bounded buffers (the unbounded run holds the 255 bars)
+        assert cstrat.maxbuf <= max(chunkbars, 42) + 42
+
+        # same results as the unbounded vectorized run (sums over numpy
+        # slices of a chunk may differ in the last digit)
+        assert value == cvalue
+        assert len(strat.values) == len(cstrat.values)
+        for v0, v1 in zip(strat.values, cstrat.values):
+            assert v0[:3] == v1[:3]
+            for x0, x1 in zip(v0[3:], v1[3:]):
+                assert (math.isnan(x0) and math.isnan(x1)) or \
+                    math.isclose(x0, x1, rel_tol=1e-9, abs_tol=1e-12)
+
+        if main:
+            print('chunkbars', chunkbars, cstrat.maxbuf,
+                  cvalue, cstrat.values[-1])
+
+    # same results as with exactbars=1 alone
+    for ind in (bt.ind.HeikinAshi, bt.ind.Ichimoku):
+        strat = run(NoChunkStrategy, exactbars=1, ind=ind)[0]
+        for chunkbars in (50, 1000):
+            cstrat = run(NoChunkStrategy, exactbars=1, chunkbars=chunkbars,
+                         ind=ind)[0]
+            assert nanstr(cstrat.values) == nanstr(strat.values)
+
+        if main:
+            print(ind.__name__, len(strat.values), strat.values[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
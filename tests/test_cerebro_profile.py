@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = bt.ind.SMA(period=15)
+        self.cross = bt.ind.CrossOver(self.data.close, self.sma)
+
+    def next(self):
+        if self.cross > 0:
+            self.buy()
+        elif self.cross < 0:
+            self.close()
+
+
+class RaiseStrategy(RunStrategy):
+    def next(self):
+        if len(self) == 50:
+            raise ValueError('stop')
+
+
+def runprofile(runonce, profile):
+    cerebro = bt.Cerebro(runonce=runonce, profile=profile)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(RunStrategy)
+    cerebro.addanalyzer(bt.analyzers.SharpeRatio)
+    strat = cerebro.run()[0]
+    return cerebro, strat
+
+
+def test_run(main=False):
+    for runonce in (True, False):
+        cerebro, strat = runprofile(runonce, False)
+        assert cerebro.profiler is None
+        value = cerebro.broker.getvalue()
+
+        cerebro, strat = runprofile(runonce, True)
+        assert cerebro.broker.getvalue() == value
+        # wrappers are gone after the run
+        assert 'next' not in vars(strat)
+        assert '_next' not in vars(strat.sma)
+
+        if main:
+            cerebro.profiler.report()
+
+        nbars = len(strat.data)
+        tree = cerebro.profiler.tree()
+        assert tree['name'] == 'Cerebro'
+        assert tree['stats']['_brokernotify']['calls'] == nbars
+
+        names = [c['name'] for c in tree['children']]
+        assert names == ['BackBroker', 'RunStrategy']
+
+        snode = tree['children'][1]
+        driver = '_oncepost' if runonce else '_next'
+        assert snode['stats'][driver]['calls'] == nbars
+        assert snode['stats']['next']['calls'] == nbars - 15  # 15 prenext
+
+        snames = [c['name'] for c in snode['children']]
+        for name in ('SMA', 'CrossOver', 'Broker', 'SharpeRatio'):
+            assert name in snames
+
+        smanode = snode['children'][snames.index('SMA')]
+        if runonce:
+            assert smanode['stats']['_once']['calls'] == 1
+        else:
+            assert smanode['stats']['_next']['calls'] == nbars
+
+        table = cerebro.profiler.table()
+        times = [row[3] for row in table]
+        assert times == sorted(times, reverse=True)
+        assert ('Cerebro/RunStrategy/SMA', 'once' if runonce else 'next') in \
+            [row[:2] for row in table]
+
+        # a raising run leaves no wrappers behind and keeps its profile
+        cerebro = bt.Cerebro(runonce=runonce, profile=True)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(RaiseStrategy)
+        try:
+            cerebro.run()
+        except ValueError:
+            pass
+        else:
+            assert False
+
+        for obj in (cerebro, cerebro.broker):
+            assert not set(vars(obj)) & {'_brokernotify', '_check_timers',
+                                         '_next_writers', 'next'}
+
+        tree = cerebro.profiler.tree()
+        assert tree['children'][1]['stats']['next']['calls'] == 50 - 15
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import math
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import pandas as pd
+
+
+def datapath(fname):
+    return os.path.join(testcommon.modpath, testcommon.dataspath, fname)
+
+
+def getfeeds():
+    fromdate = datetime.datetime(2006, 3, 1)
+    todate = datetime.datetime(2006, 10, 31)
+
+    yield bt.feeds.BacktraderCSVData(
+        dataname=datapath('2006-day-001.txt'),
+        fromdate=fromdate, todate=todate)
+
+    yield bt.feeds.BacktraderCSVData(
+        dataname=datapath('2006-min-005.txt'),
+        timeframe=bt.TimeFrame.Minutes, compression=5)
+
+    yield bt.feeds.GenericCSVData(
+        dataname=datapath('2006-day-001.txt'), dtformat='%Y-%m-%d',
+        fromdate=fromdate, todate=todate)
+
+    yield bt.feeds.GenericCSVData(
+        dataname=datapath('2006-min-005.txt'),
+        timeframe=bt.TimeFrame.Minutes, compression=5,
+        dtformat='%Y-%m-%d', time=1, open=2, high=3, low=4, close=5,
+        volume=6, openinterest=-1)
+
+    df = pd.read_csv(datapath('2006-day-001.txt'), index_col=0,
+                     parse_dates=True)
+    yield bt.feeds.PandasDirectData(dataname=df,
+                                    fromdate=fromdate, todate=todate)
+
+
+def getlines(data, preload):
+    cerebro = bt.Cerebro(preload=preload, stdstats=False)
+    cerebro.adddata(data)
+    strat = cerebro.run()[0]
+    data = strat.data
+    return [list(line.plotrange(0, data.buflen())) for line in data.lines]
+
+
+def sameline(a, b):
+    return len(a) == len(b) and all(
+        x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+def test_run(main=False):
+    for bulk, perbar in zip(getfeeds(), getfeeds()):
+        bulklines = getlines(bulk, preload=True)  # uses _loadbulk
+        perbarlines = getlines(perbar, preload=False)
+
+        if main:
+            print(type(bulk).__name__, 'bars', len(bulklines[0]))
+
+        assert len(bulklines[0])
+        assert all(sameline(a, b) for a, b in zip(bulklines, perbarlines))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    def stop(self):
+        self.bars = [
+            [line[-i] for line in self.data.lines[:-1]]  # no datetime
+            + [self.data.datetime.datetime(-i)]
+            for i in reversed(range(len(self.data)))]
+
+
+def getbars(data, preload):
+    cerebro = bt.Cerebro(preload=preload, stdstats=False)
+    cerebro.adddata(data)
+    cerebro.addstrategy(RunStrategy)
+    return cerebro.run()[0].bars
+
+
+def test_run(main=False):
+    fd, filename = tempfile.mkstemp(suffix='.btmmap')
+    os.close(fd)
+    try:
+        rows = bt.feeds.writemmap(testcommon.getdata(0), filename)
+        header, offset = bt.feeds.mmapfeed.readmmapheader(filename)
+        assert header['rows'] == rows == 255 and offset % 8 == 0
+        assert header['columns'][-1] == 'datetime'
+
+        for preload in (True, False):
+            src = getbars(testcommon.getdata(0), preload)
+            bars = getbars(bt.feeds.MmapData(dataname=filename), preload)
+            assert bars == src
+
+            # binary search on the datetime column
+            fromdate = datetime.date(2006, 3, 1)
+            todate = datetime.date(2006, 6, 30)
+            data = bt.feeds.MmapData(dataname=filename, fromdate=fromdate,
+                                     todate=todate)
+            bars = getbars(data, preload)
+            src = getbars(testcommon.getdata(0, fromdate, todate), preload)
+            assert bars == src and len(bars) == 85
+
+            if main:
+                print('preload', preload, len(bars), bars[0][-1],
+                      bars[-1][-1])
+
+        # a feed outside of cerebro with a calendar of its own
+        cal = bt.TradingCalendar()
+        data = testcommon.getdata(0)
+        assert bt.feeds.writemmap(data, filename, calendar=cal) == rows
+        assert data._calendar is cal and data.getenvironment() is None
+
+        # timeframe, compression and name from the header unless given
+        data = testcommon.DATAFEED(
+            dataname=testcommon.getdata(0).p.dataname,
+            timeframe=bt.TimeFrame.Weeks, compression=2, name='weekly')
+        bt.feeds.writemmap(data, filename)
+
+        data = bt.feeds.MmapData(dataname=filename)
+        assert (data._timeframe, data._compression, data._name) == \
+            (bt.TimeFrame.Weeks, 2, 'weekly')
+
+        cerebro = bt.Cerebro()
+        cerebro.adddata(data)
+        assert cerebro.datasbyname['weekly'] is data
+
+        data = bt.feeds.MmapData(dataname=filename, name='other',
+                                 timeframe=bt.TimeFrame.Minutes,
+                                 compression=5)
+        assert (data._timeframe, data._compression, data._name) == \
+            (bt.TimeFrame.Minutes, 5, 'other')
+
+        # given values equal to the defaults are also kept
+        data = bt.feeds.MmapData(dataname=filename,
+                                 timeframe=bt.TimeFrame.Days, compression=1)
+        assert (data._timeframe, data._compression, data._name) == \
+            (bt.TimeFrame.Days, 1, 'weekly')
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.smas = [bt.ind.SMA(d, period=3) for d in self.datas]
+
+    def start(self):
+        self.steps = list()
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        self.steps.append(tuple(
+            (len(d), d.datetime[0], d.close[0] if len(d) else None)
+            for d in self.datas))
+
+        if len(self) % 5 == 0:
+            self.buy(data=self.datas[len(self) % len(self.datas)])
+
+
+def runsteps(nextheap, preload, resample=False, exactbars=False):
+    cerebro = bt.Cerebro(runonce=False, preload=preload, nextheap=nextheap,
+                         exactbars=exactbars, stdstats=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))  # weekly
+    cerebro.adddata(testcommon.getdata(
+        0, fromdate=datetime.datetime(2006, 3, 1)))  # starts later
+    if resample:
+        cerebro.resampledata(testcommon.getdata(0),
+                             timeframe=bt.TimeFrame.Weeks)
+
+    cerebro.addstrategy(RunStrategy)
+    strat = cerebro.run()[0]
+    return strat.steps, cerebro.broker.getvalue()
+
+
+def test_run(main=False):
+    for preload in (True, False):
+        for resample in (False, True):  # resample: default scheduler used
+            steps, value = runsteps(False, preload, resample)
+            hsteps, hvalue = runsteps(True, preload, resample)
+            if main:
+                print(preload, resample, len(steps), len(hsteps), value)
+
+            assert hsteps == steps
+            assert hvalue == value
+
+    # bounded buffers: default scheduler used
+    for exactbars in (-1, 1):
+        steps, value = runsteps(False, False, exactbars=exactbars)
+        hsteps, hvalue = runsteps(True, False, exactbars=exactbars)
+        if main:
+            print('exactbars', exactbars, len(steps), len(hsteps), value)
+
+        assert hsteps == steps
+        assert hvalue == value
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import pandas as pd
+
+
+def getpandasdata(fromdate=testcommon.FROMDATE, todate=testcommon.TODATE):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    return bt.feeds.PandasData(fileName=datapath, sep=',', header=0,
+                               usecols=[0, 1, 2, 3, 4],
+                               fromdate=fromdate, todate=todate,
+                               timeframe=bt.TimeFrame.Days)
+
+
+def getlines(data, preload):
+    cerebro = bt.Cerebro(preload=preload, stdstats=False)
+    cerebro.adddata(data)
+    strat = cerebro.run()[0]
+    data = strat.data
+    # daily csv bars are stamped at the session end: compare the date only
+    dates = [bt.num2date(x).date()
+             for x in data.lines.datetime.plotrange(0, data.buflen())]
+    return [dates] + [
+        list(getattr(data.lines, name).plotrange(0, data.buflen()))
+        for name in ('open', 'high', 'low', 'close')]
+
+
+def test_run(main=False):
+    for preload in (True, False):
+        ref = getlines(testcommon.getdata(0), preload)
+        pdlines = getlines(getpandasdata(), preload)
+
+        if main:
+            print('preload', preload, 'bars', len(pdlines[0]))
+
+        assert len(pdlines[0]) == 255
+        assert pdlines == ref
+
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                testcommon.datafiles[0])
+        df = pd.read_csv(datapath, index_col=0, parse_dates=True)
+        df.columns = [x.lower() for x in df.columns]
+        pdlines = getlines(bt.feeds.PandasPreloaded(
+            df=df, timeframe=bt.TimeFrame.Days), preload)
+        assert pdlines == ref
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import math
+import os.path
+
+import numpy as np
+
+import testcommon
+
+import backtrader as bt
+from backtrader.resamplerfilter import Resampler
+
+
+class BarResampler(Resampler):
+    # an overriden method makes the data resample bar by bar
+    def __call__(self, data, *args, **kwargs):
+        return super(BarResampler, self).__call__(data, *args, **kwargs)
+
+
+def getdata(**kwargs):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-min-005.txt')
+    return bt.feeds.BacktraderCSVData(dataname=datapath, **kwargs)
+
+
+def preload(resampler, dkwargs, **kwargs):
+    cerebro = bt.Cerebro()
+    data = getdata(timeframe=bt.TimeFrame.Minutes, compression=5, **dkwargs)
+    data.addfilter(resampler, **kwargs)
+    cerebro.adddata(data)
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.run()
+    return [np.array(line.array) for line in data.lines]
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = bt.ind.SMA(self.data1, period=5)
+        self.values = []
+
+    def next(self):
+        self.values.append((len(self.data0), len(self.data1),
+                            self.data1.datetime[0], self.data1.close[0],
+                            self.data1.volume[0], self.sma[0]))
+
+
+def run(**kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    data = getdata(timeframe=bt.TimeFrame.Minutes, compression=5)
+    cerebro.adddata(data)
+    cerebro.resampledata(data, timeframe=bt.TimeFrame.Days)
+    cerebro.addstrategy(RunStrategy)
+    return cerebro.run()[0].values
+
+
+class StepStrategy(bt.Strategy):
+    def start(self):
+        self.steps = []
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        self.steps.append(tuple(
+            (len(d), d.close[0] if len(d) else None) for d in self.datas))
+
+
+def runsteps(resampler=Resampler, **kwargs):
+    # days with weeks and months: the last resampled bars come in an extra
+    # step after the last day
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    for tframe in (bt.TimeFrame.Weeks, bt.TimeFrame.Months):
+        data = testcommon.getdata(0)
+        data.addfilter(resampler, timeframe=tframe)
+        cerebro.adddata(data)
+
+    cerebro.addstrategy(StepStrategy)
+    return cerebro.run()[0].steps
+
+
+def test_run(main=False):
+    TF = bt.TimeFrame
+    dkwargs = [dict(), dict(sessionend=datetime.time(17, 32))]
+    rkwargs = [
+        dict(timeframe=TF.Minutes, compression=15),
+        dict(timeframe=TF.Minutes, compression=15, rightedge=False),
+        dict(timeframe=TF.Minutes, compression=7, boundoff=3),
+        dict(timeframe=TF.Minutes, compression=10, bar2edge=False),
+        dict(timeframe=TF.Minutes, compression=10, boundoff=3,
+             takelate=False),
+        dict(timeframe=TF.Days, compression=1),
+        dict(timeframe=TF.Days, compression=2),
+        dict(timeframe=TF.Weeks, compression=1),
+        dict(timeframe=TF.Months, compression=1),
+    ]
+
+    # resampling all bars at once delivers the bars of the bar by bar filter
+    for dkw in dkwargs:
+        for rkw in rkwargs:
+            lines0 = preload(BarResampler, dkw, **rkw)
+            lines1 = preload(Resampler, dkw, **rkw)
+            for l0, l1 in zip(lines0, lines1):
+                assert np.array_equal(l0, l1, equal_nan=True)
+
+            if main:
+                print(dkw, rkw, len(lines1[0]))
+
+    # strategies see the same bars with the resampled data preloaded
+    # (runonce, where the sma may differ in the last digit)
+    values0 = run()
+    values1 = run(preloadresample=True)
+    assert len(values0) == len(values1)
+    for v0, v1 in zip(values0, values1):
+        assert v0[:-1] == v1[:-1]
+        assert (math.isnan(v0[-1]) and math.isnan(v1[-1])) or \
+            math.isclose(v0[-1], v1[-1], rel_tol=1e-9)
+
+    if main:
+        print(len(values1), values1[-1])
+
+    steps = runsteps(preload=False)  # resampled bar by bar in next mode
+    for resampler in (Resampler, BarResampler):  # at once and bar by bar
+        for runonce in (True, False):
+            assert runsteps(resampler, preloadresample=True,
+                            runonce=runonce) == steps
+
+    if main:
+        print(len(steps), steps[-2:])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
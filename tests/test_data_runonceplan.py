@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+import backtrader as bt
+
+
+class PeekCerebro(bt.Cerebro):
+    # always use the step by step advance_peek loop
+    @staticmethod
+    def _runonce_plan(datas):
+        return None
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.smas = [bt.ind.SMA(d, period=3) for d in self.datas]
+
+    def start(self):
+        self.steps = list()
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        self.steps.append((self.datetime[0], tuple(
+            (len(d), d.close[0] if len(d) else None) for d in self.datas)))
+
+        if len(self) % 5 == 0:
+            self.buy(data=self.datas[len(self) % len(self.datas)])
+
+
+def runsteps(cerebrocls):
+    cerebro = cerebrocls(stdstats=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))  # weekly
+    cerebro.adddata(testcommon.getdata(
+        0, fromdate=datetime.datetime(2006, 3, 1)))  # starts later
+    cerebro.resampledata(testcommon.getdata(0), timeframe=bt.TimeFrame.Weeks)
+    cerebro.addstrategy(RunStrategy)
+    strat = cerebro.run()[0]
+    return strat.steps, cerebro.broker.getvalue()
+
+
+def test_run(main=False):
+    # repeated datetimes: one step per repetition
+    dts = [[1.0, 2.0, 2.0, 3.0], [2.0, 4.0], [], [2.0, 2.0, 2.0]]
+    datas = list()
+    for dt in dts:
+        data = bt.feeds.DataBase()
+        for x in dt:
+            data.forward()
+            data.lines.datetime[0] = x
+        data.home()
+        datas.append(data)
+
+    stepdts, bounds, idxs = bt.Cerebro._runonce_plan(datas)
+    steps = [(dt0, idxs[bounds[i]:bounds[i + 1]])
+             for i, dt0 in enumerate(stepdts)]
+    assert steps == [(1.0, [0]), (2.0, [0, 1, 3]), (2.0, [0, 3]),
+                     (2.0, [3]), (3.0, [0]), (4.0, [1])]
+
+    steps, value = runsteps(bt.Cerebro)
+    psteps, pvalue = runsteps(PeekCerebro)
+    if main:
+        print(len(steps), len(psteps), value, pvalue)
+
+    assert steps == psteps
+    assert value == pvalue
+
+
+if __name__ == '__main__':
+    test_run(main=True)
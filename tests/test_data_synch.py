@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+def getfeed(fname):
+    return dict(name=fname,
+                method=bt.feeds.PandasData,
+                kwargs=dict(fileName=os.path.join(testcommon.modpath,
+                                                  testcommon.dataspath,
+                                                  fname),
+                            sep=',', header=0, usecols=[0, 1, 2, 3, 4],
+                            timeframe=bt.TimeFrame.Days))
+
+
+def synchronize(how):
+    msgs = []
+    synch = bt.feeds.DataSynchronizer(
+        how=how, progress=lambda msg, pct: msgs.append((msg, pct)))
+    synch.addData(getfeed('2006-day-001.txt'))
+    synch.addData(getfeed('2006-day-002.txt'))
+    synch.synchronize()
+    return synch, msgs
+
+
+class CloseStrategy(bt.Strategy):
+    def __init__(self):
+        self.closes = []
+
+    def next(self):
+        self.closes.append((self.data0.close[0], self.data1.close[0]))
+
+
+def runsynch(synch):
+    cerebro = bt.Cerebro()
+    for name, inst in synch.instDct.items():
+        cerebro.adddata(inst, name=name)
+
+    cerebro.addstrategy(CloseStrategy)
+    return cerebro.run()[0].closes
+
+
+def test_run(main=False):
+    synch, msgs = synchronize('inner')
+    d1, d2 = synch.instDct.values()
+    assert len(synch.dtLst) == 127
+    assert list(d1.full['time']) == list(d2.full['time'])
+    assert msgs and msgs[-1][1] == 100.0
+
+    synch, msgs = synchronize('outer')
+    d1, d2 = synch.instDct.values()
+    assert len(synch.dtLst) == 257
+    assert len(d1.full) == len(d2.full) == 257
+    assert d2.full['close'].isnull().sum() == 257 - 129
+
+    # the missing candles reach the strategy as NaN bars
+    closes = runsynch(synch)
+    assert len(closes) == 257
+    assert sum(math.isnan(c2) for c1, c2 in closes) == 257 - 129
+    assert sum(math.isnan(c1) for c1, c2 in closes) == 257 - 255
+
+    synch, msgs = synchronize('ffill')
+    d1, d2 = synch.instDct.values()
+    assert len(d1.full) == 257
+    assert len(d2.full) == 256  # starts with its own first candle
+    assert d2.full['close'].notnull().all()
+
+    # no NaN bars: the strategy starts once all datas have a candle
+    closes = runsynch(synch)
+    assert len(closes) == 256
+    assert not any(math.isnan(c1) or math.isnan(c2) for c1, c2 in closes)
+
+    if main:
+        for msg, pct in msgs:
+            print('%s %.1f%%' % (msg, pct))
+
+    try:
+        bt.feeds.DataSynchronizer(how='left')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+if __name__ == '__main__':
+    test_run(main=True)
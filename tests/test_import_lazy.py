@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import os.path
+import subprocess
+import sys
+
+import testcommon
+
+import backtrader as bt
+
+
+ROOTDIR = os.path.dirname(testcommon.modpath)
+
+LAZY = ['feeds', 'indicators', 'studies', 'strategies', 'analyzers',
+        'commissions', 'filters', 'signals', 'talib']
+
+CHECK = '''
+import sys
+from time import perf_counter
+t0 = perf_counter()
+import backtrader as bt
+if %r:
+    for name in %r:
+        getattr(bt, name)
+print(perf_counter() - t0)
+print(','.join(sorted(sys.modules)))
+'''
+
+
+def runimport(touch):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOTDIR] + [x for x in [env.get('PYTHONPATH')] if x])
+
+    out = subprocess.check_output(
+        [sys.executable, '-c', CHECK % (touch, LAZY)], env=env)
+    seconds, modules = out.decode().splitlines()[-2:]
+    return float(seconds), set(modules.split(','))
+
+
+def test_run(main=False):
+    lazytimes, fulltimes = list(), list()
+    for i in range(3):
+        seconds, modules = runimport(False)
+        lazytimes.append(seconds)
+        for name in LAZY:
+            assert 'backtrader.' + name not in modules
+
+        seconds, modules = runimport(True)
+        fulltimes.append(seconds)
+        for name in LAZY:
+            assert 'backtrader.' + name in modules
+
+    if main:
+        print('import backtrader: %.3f s (all packages: %.3f s)' % (
+            min(lazytimes), min(fulltimes)))
+
+    assert min(lazytimes) < min(fulltimes)
+
+    # aliases and contributed indicators/studies
+    assert bt.ind is bt.indicators
+    assert bt.strats is bt.strategies
+    assert bt.obs is bt.observers
+    assert bt.comms is bt.commissions
+    assert bt.ind.SMA is bt.indicators.sma.SMA
+    assert bt.ind.Vortex.__name__ == 'Vortex'
+    assert bt.studies.Fractal.__name__ == 'Fractal'
+    assert 'indicators' in dir(bt)
+
+    # class discovery of btrun
+    from backtrader.btrun.btrun import getmodclasses
+    assert getmodclasses(bt.indicators, bt.Indicator, 'SMA') == [bt.ind.SMA]
+    assert bt.analyzers.SharpeRatio in getmodclasses(bt.analyzers,
+                                                     bt.Analyzer)
+
+    try:
+        bt.doesnotexist
+    except AttributeError:
+        pass
+    else:
+        assert False
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+chkvals = [
+    ['0.364442', '0.246923', '0.114427'],
+]
+
+chkmin = 40
+chkind = btind.HurstExponent
+
+
+class NanClose(bt.Indicator):
+    lines = ('close',)
+
+    def next(self):
+        nan = len(self) in (60, 61, 150)
+        self.lines.close[0] = float('NaN') if nan else self.data.close[0]
+
+
+class NanStrategy(bt.Strategy):
+    def __init__(self):
+        self.hurst = chkind(NanClose(self.data))
+
+    def stop(self):
+        self.values = self.hurst.lines.hurst.getndarray()[:len(self)]
+
+
+def runnan(runonce):
+    cerebro = bt.Cerebro(runonce=runonce, stdstats=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(NanStrategy)
+    return cerebro.run()[0].values
+
+
+def test_run(main=False):
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    testcommon.runtest(datas,
+                       testcommon.TestStrategy,
+                       main=main,
+                       plot=main,
+                       chkind=chkind,
+                       chkmin=chkmin,
+                       chkvals=chkvals)
+
+    # NaN values entering and leaving the window: next as once
+    vonce, vnext = runnan(runonce=True), runnan(runonce=False)
+    assert len(vonce) == len(vnext) == 255
+    for x, y in zip(vonce, vnext):
+        assert math.isnan(x) == math.isnan(y)
+        assert math.isnan(x) or math.isclose(x, y, rel_tol=1e-9)
+
+    assert not math.isnan(vnext[-1]) and math.isnan(vnext[99])
+    if main:
+        print('nans', sum(map(math.isnan, vnext)))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
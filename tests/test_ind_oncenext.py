@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+import random
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import testcommon
+
+import backtrader as bt
+from backtrader.indicators import basicops
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        # sums (same values in both modes)
+        self.sums = [
+            bt.ind.SumN(self.data, period=14),
+            bt.ind.Highest(self.data, period=14),
+            bt.ind.Average(self.data, period=30),
+        ]
+        # exponential smoothing (closed form in runonce mode)
+        self.smooth = [
+            bt.ind.EMA2(self.data, period=30),
+            bt.ind.EMA(self.data, period=30, skipVals=0),
+            bt.ind.SMMA(self.data, period=14),
+            bt.ind.KAMA(self.data),  # dynamic alpha
+        ]
+
+    def stop(self):
+        self.values = [
+            [list(ind.lines[0].plotrange(0, len(self))) for ind in inds]
+            for inds in (self.sums, self.smooth)
+        ]
+
+
+def run(runonce):
+    cerebro = bt.Cerebro(runonce=runonce)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(RunStrategy)
+    return cerebro.run()[0].values
+
+
+def reflfilter(b, a, x, zi):
+    # scipy.signal.lfilter for the first order filters of _expsmooth
+    out, state = np.empty(len(x)), zi[0]
+    for i, v in enumerate(x):
+        out[i] = b[0] * v + state
+        state = -a[1] * out[i]
+
+    return out, np.array([state])
+
+
+def check(main=False):
+    sums, smooth = run(runonce=True)
+    nsums, nsmooth = run(runonce=False)
+
+    for v0, v1 in zip(sums, nsums):
+        assert list(map(str, v0)) == list(map(str, v1))  # nan == nan
+
+    for v0, v1 in zip(smooth, nsmooth):
+        assert len(v0) == len(v1)
+        for x0, x1 in zip(v0, v1):
+            assert (math.isnan(x0) and math.isnan(x1)) or \
+                math.isclose(x0, x1, rel_tol=1e-13)
+
+    if main:
+        print('sums', [v[-1] for v in sums], 'smooth', [v[-1] for v in smooth])
+
+
+def test_run(main=False):
+    # rows summed as math.fsum does, also with cancellation and non-finite
+    rnd = random.Random(5)
+    src = np.array([rnd.gauss(0.0, 1.0) * 10 ** rnd.randint(-3, 8)
+                    for _ in range(5000)])
+    src[[100, 2000]] = [np.inf, np.nan]
+    for period in (2, 14, 100):
+        windows = sliding_window_view(src, period)
+        fsums = [math.fsum(x) for x in windows]
+        assert list(map(str, basicops._fsumrows(windows))) == \
+            list(map(str, fsums))
+
+    # indicators: runonce against next
+    check(main=main)
+
+    # with and without scipy.signal.lfilter for the exponential smoothing
+    lfilter = basicops.lfilter
+    try:
+        basicops.lfilter = reflfilter if lfilter is None else None
+        check(main=main)
+    finally:
+        basicops.lfilter = lfilter
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+from backtrader.linebuffer import LineBuffer, NumPyBuffer
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.ind = bt.ind.BollingerBands(self.data)
+
+
+class RaiseStrategy(bt.Strategy):
+    def next(self):
+        raise ValueError('stop')
+
+
+def runraise():
+    cerebro = bt.Cerebro(numpybuffers=True)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(RaiseStrategy)
+    try:
+        cerebro.run()
+    except ValueError:
+        pass
+    else:
+        assert False, 'the strategy did not raise'
+
+
+def test_run(main=False):
+    LineBuffer.usenumpy(True)
+    try:
+        lb = LineBuffer()
+    finally:
+        LineBuffer.usenumpy(False)
+
+    assert isinstance(lb.array, NumPyBuffer)
+
+    for i in range(100):  # beyond the initial capacity
+        lb.forward()
+        lb[0] = float(i)
+
+    assert len(lb) == lb.buflen() == 100
+    assert lb[0] == 99.0 and lb[-1] == 98.0
+    assert lb.get(size=3).tolist() == [97.0, 98.0, 99.0]
+
+    lb.extend(size=2)  # lookahead positions
+    assert lb.buflen() == 100 and len(lb.array) == 102
+    assert math.isnan(lb[1])
+
+    view = lb.getndarray()
+    view[0] = -1.0  # zero-copy
+    assert lb.getzeroval(0) == -1.0
+
+    lb.rewind(10)
+    assert lb[0] == 89.0 and len(lb) == 90
+
+    lb.home()
+    assert len(lb) == 0 and lb.buflen() == 100
+
+    lb.backwards(size=2)
+    assert len(lb.array) == 100
+
+    lb.forwardvals(lb.getndarray()[:4].copy())
+    assert lb.getzero(100, 4).tolist() == [-1.0, 1.0, 2.0, 3.0]
+
+    # indicator results are the same with both storages
+    results = []
+    for numpybuffers in (False, True):
+        cerebro = bt.Cerebro(numpybuffers=numpybuffers)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(RunStrategy)
+        strat = cerebro.run()[0]
+        results.append([[None if math.isnan(x) else x
+                         for x in line.plotrange(0, len(line))]
+                        for line in strat.ind.lines])
+
+        if main:
+            print('numpybuffers', numpybuffers,
+                  type(strat.ind.lines[0].array).__name__)
+
+    assert results[0] == results[1]
+
+    # the setting of a run does not leak to other cerebros
+    assert LineBuffer._npstorage is False
+    runraise()
+    assert LineBuffer._npstorage is False
+    assert not isinstance(LineBuffer().array, NumPyBuffer)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
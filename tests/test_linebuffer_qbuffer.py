@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import numpy as np
+
+import testcommon
+
+import backtrader as bt
+from backtrader.linebuffer import LineBuffer
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.inds = [
+            bt.ind.SumN(self.data, period=10),
+            bt.ind.ApplyN(self.data, period=20, func=max),
+            bt.ind.Hurst(self.data, period=30),
+        ]
+        self.values = []
+        self.window = None
+
+    def next(self):
+        # a window kept across bars does not prevent the buffer from moving
+        self.window = self.data.close.get(size=5)
+        self.values.append([ind[0] for ind in self.inds])
+
+
+def test_run(main=False):
+    lb = LineBuffer()
+    lb.qbuffer()
+    lb.minbuffer(3)
+
+    for i in range(500):
+        lb.forward()
+        lb[0] = float(i)
+
+    # bounded, with the last values reachable
+    assert len(lb) == 500 and len(lb.array) < 3 + 2 * LineBuffer.QSlack
+    assert lb[0] == 499.0 and lb[-2] == 497.0
+
+    window = lb.get(size=3)  # zero-copy view
+    assert isinstance(window, np.ndarray) and window.tolist() == [
+        497.0, 498.0, 499.0]
+    assert np.shares_memory(window, lb.getndarray())
+
+    for i in range(500, 600):  # the buffer moves with the view alive
+        lb.forward()
+        lb[0] = float(i)
+
+    assert window.tolist() == [497.0, 498.0, 499.0]
+    assert lb.get(size=3).tolist() == [597.0, 598.0, 599.0]
+
+    lb.backwards()
+    assert len(lb) == 599 and lb[0] == 598.0
+
+    # indicator results are the same with and without memory savings
+    results = []
+    for exactbars in (False, True):
+        cerebro = bt.Cerebro(exactbars=exactbars, runonce=False)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(RunStrategy)
+        strat = cerebro.run()[0]
+        results.append(strat.values)
+
+        if main:
+            print('exactbars', exactbars,
+                  len(strat.data.close.array), strat.values[-1])
+
+    assert len(results[0]) == len(results[1])
+    for v0, v1 in zip(*results):
+        for x0, x1 in zip(v0, v1):
+            assert (math.isnan(x0) and math.isnan(x1)) or \
+                math.isclose(x0, x1, rel_tol=1e-9, abs_tol=1e-12)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        d = self.data
+        self.ops = [
+            d.close - d.open,
+            d.close * 2.0,
+            10.0 / d.close,
+            d.close // 7.0,
+            d.close ** 0.5,
+            d.high > d.low,
+            d.close <= d.open,
+            -d.close,
+            abs(d.open - d.close),
+            d.close(-2),
+            d.close(2),
+            bt.If(d.close > d.open, d.close, d.open),
+            bt.And(d.close > d.open, d.high > d.low),
+            bt.Or(d.close > d.open, d.close < d.open),
+            bt.Max(d.open, d.close, 4000.0),
+            bt.Min(d.open, d.close, 4000.0),
+            bt.Cmp(d.close, d.open),
+            bt.DivByZero(d.close - d.open, d.close(-1) - d.open),
+            bt.DivZeroByZero(d.close - d.open, d.close(-1) - d.open),
+        ]
+
+
+def test_run(main=False):
+    # the vectorized once path must deliver the values of the next path
+    results = []
+    for runonce in (True, False):
+        cerebro = bt.Cerebro(runonce=runonce)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(RunStrategy)
+        strat = cerebro.run()[0]
+        results.append([[None if math.isnan(x) else x
+                         for x in op.plotrange(0, len(op))]
+                        for op in strat.ops])
+
+    for i, (ronce, rnext) in enumerate(zip(*results)):
+        if main:
+            print(i, ronce[-3:], rnext[-3:])
+
+        assert ronce == rnext
+
+
+if __name__ == '__main__':
+    test_run(main=True)
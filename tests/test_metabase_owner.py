@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.observers.trades import MetaDataTrades
+
+
+class SampleStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        self.sma = btind.SMA(period=self.p.period)
+        self.hinted = btind.SMA(period=5, _owner=self)
+
+    def start(self):
+        # the explicit owner is removed once the indicator is created
+        assert '_ownerhint' not in self.hinted.__dict__
+        assert self.hinted._owner is self
+        inds = self._lineiterators[bt.LineIterator.IndType]
+        assert any(ind is self.hinted for ind in inds)
+
+        # default and overridden params
+        assert self.p.period == self.params.period
+        assert self.sma.p.period == self.p.period
+        assert self.hinted.p.period == 5
+
+
+def test_run(main=False):
+    datas = [testcommon.getdata(0)]
+    cerebros = testcommon.runtest(datas, SampleStrategy, period=20,
+                                  plot=main)
+
+    # param instances do not share values
+    p1 = SampleStrategy.params._instantiate(dict(period=3))
+    p2 = SampleStrategy.params._instantiate(dict())
+    assert (p1.period, p2.period) == (3, 15)
+
+    # the lines/plotlines classes of DataTrades are derived only once
+    ntypes = len(MetaDataTrades._derived)
+    for _ in range(2):
+        cerebro = bt.Cerebro()
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(bt.Strategy)
+        cerebro.addobserver(bt.observers.DataTrades)
+        cerebro.run()
+
+    assert len(MetaDataTrades._derived) <= ntypes + 1
+
+    if main:
+        for cerebro in cerebros:
+            print(cerebro.runstrats[0][0].sma.p.period)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
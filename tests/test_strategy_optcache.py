@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    params = (('fast', 5), ('slow', 30),)
+
+    def __init__(self):
+        fast = bt.ind.SMA(self.data, period=self.p.fast)
+        slow = bt.ind.SMA(self.data, period=self.p.slow)
+        self.cross = bt.ind.CrossOver(fast, slow)
+        self.bbands = bt.ind.BollingerBands(self.data.close)
+        self.wsma = bt.ind.SMA(self.data1, period=5)  # shorter than clock
+
+    def next(self):
+        if not self.position:
+            if self.cross > 0.0:
+                self.buy()
+        elif self.cross < 0.0:
+            self.close()
+
+    def stop(self):
+        lines = ((self.cross.lines[0], self.data), (self.bbands.lines.top,
+                 self.data), (self.wsma.lines[0], self.data1))
+        self.values = [None if math.isnan(x) else x
+                       for line, data in lines
+                       for x in line.plotrange(0, len(data))]
+        self.values.append(len(self.wsma))
+
+
+class ValuesAnalyzer(bt.Analyzer):
+    def stop(self):
+        self.rets['values'] = self.strategy.values
+        self.rets['value'] = self.strategy.broker.getvalue()
+
+
+def runopt(**kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.optstrategy(RunStrategy, fast=range(5, 8), slow=(20, 30))
+    cerebro.addanalyzer(ValuesAnalyzer, _name='values')
+    runs = cerebro.run()
+    return [run[0].analyzers.values.get_analysis() for run in runs]
+
+
+def test_run(main=False):
+    results = []
+    for maxcpus in (1, 2):
+        for optcache in (False, True):
+            results.append(runopt(maxcpus=maxcpus, optcache=optcache))
+
+            if maxcpus == 1:
+                # stored if used again: a single BollingerBands and no
+                # crossover (a different one in each combination)
+                cached = [rkey[0] for rkey in bt.Indicator._rcache]
+                assert cached.count(bt.ind.CrossOver) == 0
+                assert cached.count(bt.ind.BollingerBands) == 1 * optcache
+                assert bool(cached) == optcache
+
+            if main:
+                print('maxcpus', maxcpus, 'optcache', optcache,
+                      [r['value'] for r in results[-1]])
+
+    # values kept within the budget: 255 bars take 2040 bytes per line
+    results.append(runopt(maxcpus=1, optcache=True, optcachesize=5000))
+    assert 0 < bt.Indicator._rcbytes <= 5000
+    assert bt.Indicator._rcbytes == sum(
+        x.nbytes for values in bt.Indicator._rcache.values() for x in values)
+
+    for result in results[1:]:
+        assert result == results[0]
+
+    # no cache without optimization
+    cerebro = bt.Cerebro(optcache=True)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.addstrategy(RunStrategy)
+    cerebro.run()
+    assert not bt.Indicator._rcacheuse and not bt.Indicator._rcseen
+
+
+if __name__ == '__main__':
+    test_run(main=True)
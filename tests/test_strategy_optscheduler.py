@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import multiprocessing
+import os
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = bt.ind.SMA(self.data, period=self.p.period)
+        self.cross = bt.ind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if not self.position:
+            if self.cross > 0.0:
+                self.buy()
+        elif self.cross < 0.0:
+            self.close()
+
+
+class RaiseStrategy(RunStrategy):
+    def stop(self):
+        if self.p.period == 20:
+            raise ValueError('period 20')
+
+
+class CountStrategy(RunStrategy):
+    params = (('fname', ''),)
+
+    def __init__(self):
+        super(CountStrategy, self).__init__()
+        with open(self.p.fname, 'a') as f:  # combinations started
+            f.write('%d\n' % self.p.period)
+
+
+def period(iterstrat):
+    return iterstrat[0][2]['period']
+
+
+def runopt(maxcpus, abort=None, strategy=RunStrategy, skwargs=None,
+           **kwargs):
+    progress = list()
+    cerebro = bt.Cerebro(maxcpus=maxcpus)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(strategy, period=range(5, 45), **(skwargs or {}))
+    cerebro.optscheduler(bt.OptScheduler, **kwargs)
+    cerebro.optprogress(lambda *args: progress.append(args))
+    if abort is not None:
+        cerebro.optabort(abort)
+
+    runs = cerebro.run()
+    periods = [run[0].p.period for run in runs]
+    return periods, progress
+
+
+def test_run(main=False):
+    # the most expensive combinations go first in chunks of similar cost
+    iterstrats = [((RunStrategy, (), dict(period=p)),) for p in range(1, 9)]
+    chunks = bt.OptScheduler(cost=period).schedule(iterstrats, procs=2)
+    assert [[idx for idx, _ in chunk] for chunk in chunks] == \
+        [[7], [6], [5], [4], [3, 2], [1, 0]]
+
+    chunks = bt.OptScheduler(chunksize=3).schedule(iterstrats, procs=2)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 2]
+
+    # all results are returned in the order of the combinations
+    for maxcpus in (1, 2):
+        periods, progress = runopt(maxcpus, cost=period)
+        assert periods == list(range(5, 45))
+        assert [p[:2] for p in progress] == [(i, 40) for i in range(1, 41)]
+        assert progress[-1][3] == 0.0  # eta
+
+        if main:
+            print('maxcpus', maxcpus, progress[-1])
+
+    # stop after having seen 5 results
+    for maxcpus in (1, 2):
+        seen = list()
+        periods, progress = runopt(
+            maxcpus, abort=lambda r: seen.append(r) or len(seen) >= 5,
+            chunksize=2)
+        assert len(periods) == len(progress) == 5
+        assert periods == sorted(periods)
+
+        if main:
+            print('maxcpus', maxcpus, 'aborted with', periods)
+
+    # results and abort combination by combination: the processes stop
+    # within their chunks (of 5 combinations)
+    fd, fname = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        periods, progress = runopt(2, abort=lambda r: True, chunks=4,
+                                   strategy=CountStrategy,
+                                   skwargs=dict(fname=[fname]))
+        assert len(periods) == len(progress) == 1
+        with open(fname) as f:
+            started = len(f.read().split())
+
+        assert started < 5
+        if main:
+            print('aborted after', started, 'started combinations')
+    finally:
+        os.remove(fname)
+
+    # a raising worker stops the run and no worker is left behind
+    try:
+        runopt(2, strategy=RaiseStrategy, chunksize=2)
+    except ValueError:
+        assert not multiprocessing.active_children()
+    else:
+        assert False
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import testcommon
+
+import backtrader as bt
+from backtrader.linebuffer import LineBuffer, SharedBuffer
+
+
+class ValueAnalyzer(bt.Analyzer):
+    def stop(self):
+        self.rets['value'] = self.strategy.broker.getvalue()
+
+
+class ShmAnalyzer(bt.Analyzer):
+    # whether the lines of the data are attached to the shared memory
+    def stop(self):
+        self.rets['pid'] = os.getpid()
+        self.rets['attached'] = [
+            isinstance(line.array, SharedBuffer) and not line.array._owner
+            for line in self.strategy.data.lines]
+
+
+class SizeCerebro(bt.Cerebro):
+    # records the size of the pickled cerebro handed over with each task
+    sizes = []
+    _sizing = False
+
+    def __getstate__(self):
+        state = super(SizeCerebro, self).__getstate__()
+        if not self._sizing:  # the state refers back to the cerebro
+            self._sizing = True
+            try:
+                self.sizes.append(len(pickle.dumps(state)))
+            finally:
+                self._sizing = False
+
+        return state
+
+
+def getpandas(size):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    df = pd.read_csv(datapath, index_col=0, parse_dates=True)
+    df.columns = [x.lower() for x in df.columns]
+    df = df.iloc[np.arange(size) % len(df)]
+    df.index = pd.date_range('2000-01-01', periods=size, freq='D')
+    return bt.feeds.PandasPreloaded(df=df, timeframe=bt.TimeFrame.Days)
+
+
+def tasksize(size, optshm):
+    del SizeCerebro.sizes[:]
+    cerebro = SizeCerebro(maxcpus=2, optshm=optshm)
+    cerebro.adddata(getpandas(size))
+    cerebro.optstrategy(RunStrategy, period=(5, 10))
+    cerebro.run()
+    return max(SizeCerebro.sizes)
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = bt.ind.SMA(self.data, period=self.p.period)
+        self.cross = bt.ind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if not self.position:
+            if self.cross > 0.0:
+                self.buy()
+        elif self.cross < 0.0:
+            self.close()
+
+
+def test_run(main=False):
+    lb = LineBuffer()
+    for i in range(5):
+        lb.forward()
+        lb[0] = float(i)
+
+    shared = lb.share()
+    assert isinstance(lb.array, SharedBuffer)
+    assert lb.getndarray().tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    # a pickled copy attaches to the same memory without writing access
+    attached = pickle.loads(pickle.dumps(shared))
+    assert attached[-1] == 4.0 and not attached.ndarray.flags.writeable
+    lb[0] = 10.0
+    assert attached[-1] == 10.0
+    attached.release()
+
+    lb.unshare()
+    assert not isinstance(lb.array, SharedBuffer)
+    assert lb.getndarray().tolist() == [0.0, 1.0, 2.0, 3.0, 10.0]
+
+    # optimization results are the same with and without shared memory
+    results = []
+    for optshm in (False, True):
+        cerebro = bt.Cerebro(maxcpus=2, optshm=optshm)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.optstrategy(RunStrategy, period=range(5, 25, 5))
+        cerebro.addanalyzer(ValueAnalyzer, _name='value')
+        cerebro.addanalyzer(ShmAnalyzer, _name='shm')
+        runs = cerebro.run()
+        results.append([run[0].analyzers.value.get_analysis()['value']
+                        for run in runs])
+
+        # the workers use the memory of the parent process
+        for run in runs:
+            shm = run[0].analyzers.shm.get_analysis()
+            assert shm['pid'] != os.getpid()
+            assert all(shm['attached']) if optshm else \
+                not any(shm['attached'])
+
+        if main:
+            print('optshm', optshm, results[-1])
+
+    assert results[0] == results[1]
+
+    # the source of the bars is not handed over with shared lines: the
+    # size of a task does not grow with the size of the data
+    small, large = tasksize(500, True), tasksize(5000, True)
+    assert large - small < 1000
+    assert tasksize(5000, False) - tasksize(500, False) > 10 * 4500
+
+    if main:
+        print('task size', small, large)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import gc
+import os
+import os.path
+import re
+import shutil
+import tempfile
+
+import pandas as pd
+
+import testcommon
+
+import backtrader as bt
+from backtrader.strategies.recordValues import CsvSink
+
+
+class RecordClose(bt.strategies.RecordValues):
+    def next(self):
+        super(RecordClose, self).next()
+        self.log('%.2f,%.2f' % (self.data.open[0], self.data.close[0]))
+
+
+class RaiseClose(RecordClose):
+    def next(self):
+        super(RaiseClose, self).next()
+        if len(self) == 100:
+            raise ValueError('stop')
+
+
+def getdata():
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    df = pd.read_csv(datapath, index_col=0, parse_dates=True)
+    df.columns = [x.lower() for x in df.columns]
+    return bt.feeds.PandasPreloaded(df=df, timeframe=bt.TimeFrame.Days)
+
+
+def runraise(fname):
+    cerebro = bt.Cerebro()
+    cerebro.adddata(getdata())
+    cerebro.addstrategy(RaiseClose, fileName=fname, columnNames=['time'],
+                        flushInterval=60)
+    try:
+        cerebro.run()
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def test_run(main=False):
+    tmpdir = tempfile.mkdtemp()
+
+    # rows kept until the thresholds or the background flush
+    fname = os.path.join(tmpdir, 'sink.csv')
+    sink = CsvSink(fname, flushRows=3, flushBytes=100)
+    sink.write('a\n')
+    sink.write('b\n')
+    with open(fname) as f:
+        assert f.read() == ''
+    sink.write('c\n')
+    with open(fname) as f:
+        assert f.read() == 'a\nb\nc\n'
+    sink.write('d' * 100 + '\n')
+    with open(fname) as f:
+        assert f.read().endswith('d\n')
+    sink.close()
+
+    sink = CsvSink(fname, flushInterval=0.01)
+    sink.write('e\n')
+    sink.thread.join(0.5)
+    with open(fname) as f:
+        assert f.read() == 'e\n'
+    sink.close()
+
+    expected = None
+    for kwargs in [dict(), dict(flushRows=7, flushInterval=0.001),
+                   dict(flushBytes=10, progressInterval=0)]:
+        fname = os.path.join(tmpdir, 'values.csv')
+        cerebro = bt.Cerebro()
+        cerebro.adddata(getdata())
+        cerebro.addstrategy(RecordClose, fileName=fname,
+                            columnNames=['time', 'open', 'close'],
+                            comment='test', **kwargs)
+        cerebro.run()
+
+        with open(fname) as f:
+            lines = f.read().splitlines()
+
+        if main:
+            print(lines[:5])
+
+        assert lines[0].startswith('# Execution time: ')
+        assert lines[1:4] == ['# test', 'time,open,close',
+                              '03.01.2006 00:00,3604.08,3614.34']
+        assert len(lines) == 3 + 254  # nextstart does not log
+        if expected is None:
+            expected = lines[1:]
+        assert lines[1:] == expected
+
+    # rows kept when the run raises (stop is not called) are not lost
+    runraise(fname)
+    gc.collect()
+    with open(fname) as f:
+        lines = f.read().splitlines()
+
+    assert lines[2:] == expected[2:2 + 99]  # logged up to the raise
+
+    # strategies returned by optimization processes writing to one file:
+    # the rows of the processes are not split by each other
+    cerebro = bt.Cerebro(maxcpus=2, optreturn=False)
+    cerebro.adddata(getdata())
+    cerebro.optstrategy(RecordClose, fileName=fname,
+                        columnNames=[['time', 'open', 'close']],
+                        comment=['a', 'b', 'c', 'd'], flushRows=3)
+    runs = cerebro.run()
+    assert len(runs) == 4 and all(run[0].sink is None for run in runs)
+
+    with open(fname) as f:
+        lines = f.read().splitlines()
+
+    row = re.compile(r'(# .*|time,open,close|[\d. :]+,[\d.]+,[\d.]+)$')
+    assert lines and all(row.match(line) for line in lines)
+
+    shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import random
+
+import testcommon  # noqa: F401 (puts the package in sys.path)
+
+import backtrader as bt
+from backtrader.utils import UTC
+
+ONEDAY = datetime.timedelta(days=1)
+
+
+class EST(datetime.tzinfo):
+    '''Fixed offset timezone with the ``localize`` interface of pytz'''
+    def utcoffset(self, dt):
+        return datetime.timedelta(hours=-5)
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+    def localize(self, dt):
+        return dt.replace(tzinfo=self)
+
+
+def refschedule(cal, day, tz=None):
+    # schedule loop of TradingCalendar before the session cache
+    while True:
+        dt = day.date()
+        o, c = cal.p.open, cal.p.close
+        for x in cal.p.earlydays:
+            if x[0] == dt:
+                o, c = x[1:]
+                break
+
+        closing = datetime.datetime.combine(dt, c)
+        if tz is not None:
+            closing = tz.localize(closing).astimezone(UTC)
+            closing = closing.replace(tzinfo=None)
+
+        if day > closing:
+            day += ONEDAY
+            continue
+
+        opening = datetime.datetime.combine(dt, o)
+        if tz is not None:
+            opening = tz.localize(opening).astimezone(UTC)
+            opening = opening.replace(tzinfo=None)
+
+        return opening, closing
+
+
+def test_run(main=False):
+    rnd = random.Random(17)
+    first = datetime.date(2016, 1, 1)
+    days = [first + i * ONEDAY for i in range(3 * 366)]
+    holidays = rnd.sample(days, 40)
+    earlydays = [(d, datetime.time(9, 30), datetime.time(13, 0))
+                 for d in rnd.sample(days, 40)]
+
+    cal = bt.TradingCalendar(open=datetime.time(9, 30),
+                             close=datetime.time(16, 0),
+                             holidays=holidays, earlydays=earlydays)
+    cal._lrusize = 64  # force evictions
+
+    times = [datetime.time(0, 0), datetime.time(9, 30), datetime.time(12),
+             datetime.time(13, 0), datetime.time(14), datetime.time(16, 0)]
+
+    # ordered and random lookups (the latter restart the session cache)
+    lookups = [datetime.datetime.combine(d, t) for d in days for t in times]
+    lookups += rnd.sample(lookups, 2000)
+    for tz in [None, EST()]:
+        for day in lookups:
+            if tz is not None:  # the times above are local times
+                day = tz.localize(day).astimezone(UTC).replace(tzinfo=None)
+            assert cal.schedule(day, tz) == refschedule(cal, day, tz)
+
+    for day in days + rnd.sample(days, 500):
+        nextday = day + ONEDAY
+        while nextday.isoweekday() in cal.p.offdays or nextday in holidays:
+            nextday += ONEDAY
+
+        assert cal.nextday(day) == nextday
+        assert cal.last_weekday(day) == \
+            (day.isocalendar()[1] != nextday.isocalendar()[1])
+        assert cal.last_monthday(day) == (day.month != nextday.month)
+        assert cal.last_yearday(day) == (day.year != nextday.year)
+
+    assert len(cal._lru) <= 64
+
+    if main:
+        print('schedule and nextday match the uncached results')
+
+
+if __name__ == '__main__':
+    test_run(main=True)